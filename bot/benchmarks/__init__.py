@@ -0,0 +1,5 @@
+"""
+Standalone performance benchmarks.
+
+Run them from the `bot` directory, e.g. `python -m benchmarks.bench_expense_indexes --help`.
+"""
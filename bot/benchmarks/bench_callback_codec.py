@@ -0,0 +1,66 @@
+"""
+Micro-benchmark of callback_data encoding: compact codec against pydantic JSON.
+
+Times encoding a button's data and decoding a button tap's callback_data
+with the codec, and with the pydantic model ButtonDataDto used to be, and
+compares the payload sizes.
+
+    python -m benchmarks.bench_callback_codec --number 200000
+"""
+import argparse
+import timeit
+from typing import Optional
+from pydantic import BaseModel
+
+from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
+from expanses_tracker.application.utils.callback_codec import (
+    decode_callback_data,
+    encode_callback_data,
+    peek_callback_action,
+)
+
+class PydanticButtonDataDto(BaseModel):
+    """ButtonDataDto as it was before the codec, serialized with model_dump_json."""
+    action: ButtonActions
+    message_id: int
+    chat_id: int
+    value: Optional[str] = None
+
+def main():
+    """Time both encodings."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--number", type=int, default=200_000, help="calls per measurement")
+    args = parser.parse_args()
+
+    data = ButtonDataDto(action=ButtonActions.DELETE, message_id=123456, chat_id=-1001234567890)
+    model = PydanticButtonDataDto(
+        action=ButtonActions.DELETE, message_id=123456, chat_id=-1001234567890
+    )
+    dump_options = {"exclude_none": True, "exclude_defaults": True, "exclude_unset": True}
+    as_json = model.model_dump_json(**dump_options)
+    compact = encode_callback_data(data)
+    print(f"payload: json {len(as_json)} bytes {as_json}")
+    print(f"         compact {len(compact)} bytes {compact}\n")
+
+    cases = {
+        "encode json": lambda: model.model_dump_json(**dump_options),
+        "encode compact": lambda: encode_callback_data(data),
+        "decode json": lambda: PydanticButtonDataDto.model_validate_json(as_json),
+        "decode compact": lambda: decode_callback_data(compact),
+        "decode legacy json": lambda: decode_callback_data(as_json),
+        "peek action": lambda: peek_callback_action(compact),
+    }
+    timings = {}
+    for name, func in cases.items():
+        timings[name] = min(timeit.repeat(func, number=args.number, repeat=5)) / args.number * 1e9
+        print(f"{name:<20}{timings[name]:>10.0f} ns/op")
+    print(
+        f"\nencode {timings['encode json'] / timings['encode compact']:.1f}x, "
+        f"decode {timings['decode json'] / timings['decode compact']:.1f}x"
+        " compared to pydantic JSON"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Throughput benchmark of the message parser, fast path against shlex.
+
+Parses the same synthetic messages (1M by default) with get_message_args
+once per tokenizer and prints messages/sec for both, for the tokenizer
+alone and for the whole parse. A small share of the messages uses quotes,
+so it always takes the shlex path.
+
+    python -m benchmarks.bench_message_parser --messages 1000000
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+from typing import Callable
+
+from benchmarks.seed import WORDS
+from expanses_tracker.application.models.constants import CATEGORIES, TYPES
+from expanses_tracker.application.utils.message_parser import __split_message__, get_message_args
+
+def synthetic_messages(count: int, quoted_ratio: float, seed: int = 42) -> list[str]:
+    """Messages shaped like the ones users send.
+
+    Amount, description, optional category/type/date.
+    """
+    rnd = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        amount = rnd.choice((
+            f"{rnd.randrange(1, 500)}", f"{rnd.uniform(1, 500):.2f}", f"{rnd.randrange(2, 90)}/2"
+        ))
+        words = rnd.sample(WORDS, rnd.randrange(1, 4))
+        if rnd.random() < 0.1:
+            words.append("l'altro")
+        description = " ".join(words)
+        if rnd.random() < quoted_ratio:
+            description = f'"{description}"'
+        tail = []
+        if rnd.random() < 0.6:
+            tail.append(rnd.choice(CATEGORIES))
+            if rnd.random() < 0.7:
+                tail.append(rnd.choice(TYPES))
+        if rnd.random() < 0.2:
+            tail.append(f"{rnd.randrange(1, 29)}/{rnd.randrange(1, 13)}")
+        messages.append(" ".join([amount, description, *tail]))
+    return messages
+
+def __measure(label: str, parse: Callable[[str], object], messages: list[str]) -> float:
+    start = time.perf_counter()
+    for message in messages:
+        parse(message)
+    rate = len(messages) / (time.perf_counter() - start)
+    print(f"{label:<32}{rate:>14,.0f} msg/s")
+    return rate
+
+def main():
+    """Generate the messages, check both paths agree, time them."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument(
+        "--quoted-ratio", type=float, default=0.05,
+        help="share of messages with a quoted description",
+    )
+    args = parser.parse_args()
+
+    messages = synthetic_messages(args.messages, args.quoted_ratio)
+    date = datetime(2025, 9, 9)
+    print(f"{len(messages):,} messages, {args.quoted_ratio:.0%} quoted")
+    mismatches = sum(
+        1 for message in messages[:10_000]
+        if get_message_args(message, date, fast_path=True)
+        != get_message_args(message, date, fast_path=False)
+    )
+    assert mismatches == 0, f"{mismatches} messages parsed differently by the two paths"
+
+    shlex_split = __measure(
+        "tokenize (shlex)", lambda m: __split_message__(m, fast_path=False), messages
+    )
+    fast_split = __measure(
+        "tokenize (fast path)", lambda m: __split_message__(m, fast_path=True), messages
+    )
+    shlex_parse = __measure(
+        "get_message_args (shlex)", lambda m: get_message_args(m, date, fast_path=False), messages
+    )
+    fast_parse = __measure(
+        "get_message_args (fast path)", lambda m: get_message_args(m, date, fast_path=True),
+        messages,
+    )
+    print(
+        f"\nspeedup: tokenize {fast_split / shlex_split:.1f}x,"
+        f" get_message_args {fast_parse / shlex_parse:.1f}x"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Helpers shared by the benchmarks: synthetic expenses and migration replay."""
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Connection, MetaData, Table, insert
+
+from expanses_tracker.application.models.constants import CATEGORIES, TYPES
+from expanses_tracker.persistence.configurations.outcome_model import OutcomeModel
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+WORDS = [
+    "spesa", "casa", "dentist", "pizza", "train", "bus", "rent", "gift", "book", "coffee",
+    "pharmacy", "gym", "cinema", "shoes", "taxi", "flight", "hotel", "insurance", "phone",
+    "groceries",
+]
+
+def migrate(url: str, from_revision: str, to_revision: str) -> float:
+    """Stamp the database at from_revision and run `alembic upgrade to_revision`.
+
+    Returns:
+        The elapsed seconds
+    """
+    config = Config(str(ALEMBIC_INI))
+    previous_url = os.environ.get("DATABASE_URL")
+    # env.py reads the target database from DATABASE_URL
+    os.environ["DATABASE_URL"] = url
+    try:
+        command.stamp(config, from_revision)
+        start = time.perf_counter()
+        command.upgrade(config, to_revision)
+        return time.perf_counter() - start
+    finally:
+        if previous_url is None:
+            del os.environ["DATABASE_URL"]
+        else:
+            os.environ["DATABASE_URL"] = previous_url
+
+def create_bare_expenses_table(conn: Connection) -> Table:
+    """Create the expenses table with its primary key only, as before the index migration."""
+    table = OutcomeModel.__table__.to_metadata(MetaData())
+    table.indexes.clear()
+    table.drop(conn, checkfirst=True)
+    table.create(conn)
+    conn.commit()
+    return table
+
+def synthetic_expenses(
+    rows: int, chats: int, users: int, deleted_ratio: float = 0.02, seed: int = 42
+) -> Iterator[dict]:
+    """Yield `rows` expenses spread over chats x users and the last three years."""
+    rnd = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    now = datetime(2026, 1, 1)
+    span = int((now - start).total_seconds())
+    for msg_id in range(1, rows + 1):
+        chat_id = rnd.randrange(chats) + 1
+        deleted = rnd.random() < deleted_ratio
+        yield {
+            "msg_id": msg_id,
+            "chat_id": chat_id,
+            "user_id": chat_id * 100 + rnd.randrange(users),
+            "amount_cents": rnd.randint(100, 20_000),
+            "description": " ".join(rnd.sample(WORDS, rnd.randint(1, 3))),
+            "type": rnd.choice(TYPES) if rnd.random() < 0.7 else None,
+            "category": rnd.choice(CATEGORIES) if rnd.random() < 0.7 else None,
+            "date": start + timedelta(seconds=rnd.randrange(span)),
+            "created_at": now,
+            "updated_at": now,
+            "deleted_at": now - timedelta(days=rnd.randint(0, 30)) if deleted else None,
+        }
+
+def seed_expenses(
+    conn: Connection, table: Table, rows: int, chats: int, users: int, chunk: int = 10_000
+) -> float:
+    """Insert synthetic expenses in chunks. Return the elapsed seconds."""
+    start = time.perf_counter()
+    batch: list[dict] = []
+    for row in synthetic_expenses(rows, chats, users):
+        batch.append(row)
+        if len(batch) == chunk:
+            conn.execute(insert(table), batch)
+            batch.clear()
+    if batch:
+        conn.execute(insert(table), batch)
+    conn.commit()
+    return time.perf_counter() - start
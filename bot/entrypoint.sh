@@ -4,6 +4,7 @@
 echo "Running database migrations..."
 cd /app && alembic upgrade head
 
-# Start the application
+# Start the application: the schema was just migrated, no need to create the tables again
 echo "Starting the bot..."
+export STARTUP_MODE="${STARTUP_MODE:-fast}"
 exec python -m expanses_tracker.api.main
@@ -1,13 +1,37 @@
 """Main entry point for the Telegram bot."""
 
+import argparse
+import asyncio
 import os
 import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
 from telegram import Update
-from telegram.ext import ApplicationBuilder
+from telegram.ext import Application, ApplicationBuilder
+from telegram.request import BaseRequest, HTTPXRequest
 
+from expanses_tracker.api.startup_profile import StartupProfile, measure_import_times
+from expanses_tracker.api.update_processor import ChatOrderedUpdateProcessor
 from expanses_tracker.application import application_registration
-from expanses_tracker.persistence import persistence_registration
-from expanses_tracker.persistence.database_context.database import DatabaseFactory
+from expanses_tracker.application.utils.access_control import AccessControl, UserRateLimiter
+from expanses_tracker.application.utils.update_dedupe import RecentUpdates
+from expanses_tracker.observability import MetricsServer
+from expanses_tracker.observability.instrumentation import (
+    InstrumentedRequest,
+    instrument_application,
+    instrument_handlers,
+    instrument_pool,
+)
+from expanses_tracker.persistence import (
+    persistence_registration,
+    persistence_shutdown,
+    persistence_startup,
+)
+from expanses_tracker.persistence.database_context.database import (
+    AsyncDatabaseFactory,
+    DatabaseFactory,
+)
 
 logging.basicConfig(level=logging.WARNING)
 logging.getLogger("telegram").setLevel(logging.INFO)
@@ -15,28 +39,191 @@ logging.getLogger("telegram").setLevel(logging.INFO)
 log = logging.getLogger("expenses_tracker")
 log.setLevel(logging.DEBUG)
 
+# Update types the handlers use: Telegram doesn't deliver the others at all
+ALLOWED_UPDATES = [
+    Update.MESSAGE,
+    Update.EDITED_MESSAGE,
+    Update.CHANNEL_POST,
+    Update.EDITED_CHANNEL_POST,
+    Update.CALLBACK_QUERY,
+]
+
+# Characters Telegram accepts in a webhook secret token
+__SECRET_TOKEN_PATTERN__ = re.compile(r"[A-Za-z0-9_-]{1,256}")
+
+@dataclass(slots=True)
+class WebhookSettings:
+    """Webhook server configuration, read from the WEBHOOK_* environment variables."""
+    url: str
+    listen: str = "0.0.0.0"
+    port: int = 8443
+    path: str = "telegram"
+    secret_token: Optional[str] = None
+    max_connections: int = 40
+
+    @classmethod
+    def from_env(cls) -> Optional["WebhookSettings"]:
+        """
+        Get the webhook settings when BOT_MODE=webhook, None for polling (the default)
+
+        Raises:
+            ValueError: If BOT_MODE is unknown, WEBHOOK_URL is missing
+                or WEBHOOK_SECRET_TOKEN is invalid
+        """
+        mode = os.environ.get("BOT_MODE", "polling").lower()
+        if mode == "polling":
+            return None
+        if mode != "webhook":
+            raise ValueError(f"Unknown BOT_MODE '{mode}', use 'polling' or 'webhook'.")
+        url = os.environ.get("WEBHOOK_URL")
+        if not url:
+            raise ValueError("WEBHOOK_URL environment variable is required when BOT_MODE=webhook.")
+        secret_token = os.environ.get("WEBHOOK_SECRET_TOKEN") or None
+        if secret_token is None:
+            log.warning("WEBHOOK_SECRET_TOKEN not set: anyone knowing the URL can post updates.")
+        elif not __SECRET_TOKEN_PATTERN__.fullmatch(secret_token):
+            raise ValueError(
+                "WEBHOOK_SECRET_TOKEN must be 1-256 characters among A-Z, a-z, 0-9, _ and -."
+            )
+        return cls(
+            url=url.rstrip("/"),
+            listen=os.environ.get("WEBHOOK_LISTEN", "0.0.0.0"),
+            port=int(os.environ.get("WEBHOOK_PORT", "8443")),
+            path=os.environ.get("WEBHOOK_PATH", "telegram").strip("/"),
+            secret_token=secret_token,
+            max_connections=int(os.environ.get("WEBHOOK_MAX_CONNECTIONS", "40")),
+        )
+
+    def webhook_kwargs(self) -> dict:
+        """Arguments of Application.run_webhook and Updater.start_webhook."""
+        return {
+            "listen": self.listen,
+            "port": self.port,
+            "url_path": self.path,
+            # Public URL registered with setWebhook, the local server may sit behind a proxy
+            "webhook_url": f"{self.url}/{self.path}",
+            "secret_token": self.secret_token,
+            "max_connections": self.max_connections,
+            "allowed_updates": ALLOWED_UPDATES,
+        }
+
+def fast_startup_from_env() -> bool:
+    """
+    True when STARTUP_MODE=fast, False for the standard startup (the default)
+
+    The fast startup skips create_all when the database is at the latest Alembic
+    revision and imports each feature module on its first update.
+
+    Raises:
+        ValueError: If STARTUP_MODE is unknown
+    """
+    mode = os.environ.get("STARTUP_MODE", "standard").lower()
+    if mode not in ("standard", "fast"):
+        raise ValueError(f"Unknown STARTUP_MODE '{mode}', use 'standard' or 'fast'.")
+    return mode == "fast"
+
+async def __post_init__(app: Application) -> None:
+    # kill -HUP reloads ALLOWED_CHAT_IDS_FILE (or ALLOWED_CHAT_IDS)
+    AccessControl.install_reload_signal()
+    # Budget checks read the totals in memory: they must be there before the first expense
+    await persistence_startup(app)
+    if server := MetricsServer.from_env():
+        await server.start()
+        app.bot_data["metrics_server"] = server
+
+async def __post_shutdown__(app: Application) -> None:
+    if server := app.bot_data.pop("metrics_server", None):
+        await server.stop()
+    await persistence_shutdown(app)
+
+def build_application(
+        bot_token: str,
+        builder: Optional[ApplicationBuilder] = None,
+        request: Optional[BaseRequest] = None,
+        lazy_handlers: bool = False) -> Application:
+    """
+    Build the bot application with every handler registered and instrumented
+
+    Args:
+        bot_token: Telegram bot token
+        builder: Builder to start from, a new ApplicationBuilder by default
+        request: Request used for the Bot API calls (not getUpdates), an HTTPXRequest by default
+        lazy_handlers: Import the feature modules on their first update
+    """
+    builder = builder or ApplicationBuilder()
+    # Sequential like PTB by default; above 1, chats run in parallel, each chat's updates in order
+    concurrent_updates = int(os.environ.get("CONCURRENT_UPDATES", "1"))
+    if concurrent_updates > 1:
+        builder = builder.concurrent_updates(ChatOrderedUpdateProcessor(concurrent_updates))
+    # Same pool size ApplicationBuilder gives its own HTTPXRequest
+    request = InstrumentedRequest(request or HTTPXRequest(connection_pool_size=256))
+    app = (
+        builder.token(bot_token)
+        .request(request)
+        .post_init(__post_init__)
+        .post_shutdown(__post_shutdown__)
+        .build()
+    )
+    application_registration(app, lazy=lazy_handlers)
+    instrument_handlers(app)
+    instrument_application(
+        app,
+        limiter=UserRateLimiter.get_instance(),
+        window=RecentUpdates.get_instance(),
+        top_chats=int(os.environ.get("METRICS_TOP_CHATS", "0")),
+    )
+    return app
+
 def main():
     """Main function to start the bot."""
+    parser = argparse.ArgumentParser(description="Expenses tracker Telegram bot.")
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="run the startup phases without connecting to Telegram,"
+             " print their times and the import times, and exit",
+    )
+    args = parser.parse_args()
+
     # Read bot token at runtime to avoid import-time failures
     bot_token = os.environ["BOT_TOKEN"]
+    webhook = WebhookSettings.from_env()
+    fast_startup = fast_startup_from_env()
+    profile = StartupProfile()
 
     # Initialize database
     log.info("Initializing database...")
     try:
         # Run DB setup
-        persistence_registration()
+        with profile.phase("database"):
+            persistence_registration(check_revision=fast_startup)
         engine_name = DatabaseFactory.get_engine_name()
         log.info("Using database engine %s:", engine_name)
+        instrument_pool(AsyncDatabaseFactory.get_engine().sync_engine.pool, "async")
+        for position, engine in enumerate(AsyncDatabaseFactory.get_read_engines()):
+            instrument_pool(engine.sync_engine.pool, f"replica{position}")
     except ValueError as e:
         log.error("Database configuration error: %s", e)
         raise
 
     # Initialize Telegram bot
-    app = ApplicationBuilder().token(bot_token).build()
-    app = application_registration(app)
+    with profile.phase("application"):
+        app = build_application(bot_token, lazy_handlers=fast_startup)
+    log.info("Startup%s: %s", " (fast)" if fast_startup else "", profile.summary())
+
+    if args.profile_startup:
+        asyncio.run(persistence_shutdown())
+        log.info("Startup profile:\n%s", profile.render(measure_import_times()))
+        return
 
-    log.info("Bot initialized, starting polling...")
-    app.run_polling(allowed_updates=Update.ALL_TYPES)
+    if webhook:
+        log.info(
+            "Bot initialized, serving webhook on %s:%d/%s...",
+            webhook.listen, webhook.port, webhook.path,
+        )
+        app.run_webhook(**webhook.webhook_kwargs())
+    else:
+        log.info("Bot initialized, starting polling...")
+        app.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 if __name__ == "__main__":
     main()
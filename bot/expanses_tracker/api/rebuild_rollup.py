@@ -0,0 +1,50 @@
+"""
+Rebuild or verify the monthly_totals rollup from the expenses table.
+
+    python -m expanses_tracker.api.rebuild_rollup              # recompute the rollup
+    python -m expanses_tracker.api.rebuild_rollup --check-only # report drift, exit 1 if any
+
+On SQLite, recomputing the rollup rebuilds the search index too.
+"""
+
+import argparse
+import logging
+import sys
+
+from expanses_tracker.persistence.database_context.database import DatabaseFactory
+from expanses_tracker.persistence.repositories.monthly_totals_repository import (
+    MonthlyTotalsRepository,
+)
+from expanses_tracker.persistence.repositories.search_repository import SearchRepository
+
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger("expenses_tracker")
+
+def main() -> int:
+    """Rebuild the rollup, or only compare it with the expenses table when --check-only is given."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--check-only", action="store_true", help="only report mismatches, don't rebuild"
+    )
+    args = parser.parse_args()
+
+    DatabaseFactory.init_db()
+    with DatabaseFactory.get_session() as session:
+        if not args.check_only:
+            rows = MonthlyTotalsRepository.rebuild(session)
+            log.info("Rebuilt monthly_totals: %d rows", rows)
+            if indexed := SearchRepository.rebuild(session):
+                log.info("Rebuilt the search index: %d expenses", indexed)
+        mismatches = MonthlyTotalsRepository.verify(session)
+    for mismatch in mismatches:
+        log.warning("Rollup mismatch %s", mismatch)
+    if mismatches:
+        log.error("monthly_totals differs from expenses in %d rows", len(mismatches))
+        return 1
+    log.info("monthly_totals is consistent with expenses")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Startup time breakdown: wall time of the startup phases
+and `python -X importtime` of the entry point.
+"""
+
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+@dataclass(slots=True)
+class ImportTime:
+    """One line of `python -X importtime`, times in microseconds."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        """Top level package of the module."""
+        return self.module.split(".", 1)[0]
+
+def parse_import_times(output: str) -> list[ImportTime]:
+    """Parse the stderr of `python -X importtime`, skipping any other line."""
+    times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|", 2)
+        if not self_us.strip().isdigit():
+            # Header line
+            continue
+        module = name.rstrip()
+        times.append(ImportTime(
+            module=module.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=(len(module) - len(module.lstrip())) // 2,
+        ))
+    return times
+
+def measure_import_times(module: str = "expanses_tracker.api.main") -> list[ImportTime]:
+    """Import `module` in a fresh interpreter run with `-X importtime`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    return parse_import_times(result.stderr)
+
+@dataclass
+class StartupProfile:
+    """Wall time of the named startup phases, in the order they ran."""
+    phases: list[tuple[str, float]] = field(default_factory=list)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the body of the `with` block as phase `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    @property
+    def total(self) -> float:
+        """Seconds spent in all the phases."""
+        return sum(seconds for _, seconds in self.phases)
+
+    def summary(self) -> str:
+        """One line summary, e.g. `database 12.3 ms, handlers 4.5 ms`."""
+        return ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.phases)
+
+    def render(self, imports: Optional[list[ImportTime]] = None, top: int = 15) -> str:
+        """
+        Report of the phases and, if given, of the import times
+
+        Args:
+            imports: Output of measure_import_times()
+            top: Number of slowest modules and packages listed
+        """
+        lines = ["Startup phases:"]
+        lines += [f"  {name:<28}{seconds * 1000:>10.1f} ms" for name, seconds in self.phases]
+        lines.append(f"  {'total':<28}{self.total * 1000:>10.1f} ms")
+        if imports:
+            total_ms = sum(t.self_us for t in imports) / 1000
+            lines.append(f"\nImports: {len(imports)} modules, {total_ms:.1f} ms")
+            lines.append("Slowest imports of the entry point and its packages (cumulative):")
+            top_level = sorted(
+                (t for t in imports if t.depth <= 1), key=lambda t: t.cumulative_us, reverse=True
+            )
+            lines += [
+                f"  {t.module:<40}{t.cumulative_us / 1000:>10.1f} ms" for t in top_level[:top]
+            ]
+            by_package: dict[str, int] = defaultdict(int)
+            for t in imports:
+                by_package[t.package] += t.self_us
+            lines.append("Import time by package (self):")
+            slowest = sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+            lines += [f"  {package:<40}{us / 1000:>10.1f} ms" for package, us in slowest[:top]]
+        return "\n".join(lines)
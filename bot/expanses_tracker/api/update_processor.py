@@ -0,0 +1,141 @@
+"""Update processor running chats concurrently while keeping each chat's updates in order."""
+import asyncio
+import logging
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Hashable, Optional
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+log = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class ChatQueueStats:
+    """Queue metrics of one chat, or of every chat."""
+    pending: int = 0  # updates received and not finished yet, the running one included
+    processed: int = 0
+    total_wait: float = 0.0  # seconds spent waiting for earlier updates and a free slot
+    max_wait: float = 0.0
+    last_active: float = 0.0  # time.monotonic() of the last update received or finished
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes updates of different chats concurrently, up to `max_running` at once,
+    and updates of the same chat strictly one after the other, in arrival order.
+
+    Every update waits on the completion of the previous update of its chat
+    (a chain of futures), then on a free slot. Waiting updates don't take a
+    slot, so a busy chat never blocks the others. Updates without a chat are
+    not ordered.
+
+    Queue metrics are kept in total and per chat; a chat's metrics are
+    forgotten once it has had nothing pending for `idle_ttl` seconds.
+    """
+
+    def __init__(self, max_running: int, idle_ttl: float = 300):
+        if max_running < 1:
+            raise ValueError("max_running must be at least 1.")
+        # PTB acquires its semaphore before do_process_update: keep it from ever blocking,
+        # so updates enter do_process_update in arrival order. max_running is enforced below.
+        super().__init__(max_concurrent_updates=sys.maxsize)
+        self.max_running = max_running
+        self.idle_ttl = idle_ttl
+        self.__running = asyncio.Semaphore(max_running)
+        self.__tails: dict[Hashable, asyncio.Future] = {}
+        # Least recently active chat first
+        self.__stats: OrderedDict[Hashable, ChatQueueStats] = OrderedDict()
+        self.__totals = ChatQueueStats()
+
+    @staticmethod
+    def chat_key(update: object) -> Optional[Hashable]:
+        """Ordering key of an update: its chat ID, None if it has no chat."""
+        if isinstance(update, Update) and update.effective_chat:
+            return update.effective_chat.id
+        return None
+
+    def stats(self) -> dict[Hashable, ChatQueueStats]:
+        """Queue metrics per chat ID, of the chats active in the last `idle_ttl` seconds."""
+        return self.__stats
+
+    @property
+    def totals(self) -> ChatQueueStats:
+        """Queue metrics across every chat, forgotten ones included."""
+        return self.__totals
+
+    @property
+    def queue_depth(self) -> int:
+        """Updates received and not finished yet, across every chat."""
+        return self.__totals.pending
+
+    def __touch(self, key: Hashable, now: float) -> ChatQueueStats:
+        """Get the metrics of a chat, marked as the most recently active one."""
+        stats = self.__stats.get(key)
+        if stats is None:
+            stats = self.__stats[key] = ChatQueueStats()
+        else:
+            self.__stats.move_to_end(key)
+        stats.last_active = now
+        return stats
+
+    def __age_out(self, now: float) -> None:
+        """Forget the metrics of the chats idle for more than idle_ttl seconds."""
+        cutoff = now - self.idle_ttl
+        while self.__stats:
+            key, stats = next(iter(self.__stats.items()))
+            # A chat still running stays first until it finishes and moves to the end
+            if stats.pending or stats.last_active > cutoff:
+                break
+            del self.__stats[key]
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self.chat_key(update)
+        if key is None:
+            async with self.__running:
+                await coroutine
+            return
+
+        previous = self.__tails.get(key)
+        done = asyncio.get_running_loop().create_future()
+        self.__tails[key] = done
+        received = time.monotonic()
+        self.__age_out(received)
+        stats = self.__touch(key, received)
+        stats.pending += 1
+        self.__totals.pending += 1
+        try:
+            if previous is not None:
+                # shield: a cancelled waiter must not cancel the previous update's future
+                await asyncio.shield(previous)
+            async with self.__running:
+                wait = time.monotonic() - received
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+                self.__totals.total_wait += wait
+                self.__totals.max_wait = max(self.__totals.max_wait, wait)
+                await coroutine
+        except asyncio.CancelledError:
+            if hasattr(coroutine, "close"):
+                # Never started: don't leave an un-awaited coroutine behind
+                coroutine.close()
+            raise
+        finally:
+            stats.pending -= 1
+            stats.processed += 1
+            self.__totals.pending -= 1
+            self.__totals.processed += 1
+            self.__touch(key, time.monotonic())
+            if previous is not None and not previous.done():
+                # Cancelled while waiting: the next update still has to wait for the previous one
+                previous.add_done_callback(lambda _: done.done() or done.set_result(None))
+            else:
+                done.set_result(None)
+            if self.__tails.get(key) is done:
+                del self.__tails[key]
+
+    async def initialize(self) -> None:
+        """Nothing to allocate."""
+
+    async def shutdown(self) -> None:
+        """Nothing to free."""
@@ -1,16 +1,13 @@
 """Application registration for the Telegram bot."""
 
+import importlib
 import logging
 from telegram import Update
-from telegram.ext import ContextTypes, CommandHandler, MessageHandler, filters
-from expanses_tracker.application.features.add_or_edit_expense.generic_message_handler import (
-    generic_message_handler,
-)
-from expanses_tracker.application.features.delete_expense.delete_command_handler import (
-    delete_command_handler
+from telegram.ext import (
+    CallbackQueryHandler, ContextTypes, CommandHandler, MessageHandler, TypeHandler, filters
 )
 from expanses_tracker.application.utils.decorators import ensure_access_guard
-from expanses_tracker.application.features.buttons import setup_buttons_handlers
+from expanses_tracker.application.utils.update_dedupe import drop_redelivered_updates
 
 log = logging.getLogger(__name__)
 
@@ -26,12 +23,96 @@ async def __cmd_start__(update: Update, _: ContextTypes.DEFAULT_TYPE):
             "10 groceries food need\n"
             "25.50 restaurant food want 15/09\n"
             "100/2 shared bill\n\n"
+            "Use /report [month] for a monthly summary, e.g. /report 2025-09\n"
+            "Send a CSV file with /import as caption to load past expenses\n"
+            "Use /export [csv|jsonl] [chat] [from] [to] to download them\n"
+            "Use /search <terms> [from] [to] to find expenses by description\n"
+            "Use /list [category] [type] to browse them, newest first\n"
+            "Use /budget <category> <amount> to be warned at 80% and 100% of a monthly budget\n"
     )
 
-def application_registration(app):
-    """Register application handlers for the Telegram bot."""
+# Handler callbacks of the feature modules, as (module, function)
+__FEATURES__ = "expanses_tracker.application.features"
+__GENERIC_MESSAGE__ = (
+    f"{__FEATURES__}.add_or_edit_expense.generic_message_handler",
+    "generic_message_handler",
+)
+__DELETE__ = (f"{__FEATURES__}.delete_expense.delete_command_handler", "delete_command_handler")
+__REPORT__ = (f"{__FEATURES__}.report.report_command_handler", "report_command_handler")
+__IMPORT__ = (f"{__FEATURES__}.import_expenses.import_command_handler", "import_command_handler")
+__EXPORT__ = (f"{__FEATURES__}.export_expenses.export_command_handler", "export_command_handler")
+__SEARCH__ = (f"{__FEATURES__}.search.search_command_handler", "search_command_handler")
+__LIST__ = (f"{__FEATURES__}.list_expenses.list_command_handler", "list_command_handler")
+__BUDGET__ = (f"{__FEATURES__}.budget.budget_command_handler", "budget_command_handler")
+__BUTTONS__ = (f"{__FEATURES__}.buttons", "buttons_handler_router")
+# Setup functions of the background jobs, as (module, function)
+__JOB_SETUPS__ = (
+    (f"{__FEATURES__}.delete_expense.purge_sweeper", "setup_purge_sweeper"),
+    (f"{__FEATURES__}.add_or_edit_expense.category_suggestions", "setup_category_index"),
+)
+
+def __load_callback__(module_name: str, name: str):
+    return getattr(importlib.import_module(module_name), name)
+
+def lazy_callback(module_name: str, name: str):
+    """Handler callback importing `module_name` on the first update.
+
+    It then runs the module's `name` function.
+    """
+    callback = None
+
+    async def __lazy_callback(*args, **kwargs):
+        nonlocal callback
+        if callback is None:
+            callback = __load_callback__(module_name, name)
+        return await callback(*args, **kwargs)
+    # Same name as the real callback, for the logs and the handler metrics
+    __lazy_callback.__name__ = name
+    return __lazy_callback
+
+async def __setup_jobs__(context: ContextTypes.DEFAULT_TYPE) -> None:
+    # First job run: the bot is up, importing the job modules no longer delays it
+    for module_name, name in __JOB_SETUPS__:
+        __load_callback__(module_name, name)(context.application)
+
+def application_registration(app, lazy: bool = False):
+    """
+    Register application handlers for the Telegram bot
+
+    Args:
+        app: Application to register the handlers on
+        lazy: Import each feature module on its first update, and the background
+            jobs' modules once the bot is running, instead of now
+    """
+    # Feature modules use the repositories, which import this package's models:
+    # importing them here keeps `expanses_tracker.application` free of import cycles
+    callback = lazy_callback if lazy else __load_callback__
+    import_command_handler = callback(*__IMPORT__)
+    # Runs before every other group: a redelivered update stops here
+    app.add_handler(TypeHandler(Update, drop_redelivered_updates), group=-1)
     app.add_handler(CommandHandler("start", __cmd_start__))
-    app.add_handler(CommandHandler("delete", delete_command_handler))
-    app.add_handler(MessageHandler(~filters.COMMAND, generic_message_handler), group=1)
-    setup_buttons_handlers(app)
+    app.add_handler(CommandHandler("delete", callback(*__DELETE__)))
+    app.add_handler(CommandHandler("report", callback(*__REPORT__)))
+    app.add_handler(CommandHandler("search", callback(*__SEARCH__)))
+    app.add_handler(CommandHandler("list", callback(*__LIST__)))
+    app.add_handler(CommandHandler("budget", callback(*__BUDGET__)))
+    app.add_handler(CommandHandler("import", import_command_handler))
+    # Exports can take a while: don't hold back other updates
+    app.add_handler(CommandHandler("export", callback(*__EXPORT__), block=False))
+    app.add_handler(MessageHandler(
+        filters.Document.ALL & filters.CaptionRegex(r"^/import(@\w+)?(\s|$)"),
+        import_command_handler,
+    ))
+    app.add_handler(MessageHandler(~filters.COMMAND, callback(*__GENERIC_MESSAGE__)), group=1)
+    if lazy:
+        # The button handlers register themselves when the buttons package is imported
+        app.add_handler(CallbackQueryHandler(lazy_callback(*__BUTTONS__)))
+    else:
+        from expanses_tracker.application.features.buttons import setup_buttons_handlers
+        setup_buttons_handlers(app)
+    if lazy and app.job_queue is not None:
+        app.job_queue.run_once(__setup_jobs__, when=0, name="setup_jobs")
+    else:
+        for module_name, name in __JOB_SETUPS__:
+            __load_callback__(module_name, name)(app)
     return app
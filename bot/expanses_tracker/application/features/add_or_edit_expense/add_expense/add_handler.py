@@ -1,10 +1,15 @@
 """ Handler for adding a new expense based on user message input. """
 import logging
 from telegram import Message, Update
+from expanses_tracker.application.features.budget.budget_command_handler import reply_budget_alert
+from expanses_tracker.application.features.add_or_edit_expense.category_suggestions import (
+    fill_missing_tags,
+)
 from expanses_tracker.application.features.add_or_edit_expense.expense_notice import generate_notice
 from expanses_tracker.application.utils.message_parser import get_message_args
-from expanses_tracker.persistence.database_context.database import DatabaseFactory
-from expanses_tracker.persistence.repositories.repository import OutcomeRepository
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.write_behind import OutcomeWriteBehindQueue
 
 log = logging.getLogger(__name__)
 
@@ -31,24 +36,38 @@ async def add_handler(msg: Message, msg_id: int, update: Update):
         return
     chat_id = update.effective_chat.id
     user_id = update.effective_user.id if update.effective_user else 0
+    # In memory: no query for the guess
+    guessed = fill_missing_tags(arguments, chat_id, user_id)
 
     # Save outcome to database
-    with DatabaseFactory.get_session() as session:
-        try:
-            outcome = OutcomeRepository.create_outcome(
-                session=session,
-                outcome=arguments,
-                message_id=msg_id,
-                chat_id=chat_id,
-                user_id=user_id
-            )
-            if not update.message:
-                log.error("No message found in update.")
-                return
-            await generate_notice(update, msg_id, msg, outcome, update.message)
-        except Exception as e:
-            log.error("Error saving expense: %s", e)
-            await msg.reply_text(
-                    f"Error saving expense: {str(e)}",
-                    reply_to_message_id=msg.message_id
+    try:
+        if write_queue := OutcomeWriteBehindQueue.get_instance():
+            # Batched with the inserts of every other chat
+            outcome, created = await write_queue.submit(arguments, msg_id, chat_id, user_id)
+        else:
+            async with AsyncDatabaseFactory.get_session() as session:
+                outcome, created = await AsyncOutcomeRepository.create_outcome(
+                    session=session,
+                    outcome=arguments,
+                    message_id=msg_id,
+                    chat_id=chat_id,
+                    user_id=user_id
                 )
+        if not created:
+            # Redelivered after a restart: the expense was already saved and announced
+            log.info(
+                "Expense of message %d in chat %d already saved, no notice sent.", msg_id, chat_id
+            )
+            return
+        if not update.message:
+            log.error("No message found in update.")
+            return
+        await generate_notice(update, msg_id, msg, outcome, update.message, guessed)
+        # Already counted by the repository: no query
+        await reply_budget_alert(outcome, update.message)
+    except Exception as e:
+        log.error("Error saving expense: %s", e)
+        await msg.reply_text(
+                f"Error saving expense: {str(e)}",
+                reply_to_message_id=msg.message_id
+            )
@@ -0,0 +1,73 @@
+"""
+Category and type suggestions from the user's history:
+filled in when missing, first among the edit buttons.
+"""
+import logging
+import time
+from telegram.ext import Application, ContextTypes
+
+from expanses_tracker.application.models.outcome import OutcomeDto
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.category_index import CategoryIndex
+
+log = logging.getLogger(__name__)
+
+# Rows fetched per round trip while loading the index; other updates are handled between two batches
+LOAD_BATCH_SIZE = 2000
+
+def fill_missing_tags(outcome: OutcomeDto, chat_id: int, user_id: int) -> tuple[str, ...]:
+    """Fill in the category and type the message left out, if the history is confident.
+
+    Returns:
+        The fields filled in
+    """
+    index = CategoryIndex.get_instance()
+    if index is None or (outcome.category is not None and outcome.type is not None):
+        return ()
+    suggestion = index.suggest(chat_id, user_id, outcome.description)
+    guessed = []
+    if outcome.category is None and suggestion.category is not None:
+        outcome.category = suggestion.category
+        guessed.append("category")
+    if outcome.type is None and suggestion.type is not None:
+        outcome.type = suggestion.type
+        guessed.append("type")
+    return tuple(guessed)
+
+def ranked_choices(domain: list[str], suggested: list[str]) -> list[str]:
+    """Every value of `domain`, the suggested ones first."""
+    allowed = set(domain)
+    ranked = [value for value in suggested if value in allowed]
+    return ranked + [value for value in domain if value not in ranked]
+
+async def load_category_index_job(_: ContextTypes.DEFAULT_TYPE) -> int:
+    """Fill the shared index from the live expenses, streamed. Return how many were counted."""
+    index = CategoryIndex.get_instance()
+    if index is None:
+        return 0
+    start = time.perf_counter()
+    try:
+        async with AsyncDatabaseFactory.get_session() as session:
+            rows = AsyncOutcomeRepository.stream_tagged_rows(session, LOAD_BATCH_SIZE)
+            loaded = await index.load(rows)
+    except Exception:
+        log.exception("Loading the category index failed, suggestions only come from new expenses")
+        return 0
+    log.info(
+        "Category index: %d expenses, %d words in %.1fs",
+        loaded, len(index), time.perf_counter() - start,
+    )
+    return loaded
+
+def setup_category_index(app: Application) -> None:
+    """Load the index in the background once the bot is running.
+
+    Until then, suggestions come from new expenses only.
+    """
+    if CategoryIndex.get_instance() is None:
+        return
+    if app.job_queue is None:
+        log.warning("No job queue available, the category index starts empty.")
+        return
+    app.job_queue.run_once(load_category_index_job, when=0, name="load_category_index")
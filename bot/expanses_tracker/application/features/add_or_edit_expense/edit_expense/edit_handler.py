@@ -3,10 +3,11 @@ import logging
 from telegram import Message, Update
 
 from expanses_tracker.application.features.add_or_edit_expense.expense_notice import generate_notice
+from expanses_tracker.application.features.budget.budget_command_handler import reply_budget_alert
 from expanses_tracker.application.models.outcome import OutcomeSchema
 from expanses_tracker.application.utils.message_parser import get_message_args
-from expanses_tracker.persistence.database_context.database import DatabaseFactory
-from expanses_tracker.persistence.repositories.repository import OutcomeRepository
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
 
 log = logging.getLogger(__name__)
 
@@ -23,9 +24,9 @@ async def edit_handler(msg: Message, msg_id: int, update: Update):
     chat_id = update.effective_chat.id if update.effective_chat else 0
     user_id = update.effective_user.id if update.effective_user else 0
     # Update outcome in database
-    with DatabaseFactory.get_session() as session:
+    async with AsyncDatabaseFactory.get_session() as session:
         try:
-            outcome = OutcomeRepository.update_outcome(
+            outcome = await AsyncOutcomeRepository.update_outcome(
                 session=session,
                 updated_outcome=OutcomeSchema.model_construct(
                     msg_id=msg_id,
@@ -40,6 +41,7 @@ async def edit_handler(msg: Message, msg_id: int, update: Update):
             )
             if outcome:
                 await generate_notice(update, msg_id, msg, outcome, msg)
+                await reply_budget_alert(outcome, msg)
             else:
                 await msg.reply_text(
                     "No existing expense found to update.",
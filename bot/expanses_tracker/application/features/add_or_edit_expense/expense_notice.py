@@ -1,46 +1,74 @@
 import logging
+from datetime import datetime
+from typing import Collection
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Message, Update
 
 from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
 from expanses_tracker.application.models.outcome import OutcomeSchema
+from expanses_tracker.application.utils.callback_codec import encode_callback_data
 
 log = logging.getLogger(__name__)
 
-async def generate_notice(update: Update, msg_id: int, msg: Message, outcome: OutcomeSchema, message_to_reply: Message) -> Message | None:
-    # Get chat ID
-    if not update.effective_chat:
-        log.error("No effective chat found in update.")
-        return
-    chat_id = update.effective_chat.id
+def notice_keyboard(chat_id: int, msg_id: int) -> InlineKeyboardMarkup:
+    """Delete and edit buttons of the notice of an expense."""
     del_btn = InlineKeyboardButton(
         text="🗑️ Delete",
-        callback_data=ButtonDataDto(
+        callback_data=encode_callback_data(ButtonDataDto(
             action=ButtonActions.DELETE,
             chat_id=chat_id,
-            message_id=msg_id).model_dump_json(exclude_none=True,exclude_defaults=True,exclude_unset=True),
+            message_id=msg_id)),
     )
     edit_category_btn = InlineKeyboardButton(
         text="🏷️ Edit Category",
-        callback_data=ButtonDataDto(
+        callback_data=encode_callback_data(ButtonDataDto(
             action=ButtonActions.CATEGORY,
             chat_id=chat_id,
-            message_id=msg_id).model_dump_json(exclude_none=True,exclude_defaults=True,exclude_unset=True),
+            message_id=msg_id)),
     )
     edit_type_btn = InlineKeyboardButton(
         text="🧩 Edit Type",
-        callback_data=ButtonDataDto(
+        callback_data=encode_callback_data(ButtonDataDto(
             action=ButtonActions.TYPE,
             chat_id=chat_id,
-            message_id=msg_id).model_dump_json(exclude_none=True,exclude_defaults=True,exclude_unset=True),
+            message_id=msg_id)),
     )
-    notice = await message_to_reply.reply_text(
-        f"Expense saved at {msg.date}:\n"
+    return InlineKeyboardMarkup([[del_btn, edit_category_btn, edit_type_btn]])
+
+def notice_text(outcome: OutcomeSchema, saved_at: datetime, guessed: Collection[str] = ()) -> str:
+    """Summary of a saved expense.
+
+    The fields in `guessed` were filled in from the user's history.
+    """
+    def tag(field: str) -> str:
+        value = getattr(outcome, field)
+        if not value:
+            return "Not specified"
+        return f"{value} (guessed)" if field in guessed else value
+
+    return (
+        f"Expense saved at {saved_at}:\n"
         f"Amount: {outcome.amount}\n"
         f"Description: {outcome.description}\n"
-        f"Type: {outcome.type or 'Not specified'}\n"
-        f"Category: {outcome.category or 'Not specified'}\n"
-        f"Date: {outcome.date.strftime('%Y-%m-%d')}",
-        reply_markup=InlineKeyboardMarkup([[del_btn, edit_category_btn, edit_type_btn]]),
+        f"Type: {tag('type')}\n"
+        f"Category: {tag('category')}\n"
+        f"Date: {outcome.date.strftime('%Y-%m-%d')}"
+    )
+
+async def generate_notice(
+        update: Update,
+        msg_id: int,
+        msg: Message,
+        outcome: OutcomeSchema,
+        message_to_reply: Message,
+        guessed: Collection[str] = ()) -> Message | None:
+    # Get chat ID
+    if not update.effective_chat:
+        log.error("No effective chat found in update.")
+        return
+    chat_id = update.effective_chat.id
+    notice = await message_to_reply.reply_text(
+        notice_text(outcome, msg.date, guessed),
+        reply_markup=notice_keyboard(chat_id, msg_id),
         reply_to_message_id=msg.message_id
     )
     return notice
@@ -0,0 +1,112 @@
+"""Handles the /budget command and the alerts of the expenses going past a budget."""
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+from telegram import Message, Update
+from telegram.ext import ContextTypes
+
+from expanses_tracker.application.models.budget import BudgetSchema
+from expanses_tracker.application.models.constants import CATEGORIES
+from expanses_tracker.application.models.money import from_cents, to_amount, to_cents
+from expanses_tracker.application.models.outcome import OutcomeSchema
+from expanses_tracker.application.utils.decorators import ensure_access_guard
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.budget_repository import BudgetRepository
+from expanses_tracker.persistence.repositories.budget_tracker import BudgetAlert, BudgetTracker
+from expanses_tracker.persistence.repositories.monthly_totals_repository import year_month
+
+log = logging.getLogger(__name__)
+
+BUDGET_USAGE = (
+    "Usage: /budget <category> <monthly amount>, /budget <category> off to remove it, "
+    "/budget to see them\n"
+    f"Categories: {', '.join(CATEGORIES)}"
+)
+
+__OFF__ = ("off", "0")
+
+@dataclass(slots=True)
+class BudgetRequest:
+    """What /budget was asked for: no category lists the budgets, no limit removes one."""
+    category: Optional[str] = None
+    limit: Optional[Decimal] = None
+
+def parse_budget_args(args: list[str]) -> BudgetRequest:
+    """Parse the /budget arguments; raises ValueError with the usage if they aren't valid."""
+    if not args:
+        return BudgetRequest()
+    if len(args) != 2 or args[0].lower() not in CATEGORIES:
+        raise ValueError(BUDGET_USAGE)
+    category, amount = args[0].lower(), args[1].lower()
+    if amount in __OFF__:
+        return BudgetRequest(category)
+    try:
+        limit = to_amount(amount.replace(",", "."))
+    except ValueError:
+        raise ValueError(BUDGET_USAGE) from None
+    if limit <= 0:
+        raise ValueError(BUDGET_USAGE)
+    return BudgetRequest(category, limit)
+
+def budget_line(category: str, spent_cents: int, limit_cents: int) -> str:
+    """One budget and how much of it was spent, e.g. 'food: 85.00 of 100.00 (85%)'."""
+    spent, limit = from_cents(spent_cents), from_cents(limit_cents)
+    return f"{category}: {spent:.2f} of {limit:.2f} ({spent_cents * 100 // limit_cents}%)"
+
+def format_budgets(budgets: list[BudgetSchema], month: str) -> str:
+    """Render the budgets of a user and the spending of `month` as the /budget reply."""
+    if not budgets:
+        return "No budgets set.\n" + BUDGET_USAGE
+    tracker = BudgetTracker.get_instance()
+    lines = [f"Budgets for {month}:"]
+    for budget in budgets:
+        tracked = tracker.get(budget.chat_id, budget.user_id, budget.category)
+        spent = tracked.months.get(month, 0) if tracked else 0
+        lines.append("- " + budget_line(budget.category, spent, to_cents(budget.limit)))
+    return "\n".join(lines)
+
+def budget_alert_text(alert: BudgetAlert) -> str:
+    """Alert of a budget going past one of its thresholds."""
+    line = budget_line(alert.category, alert.spent_cents, alert.limit_cents)
+    if alert.percent >= 100:
+        return f"🚨 Over budget in {alert.year_month}! {line}"
+    return f"⚠️ {alert.percent}% of the budget reached in {alert.year_month}: {line}"
+
+async def reply_budget_alert(outcome: OutcomeSchema, message: Message) -> None:
+    """Reply to `message` if saving `outcome` made its category go past a budget threshold."""
+    if alert := BudgetTracker.get_instance().pop_alert(outcome):
+        await message.reply_text(budget_alert_text(alert), reply_to_message_id=message.message_id)
+
+@ensure_access_guard
+async def budget_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles /budget [<category> <amount>|off]."""
+    if not (msg := update.message) or not update.effective_chat or not update.effective_user:
+        return
+    try:
+        request = parse_budget_args(context.args or [])
+    except ValueError as e:
+        await msg.reply_text(str(e), reply_to_message_id=msg.message_id)
+        return
+    chat_id, user_id = update.effective_chat.id, update.effective_user.id
+    category, month = request.category, year_month(msg.date)
+    try:
+        async with AsyncDatabaseFactory.get_session() as session:
+            if category is None:
+                budgets = await BudgetRepository.get_budgets(session, chat_id, user_id)
+                text = format_budgets(budgets, month)
+            elif request.limit is None:
+                if await BudgetRepository.remove_budget(session, chat_id, user_id, category):
+                    text = f"Budget for {category} removed."
+                else:
+                    text = f"No budget for {category}."
+            else:
+                budget = await BudgetRepository.set_budget(
+                    session, chat_id, user_id, category, request.limit
+                )
+                text = "Budget set.\n" + format_budgets([budget], month)
+    except Exception as e:
+        log.error("Error updating budget: %s", e)
+        await msg.reply_text(f"Error updating budget: {str(e)}", reply_to_message_id=msg.message_id)
+        return
+    await msg.reply_text(text, reply_to_message_id=msg.message_id)
@@ -1,12 +1,8 @@
 """Buttons feature package."""
 import logging
-from pydantic_core import ValidationError
 from telegram import Message, Update
 from telegram.ext import CallbackQueryHandler, ContextTypes
-from expanses_tracker.application.models.button_data_dto import (
-    ButtonCallbacksRegistry,
-    ButtonDataDto
-)
+from expanses_tracker.application.models.button_data_dto import ButtonCallbacksRegistry
 from expanses_tracker.application.features.buttons.edit_button_handler import (
     edit_category_button_handler
 )
@@ -16,6 +12,16 @@ from expanses_tracker.application.features.buttons.restore_button_handler import
 from expanses_tracker.application.features.buttons.delete_button_handler import (
     delete_button_handler
 )
+from expanses_tracker.application.features.buttons.search_page_button_handler import (
+    search_page_button_handler
+)
+from expanses_tracker.application.features.buttons.list_page_button_handler import (
+    list_page_button_handler
+)
+from expanses_tracker.application.utils.callback_codec import (
+    decode_callback_data,
+    peek_callback_action,
+)
 from expanses_tracker.application.utils.decorators import ensure_access_guard
 
 log = logging.getLogger(__name__)
@@ -24,6 +30,8 @@ buttons_handlers = [
     delete_button_handler.__name__,
     restore_button_handler.__name__,
     edit_category_button_handler.__name__,
+    search_page_button_handler.__name__,
+    list_page_button_handler.__name__,
 ]
 
 def setup_buttons_handlers(app):
@@ -31,28 +39,35 @@ def setup_buttons_handlers(app):
     # The imports above will register the handlers via decorators
     for handler in buttons_handlers:
         log.info("Button handler registered: %s", handler)
-    app.add_handler(CallbackQueryHandler(__buttons_handler_router))
+    app.add_handler(CallbackQueryHandler(buttons_handler_router))
 
 @ensure_access_guard
-async def __buttons_handler_router(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+async def buttons_handler_router(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Dispatch a callback query to the handler registered for its action."""
     query = update.callback_query
     if query is None or query.data is None:
         log.error("No callback query or data in update: %s", update)
         return
     await query.answer()
-    try:
-        data = ButtonDataDto.model_validate_json(query.data)
-    except ValidationError:
+    # Dispatch on the action prefix, the ids are only decoded for a known handler
+    action = peek_callback_action(query.data)
+    if action is None:
         log.error("Invalid callback data: %s", query.data)
         return
-    if data.action in ButtonCallbacksRegistry.BTN_CALLBACKS:
-        handler = ButtonCallbacksRegistry.BTN_CALLBACKS[data.action]
-        await handler(query, data, update, context)
-    else:
-        log.error("Unknown action. Data: %s", data)
+    handler = ButtonCallbacksRegistry.BTN_CALLBACKS.get(action)
+    if handler is None:
+        log.error("Unknown action. Data: %s", query.data)
         if query.message and isinstance(query.message, Message):
-            await query.message.reply_text(f"Unknown action. Data: {data}")
+            await query.message.reply_text(f"Unknown action. Data: {query.data}")
+        return
+    try:
+        data = decode_callback_data(query.data)
+    except ValueError:
+        log.error("Invalid callback data: %s", query.data)
+        return
+    await handler(query, data, update, context)
 
 __all__ = [
     setup_buttons_handlers.__name__,
+    buttons_handler_router.__name__,
 ]
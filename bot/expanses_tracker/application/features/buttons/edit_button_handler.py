@@ -1,26 +1,91 @@
 """Handler for the "edit" button in the outcome editing feature."""
 import logging
-from telegram import CallbackQuery, Update
+from telegram import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message, Update
 from telegram.ext import ContextTypes
+
+from expanses_tracker.application.features.add_or_edit_expense.category_suggestions import (
+    ranked_choices,
+)
+from expanses_tracker.application.features.add_or_edit_expense.expense_notice import (
+    notice_keyboard,
+    notice_text,
+)
+from expanses_tracker.application.features.budget.budget_command_handler import reply_budget_alert
 from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
+from expanses_tracker.application.models.constants import CATEGORIES, TYPES
+from expanses_tracker.application.utils.callback_codec import encode_callback_data
 from expanses_tracker.application.utils.decorators import button_callback
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.category_index import CategoryIndex, Suggestion
 
 log = logging.getLogger(__name__)
 
+CHOICES_PER_ROW = 3
+
+def choices_keyboard(
+    action: ButtonActions, chat_id: int, msg_id: int, choices: list[str]
+) -> InlineKeyboardMarkup:
+    """One button per choice, in order, setting it on the expense when tapped."""
+    buttons = [
+        InlineKeyboardButton(
+            text=choice,
+            callback_data=encode_callback_data(ButtonDataDto(
+                action=action, chat_id=chat_id, message_id=msg_id, value=choice
+            )),
+        )
+        for choice in choices
+    ]
+    rows = range(0, len(buttons), CHOICES_PER_ROW)
+    return InlineKeyboardMarkup([buttons[i:i + CHOICES_PER_ROW] for i in rows])
+
+async def __edit_tag(
+    query: CallbackQuery, data: ButtonDataDto, update: Update, field: str, domain: list[str]
+):
+    """Show the choices of `field`, the user's likeliest first, or set the one in the button."""
+    notice = query.message
+    if not isinstance(notice, Message) or not update.effective_user:
+        log.error("No message found in callback query: %s", query)
+        return
+    user_id = update.effective_user.id
+    async with AsyncDatabaseFactory.get_session() as session:
+        # Ownership is part of the key: another user's tap finds nothing
+        outcome = await AsyncOutcomeRepository.get_outcome_by_id(
+            session, data.message_id, data.chat_id, user_id
+        )
+        if outcome is None:
+            return
+        if data.value is None:
+            index = CategoryIndex.get_instance()
+            suggestion = Suggestion()
+            if index:
+                suggestion = index.suggest(data.chat_id, user_id, outcome.description)
+            suggested = suggestion.categories if field == "category" else suggestion.types
+            await query.edit_message_reply_markup(choices_keyboard(
+                data.action, data.chat_id, data.message_id, ranked_choices(domain, suggested)
+            ))
+            return
+        if data.value not in domain:
+            log.error("Invalid %s in button: %s", field, data)
+            return
+        updated = await AsyncOutcomeRepository.update_outcome(
+            session, outcome.model_copy(update={field: data.value})
+        )
+    if updated is None:
+        return
+    saved_at = notice.reply_to_message.date if notice.reply_to_message else notice.date
+    await query.edit_message_text(
+        notice_text(updated, saved_at), reply_markup=notice_keyboard(data.chat_id, data.message_id)
+    )
+    # A new category can take its budget past a threshold
+    await reply_budget_alert(updated, notice)
+
 @button_callback(ButtonActions.CATEGORY)
 async def edit_category_button_handler(query: CallbackQuery, data: ButtonDataDto, update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle the "edit category" button press."""
-    # TODO ask for the category with buttons. When clicked, update the value of the category for the entry.
-    log.debug("Query: %s", query)
-    log.debug("Update: %s", update)
-    log.debug("Context: %s", context)
-    # await query.edit_message_text(text=f"Selected category: {data.value}")
+    """Handle the "edit category" button press, and the press of a category."""
+    await __edit_tag(query, data, update, "category", CATEGORIES)
 
 @button_callback(ButtonActions.TYPE)
 async def edit_type_button_handler(query: CallbackQuery, data: ButtonDataDto, update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle the "edit type" button press."""
-    # TODO ask for the type with buttons. When clicked, update the value of the type for the entry.
-    log.debug("Query: %s", query)
-    log.debug("Update: %s", update)
-    log.debug("Context: %s", context)
-    # await query.edit_message_text(text=f"Selected type: {data.value}")
+    """Handle the "edit type" button press, and the press of a type."""
+    await __edit_tag(query, data, update, "type", TYPES)
@@ -0,0 +1,42 @@
+"""Handler for the previous/next page buttons of /list."""
+import logging
+from telegram import CallbackQuery, Message, Update
+from telegram.ext import ContextTypes
+
+from expanses_tracker.application.features.list_expenses.list_command_handler import (
+    decode_list_cursor,
+    list_page,
+    parse_list_args,
+)
+from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
+from expanses_tracker.application.utils.decorators import button_callback
+
+log = logging.getLogger(__name__)
+
+@button_callback(ButtonActions.LIST_PAGE)
+async def list_page_button_handler(
+    query: CallbackQuery, data: ButtonDataDto, update: Update, context: ContextTypes.DEFAULT_TYPE
+):
+    """Replace the page with the one after the cursor in the button.
+
+    The filters are the ones of the /list message.
+    """
+    page = query.message
+    if not isinstance(page, Message) or not update.effective_user:
+        log.error("No message found in callback query: %s", query)
+        return
+    command = page.reply_to_message
+    # Only the user who listed can turn the pages: the expenses are theirs
+    if (command is None or command.message_id != data.message_id or not command.text
+            or not command.from_user or command.from_user.id != update.effective_user.id):
+        return
+    try:
+        cursor = decode_list_cursor(data.value or "")
+        request = parse_list_args(command.text.split()[1:])
+        text, keyboard = await list_page(
+            request, command, data.chat_id, update.effective_user.id, cursor
+        )
+    except ValueError as e:
+        log.error("Invalid list page button %s: %s", data, e)
+        return
+    await query.edit_message_text(text, reply_markup=keyboard)
@@ -2,11 +2,12 @@
 import logging
 from telegram import CallbackQuery, Message, Update
 from telegram.ext import ContextTypes
+from expanses_tracker.application.features.delete_expense.undo_countdown import UndoCountdownTicker
 from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
 from expanses_tracker.application.models.constants import UNDO_GRACE_SECONDS
 from expanses_tracker.application.utils.decorators import button_callback
-from expanses_tracker.persistence.database_context.database import DatabaseFactory
-from expanses_tracker.persistence.repositories.repository import OutcomeRepository
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
 
 log = logging.getLogger(__name__)
 
@@ -20,15 +21,16 @@ async def restore_button_handler(query: CallbackQuery, data: ButtonDataDto, upda
     if not query.message or not isinstance(query.message, Message):
         log.error("No message found in callback query: %s", query)
         return
-    with DatabaseFactory.get_session() as session:
+    async with AsyncDatabaseFactory.get_session() as session:
         try:
-            restored = OutcomeRepository.restore(
+            restored = await AsyncOutcomeRepository.restore(
                 session,
                 chat_id=chat_id,
                 message_id=msg_id,
                 user_id=uid,
                 undo_grace_seconds=UNDO_GRACE_SECONDS)
             if restored:
+                UndoCountdownTicker.cancel(query.message.chat_id, query.message.message_id)
                 await query.message.reply_text("Restored", reply_to_message_id=msg_id)
                 try:
                     if query.message:
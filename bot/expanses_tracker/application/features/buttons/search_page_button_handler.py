@@ -0,0 +1,41 @@
+"""Handler for the previous/next page buttons of /search results."""
+import logging
+from telegram import CallbackQuery, Message, Update
+from telegram.ext import ContextTypes
+
+from expanses_tracker.application.features.search.search_command_handler import (
+    parse_search_args,
+    search_page,
+)
+from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
+from expanses_tracker.application.utils.decorators import button_callback
+
+log = logging.getLogger(__name__)
+
+@button_callback(ButtonActions.SEARCH_PAGE)
+async def search_page_button_handler(
+    query: CallbackQuery, data: ButtonDataDto, update: Update, context: ContextTypes.DEFAULT_TYPE
+):
+    """Replace the results with the page in the button.
+
+    The terms of the /search message are searched again.
+    """
+    results = query.message
+    if not isinstance(results, Message) or not update.effective_user:
+        log.error("No message found in callback query: %s", query)
+        return
+    command = results.reply_to_message
+    # Only the user who searched can turn the pages: the results are theirs
+    if (command is None or command.message_id != data.message_id or not command.text
+            or not command.from_user or command.from_user.id != update.effective_user.id):
+        return
+    try:
+        page = max(int(data.value or 0), 0)
+        request = parse_search_args(command.text.split()[1:], command.date)
+        text, keyboard = await search_page(
+            request, command, data.chat_id, update.effective_user.id, page
+        )
+    except ValueError as e:
+        log.error("Invalid search page button %s: %s", data, e)
+        return
+    await query.edit_message_text(text, reply_markup=keyboard)
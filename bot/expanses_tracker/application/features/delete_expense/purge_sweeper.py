@@ -0,0 +1,46 @@
+"""Periodic sweeper hard deleting expenses whose undo window elapsed."""
+import logging
+from telegram.ext import Application, ContextTypes
+
+from expanses_tracker.application.models.constants import (
+    PURGE_BATCH_SIZE,
+    PURGE_INTERVAL_SECONDS,
+    UNDO_GRACE_SECONDS,
+)
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+
+log = logging.getLogger(__name__)
+
+async def purge_expired_job(_: ContextTypes.DEFAULT_TYPE) -> int:
+    """Purge every expense soft deleted longer than the undo window ago.
+
+    Returns:
+        How many expenses were purged
+    """
+    try:
+        async with AsyncDatabaseFactory.get_session() as session:
+            purged = await AsyncOutcomeRepository.purge_expired(
+                session, UNDO_GRACE_SECONDS, PURGE_BATCH_SIZE
+            )
+    except Exception:
+        log.exception("Purge of expired soft deleted expenses failed")
+        return 0
+    if purged:
+        log.info("Purged %d expired soft deleted expenses", purged)
+    else:
+        log.debug("No expired soft deleted expenses to purge")
+    return purged
+
+def setup_purge_sweeper(app: Application) -> None:
+    """Run the sweeper right away, to catch up after downtime, and then periodically."""
+    # Rows whose in-memory countdown was lost in a restart are only removed from here
+    if app.job_queue is None:
+        log.warning("No job queue available, expired soft deleted expenses won't be purged.")
+        return
+    app.job_queue.run_repeating(
+        purge_expired_job,
+        interval=PURGE_INTERVAL_SECONDS,
+        first=0,
+        name="purge_expired",
+    )
@@ -0,0 +1,174 @@
+"""Single ticker driving the countdown of every pending "Tap to restore" notice."""
+import asyncio
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Message
+from telegram.ext import ContextTypes, Job
+
+from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
+from expanses_tracker.application.utils.callback_codec import encode_callback_data
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+
+log = logging.getLogger(__name__)
+
+def restore_button(chat_id: int, message_id: int) -> InlineKeyboardButton:
+    """Build the Restore button of a deletion notice."""
+    return InlineKeyboardButton(
+        text="↩️ Restore",
+        callback_data=encode_callback_data(ButtonDataDto(
+            action=ButtonActions.RESTORE,
+            chat_id=chat_id,
+            message_id=message_id)),
+    )
+
+def countdown_text(remaining: int) -> str:
+    """Text of a deletion notice with `remaining` seconds left to restore."""
+    return f"Deleted. Tap to restore ({remaining}s)."
+
+@dataclass(slots=True)
+class PendingUndo:
+    """A deletion notice waiting for its grace window to elapse."""
+    chat_id: int
+    notice_id: int
+    message_id: int
+    user_id: int
+    deadline: float
+    shown: int
+
+class UndoCountdownTicker:
+    """
+    Owns every pending deletion notice and refreshes them from one repeating job.
+
+    Far from the deadline the countdown moves in COARSE_STEP second steps and
+    only in the last FINE_SECONDS it is refreshed every second, so each notice
+    costs a handful of edits instead of one per second. Edits of the same tick
+    are sent concurrently, at most MAX_CONCURRENT_EDITS at a time.
+    """
+
+    JOB_NAME = "undo_countdown"
+    TICK_SECONDS = 1
+    COARSE_STEP = int(os.environ.get("UNDO_COUNTDOWN_COARSE_STEP", "5"))
+    FINE_SECONDS = int(os.environ.get("UNDO_COUNTDOWN_FINE_SECONDS", "5"))
+    MAX_CONCURRENT_EDITS = int(os.environ.get("UNDO_COUNTDOWN_MAX_CONCURRENT_EDITS", "20"))
+
+    __pending: dict[tuple[int, int], PendingUndo] = {}
+    __job: Optional[Job] = None
+
+    @classmethod
+    def displayed_seconds(cls, remaining: float) -> int:
+        """Countdown value to show with `remaining` seconds left."""
+        seconds = math.ceil(remaining)
+        if seconds <= cls.FINE_SECONDS:
+            return seconds
+        return math.ceil(seconds / cls.COARSE_STEP) * cls.COARSE_STEP
+
+    @classmethod
+    def pending_count(cls) -> int:
+        """Number of notices still counting down."""
+        return len(cls.__pending)
+
+    @classmethod
+    def register(
+            cls,
+            context: ContextTypes.DEFAULT_TYPE,
+            notice: Message,
+            message_id: int,
+            user_id: int,
+            grace_seconds: int) -> None:
+        """Start counting down a freshly posted deletion notice."""
+        cls.__pending[(notice.chat_id, notice.message_id)] = PendingUndo(
+            chat_id=notice.chat_id,
+            notice_id=notice.message_id,
+            message_id=message_id,
+            user_id=user_id,
+            deadline=time.monotonic() + grace_seconds,
+            shown=grace_seconds,
+        )
+        if cls.__job is None or cls.__job.removed:
+            assert context.job_queue is not None
+            cls.__job = context.job_queue.run_repeating(
+                cls.__tick,
+                interval=cls.TICK_SECONDS,
+                first=cls.TICK_SECONDS,
+                name=cls.JOB_NAME,
+            )
+
+    @classmethod
+    def cancel(cls, chat_id: int, notice_id: int) -> bool:
+        """Stop counting down a notice (e.g. after a restore). Return True if it was pending."""
+        return cls.__pending.pop((chat_id, notice_id), None) is not None
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget every pending notice and the job.
+
+        E.g. once the application that ran it stopped.
+        """
+        cls.__pending.clear()
+        cls.__job = None
+
+    @classmethod
+    async def __tick(cls, context: ContextTypes.DEFAULT_TYPE) -> None:
+        now = time.monotonic()
+        expired: list[PendingUndo] = []
+        to_edit: list[PendingUndo] = []
+        for key, entry in list(cls.__pending.items()):
+            remaining = entry.deadline - now
+            if remaining <= 0:
+                expired.append(cls.__pending.pop(key))
+                continue
+            shown = cls.displayed_seconds(remaining)
+            if shown != entry.shown:
+                entry.shown = shown
+                to_edit.append(entry)
+
+        semaphore = asyncio.Semaphore(cls.MAX_CONCURRENT_EDITS)
+        await asyncio.gather(
+            *(cls.__edit_countdown(context, entry, semaphore) for entry in to_edit),
+            *(cls.__expire(context, entry, semaphore) for entry in expired),
+        )
+        if not cls.__pending and cls.__job is not None:
+            cls.__job.schedule_removal()
+            cls.__job = None
+
+    @staticmethod
+    async def __edit_countdown(
+        context: ContextTypes.DEFAULT_TYPE, entry: PendingUndo, semaphore: asyncio.Semaphore
+    ) -> None:
+        async with semaphore:
+            try:
+                await context.bot.edit_message_text(
+                    countdown_text(entry.shown),
+                    chat_id=entry.chat_id,
+                    message_id=entry.notice_id,
+                    reply_markup=InlineKeyboardMarkup(
+                        [[restore_button(entry.chat_id, entry.message_id)]]
+                    ),
+                )
+            except Exception as e:
+                log.debug("Countdown update skipped: %s", e)
+
+    @staticmethod
+    async def __expire(
+        context: ContextTypes.DEFAULT_TYPE, entry: PendingUndo, semaphore: asyncio.Semaphore
+    ) -> None:
+        async with semaphore:
+            try:
+                async with AsyncDatabaseFactory.get_session() as session:
+                    deleted = await AsyncOutcomeRepository.delete_outcome(
+                        session, entry.message_id, entry.chat_id, entry.user_id
+                    )
+                if deleted:
+                    await context.bot.edit_message_text(
+                        "Deleted.", chat_id=entry.chat_id, message_id=entry.notice_id
+                    )
+                else:
+                    log.debug("Outcome not found.")
+            except Exception as e:
+                # Fine if it's already gone or not deletable
+                log.debug("Notice delete skipped: %s", e)
@@ -0,0 +1,70 @@
+"""Handles the /export command sending expenses as a CSV or JSON Lines document."""
+import io
+import logging
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from expanses_tracker.application.features.export_expenses.outcome_export import (
+    gzip_if_large,
+    new_spool,
+    parse_export_args,
+    write_export,
+)
+from expanses_tracker.application.models.constants import EXPORT_BATCH_SIZE
+from expanses_tracker.application.utils.decorators import ensure_access_guard
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+
+log = logging.getLogger(__name__)
+
+# Largest document bots can upload
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+
+@ensure_access_guard
+async def export_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles /export [csv|jsonl] [chat] [from] [to]."""
+    if not (msg := update.message) or not update.effective_chat or not update.effective_user:
+        return
+    try:
+        request = parse_export_args(context.args or [], msg.date)
+    except ValueError as e:
+        await msg.reply_text(str(e), reply_to_message_id=msg.message_id)
+        return
+    chat_id, user_id = update.effective_chat.id, update.effective_user.id
+    spool = new_spool()
+    try:
+        async with AsyncDatabaseFactory.get_read_session(chat_id, user_id) as session:
+            rows = AsyncOutcomeRepository.stream_outcome_rows(
+                session,
+                chat_id,
+                None if request.whole_chat else user_id,
+                request.start,
+                request.end,
+                batch_size=EXPORT_BATCH_SIZE,
+            )
+            count = await write_export(rows, request.format, spool)
+        if count == 0:
+            await msg.reply_text("No expenses to export.", reply_to_message_id=msg.message_id)
+            return
+        spool, gzipped = gzip_if_large(spool)
+        if spool.seek(0, io.SEEK_END) > MAX_UPLOAD_BYTES:
+            await msg.reply_text(
+                "Export too large to send, narrow the date range.",
+                reply_to_message_id=msg.message_id,
+            )
+            return
+        spool.seek(0)
+        filename = f"expenses.{request.format}" + (".gz" if gzipped else "")
+        await msg.reply_document(
+            document=spool,
+            filename=filename,
+            caption=f"{count} expenses",
+            reply_to_message_id=msg.message_id,
+        )
+    except Exception as e:
+        log.exception("Export failed")
+        await msg.reply_text(
+            f"Error exporting expenses: {str(e)}", reply_to_message_id=msg.message_id
+        )
+    finally:
+        spool.close()
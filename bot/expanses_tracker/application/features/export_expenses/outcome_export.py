@@ -0,0 +1,129 @@
+"""Streaming export of expenses as CSV or JSON Lines."""
+import csv
+import gzip
+import io
+import json
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterable, BinaryIO, Optional
+from sqlalchemy import Row
+
+from expanses_tracker.application.models.constants import (
+    EXPORT_GZIP_THRESHOLD_BYTES,
+    EXPORT_SPOOL_MAX_BYTES,
+)
+from expanses_tracker.application.models.money import from_cents
+from expanses_tracker.application.utils.message_parser import parse_date_argument
+
+# Same names as the /import columns, so an export can be imported back
+EXPORT_COLUMNS = (
+    "msg_id", "chat_id", "user_id", "date", "amount", "description", "category", "type"
+)
+# Position of the amount in the streamed rows, which hold it in cents
+__AMOUNT_INDEX__ = EXPORT_COLUMNS.index("amount")
+FORMATS = ("csv", "jsonl")
+
+EXPORT_USAGE = (
+    "Usage: /export [csv|jsonl] [chat] [from] [to]\n"
+    "chat exports every user of the chat, dates are d/m/yyyy or yyyy-mm-dd (both included)."
+)
+
+@dataclass(slots=True)
+class ExportRequest:
+    """What /export was asked for."""
+    format: str = "csv"
+    whole_chat: bool = False
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None  # excluded
+
+def parse_export_args(args: list[str], today: datetime) -> ExportRequest:
+    """Parse the /export arguments; raises ValueError with the usage on unknown ones."""
+    request = ExportRequest()
+    dates = []
+    for token in args:
+        if token.lower() in FORMATS:
+            request.format = token.lower()
+        elif token.lower() == "chat":
+            request.whole_chat = True
+        elif (date := parse_date_argument(token, today)) is not None and len(dates) < 2:
+            dates.append(date)
+        else:
+            raise ValueError(EXPORT_USAGE)
+    if dates:
+        request.start = dates[0]
+    if len(dates) == 2:
+        request.end = dates[1] + timedelta(days=1)
+    return request
+
+def __json_default__(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        # Two decimal places: the float's shortest repr is exact
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def __export_values__(row: Row) -> list:
+    values = list(row)
+    values[__AMOUNT_INDEX__] = from_cents(values[__AMOUNT_INDEX__])
+    return values
+
+async def write_export(rows: AsyncIterable[Row], fmt: str, out: BinaryIO) -> int:
+    """
+    Write rows to out as UTF-8 CSV (with header) or JSON Lines, one row at a time.
+
+    Rows hold the EXPORT_COLUMNS with the amount in cents, as streamed by
+    AsyncOutcomeRepository.stream_outcome_rows; the amount is written with two decimals.
+
+    Returns:
+        Number of rows written
+    """
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    count = 0
+    try:
+        if fmt == "csv":
+            writer = csv.writer(text)
+            writer.writerow(EXPORT_COLUMNS)
+            async for row in rows:
+                writer.writerow(
+                    value.isoformat() if isinstance(value, datetime) else value
+                    for value in __export_values__(row)
+                )
+                count += 1
+        else:
+            async for row in rows:
+                values = dict(zip(EXPORT_COLUMNS, __export_values__(row)))
+                text.write(json.dumps(values, default=__json_default__, ensure_ascii=False))
+                text.write("\n")
+                count += 1
+    finally:
+        # Leave `out` open for the caller
+        text.detach()
+    return count
+
+def new_spool() -> BinaryIO:
+    """Buffer kept in memory up to EXPORT_SPOOL_MAX_BYTES, then moved to a temporary file."""
+    return SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_BYTES, mode="w+b")
+
+def gzip_if_large(
+    spool: BinaryIO, threshold: int = EXPORT_GZIP_THRESHOLD_BYTES
+) -> tuple[BinaryIO, bool]:
+    """
+    Gzip the spool's content into a new spool when it is larger than threshold.
+
+    Returns:
+        The buffer to send, rewound, and whether it is gzipped; the spool is closed if replaced
+    """
+    size = spool.seek(0, io.SEEK_END)
+    spool.seek(0)
+    if size <= threshold:
+        return spool, False
+    compressed = new_spool()
+    with gzip.GzipFile(fileobj=compressed, mode="wb") as gz:
+        shutil.copyfileobj(spool, gz)
+    spool.close()
+    compressed.seek(0)
+    return compressed, True
@@ -0,0 +1,176 @@
+"""Streaming import of historical expenses from CSV files."""
+import csv
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Iterator, Optional
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from expanses_tracker.application.models.constants import (
+    CATEGORIES,
+    IMPORT_CHUNK_SIZE,
+    IMPORT_PROGRESS_INTERVAL_SECONDS,
+    TYPES,
+)
+from expanses_tracker.application.models.outcome import OutcomeDto
+from expanses_tracker.application.utils.message_parser import parse_amount, parse_date
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+
+log = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ("amount", "description", "date")
+OPTIONAL_COLUMNS = ("category", "type")
+DELIMITERS = (",", ";", "\t")
+MAX_DESCRIPTION_LENGTH = 255  # expenses.description column size
+MAX_REJECTED_SHOWN = 20
+
+__CATEGORIES__ = frozenset(CATEGORIES)
+__TYPES__ = frozenset(TYPES)
+
+@dataclass(slots=True)
+class ImportReport:
+    """Running counters of an import; keeps the first rejected rows only, so it stays small."""
+    imported: int = 0
+    rejected: int = 0
+    rejected_samples: list[str] = field(default_factory=list)
+
+    def reject(self, line: int, reason: str) -> None:
+        """Count a rejected row, remembering why for the first MAX_REJECTED_SHOWN ones."""
+        self.rejected += 1
+        if len(self.rejected_samples) < MAX_REJECTED_SHOWN:
+            self.rejected_samples.append(f"line {line}: {reason}")
+
+    def progress(self) -> str:
+        """One line progress text."""
+        return f"Importing... {self.imported} imported, {self.rejected} rejected."
+
+    def summary(self) -> str:
+        """Final report text."""
+        lines = [f"Import done: {self.imported} expenses imported, {self.rejected} rows rejected."]
+        if self.rejected_samples:
+            lines += ["", "Rejected rows:", *self.rejected_samples]
+            if self.rejected > len(self.rejected_samples):
+                lines.append(f"... and {self.rejected - len(self.rejected_samples)} more")
+        return "\n".join(lines)
+
+def __parse_row_date__(value: str, default_date: datetime) -> datetime:
+    value = value.strip()
+    if not value:
+        raise ValueError("missing date")
+    parsed = parse_date(value, default_date)
+    if parsed is not None:
+        return parsed
+    try:
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+    except ValueError:
+        raise ValueError(f"invalid date '{value}', use d/m/yyyy or yyyy-mm-dd") from None
+
+def __parse_row_domain__(value: str, domain: frozenset[str], name: str) -> Optional[str]:
+    value = value.strip().lower()
+    if value and value not in domain:
+        raise ValueError(f"unknown {name} '{value}'")
+    return value or None
+
+def __parse_row__(row: dict[str, str], default_date: datetime) -> OutcomeDto:
+    description = " ".join(row["description"].split())
+    if not description:
+        raise ValueError("missing description")
+    if len(description) > MAX_DESCRIPTION_LENGTH:
+        raise ValueError(f"description longer than {MAX_DESCRIPTION_LENGTH} characters")
+    try:
+        return OutcomeDto(
+            amount=parse_amount(row["amount"].strip()),
+            description=description,
+            category=__parse_row_domain__(row.get("category", ""), __CATEGORIES__, "category"),
+            type=__parse_row_domain__(row.get("type", ""), __TYPES__, "type"),
+            date=__parse_row_date__(row["date"], default_date),
+        )
+    except ValidationError as e:
+        raise ValueError(e.errors()[0]["msg"]) from None
+
+def parse_csv_rows(
+    lines: Iterable[str], default_date: datetime
+) -> Iterator[tuple[int, OutcomeDto | str]]:
+    """
+    Lazily parse CSV lines into outcomes.
+
+    The first line is the header: `amount`, `description` and `date` columns
+    are required, `category` and `type` optional, in any order. The delimiter
+    (comma, semicolon or tab) is the one the header uses most. Amounts, dates,
+    categories and types follow the message format; dates may also be ISO.
+
+    Yields:
+        (line number, OutcomeDto) for valid rows, (line number, reason) for rejected ones
+
+    Raises:
+        ValueError: if the header is missing or lacks a required column
+    """
+    lines = iter(lines)
+    header_line = next(lines, "")
+    delimiter = max(DELIMITERS, key=header_line.count)
+    reader = csv.reader(itertools.chain([header_line], lines), delimiter=delimiter)
+    header = [name.strip().lower() for name in next(reader, [])]
+    if missing := [name for name in REQUIRED_COLUMNS if name not in header]:
+        raise ValueError(
+            f"Missing CSV columns: {', '.join(missing)}."
+            f" The header must contain {', '.join(REQUIRED_COLUMNS)}."
+        )
+    known = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+    columns = [(index, name) for index, name in enumerate(header) if name in known]
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue
+        row = {name: values[index] if index < len(values) else "" for index, name in columns}
+        try:
+            yield reader.line_num, __parse_row__(row, default_date)
+        except ValueError as e:
+            yield reader.line_num, str(e)
+
+async def import_outcomes(
+        rows: Iterable[tuple[int, OutcomeDto | str]],
+        chat_id: int,
+        user_id: int,
+        report: ImportReport,
+        on_progress: Optional[Callable[[ImportReport], Awaitable[None]]] = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        session_factory: Callable[[], AsyncSession] = AsyncDatabaseFactory.get_session,
+) -> ImportReport:
+    """
+    Insert parsed rows chunk by chunk, one multi-row INSERT and one transaction per chunk.
+
+    Imported expenses have no Telegram message: they get negative msg_ids,
+    counting down from below the lowest msg_id the user has in the chat, so they
+    never collide with real (positive) message IDs nor with earlier imports.
+    Only one chunk is held in memory at a time. Chunks committed before a
+    failure stay imported and are counted in `report`.
+    """
+    last_progress = time.monotonic()
+    async with session_factory() as session:
+        async def insert_chunk(chunk: list[tuple[OutcomeDto, int, int, int]]) -> None:
+            # Imported rows would only evict the recently written ones from the cache
+            results = await AsyncOutcomeRepository.create_outcomes(session, chunk, fill_cache=False)
+            report.imported += sum(created for _, created in results)
+
+        lowest = await AsyncOutcomeRepository.get_min_msg_id(session, chat_id, user_id)
+        next_msg_id = min(lowest or 0, 0) - 1
+        chunk: list[tuple[OutcomeDto, int, int, int]] = []
+        for line, parsed in rows:
+            if isinstance(parsed, str):
+                report.reject(line, parsed)
+                continue
+            chunk.append((parsed, next_msg_id, chat_id, user_id))
+            next_msg_id -= 1
+            if len(chunk) < chunk_size:
+                continue
+            await insert_chunk(chunk)
+            chunk = []
+            if on_progress and time.monotonic() - last_progress >= IMPORT_PROGRESS_INTERVAL_SECONDS:
+                last_progress = time.monotonic()
+                await on_progress(report)
+        if chunk:
+            await insert_chunk(chunk)
+    return report
@@ -0,0 +1,90 @@
+"""Handles /import, bulk loading historical expenses from an uploaded CSV document."""
+import logging
+import tempfile
+from pathlib import Path
+from telegram import Document, Message, Update
+from telegram.error import TelegramError
+from telegram.ext import ApplicationHandlerStop, ContextTypes
+
+from expanses_tracker.application.features.import_expenses.csv_import import (
+    ImportReport,
+    import_outcomes,
+    parse_csv_rows,
+)
+from expanses_tracker.application.utils.decorators import ensure_access_guard
+
+log = logging.getLogger(__name__)
+
+# Largest file the Bot API lets bots download
+MAX_DOWNLOAD_BYTES = 20 * 1024 * 1024
+
+IMPORT_USAGE = (
+    "Send a CSV file with /import as caption, or reply /import to one.\n"
+    "Header columns: amount, description, date (d/m/yyyy or yyyy-mm-dd),"
+    " optionally category and type."
+)
+
+# (chat_id, user_id) pairs with an import in progress
+__RUNNING_IMPORTS__: set[tuple[int, int]] = set()
+
+async def __edit_progress__(progress: Message, text: str) -> None:
+    try:
+        await progress.edit_text(text)
+    except TelegramError as e:
+        # e.g. "message is not modified" or a flood limit: the next update will catch up
+        log.debug("Cannot edit import progress: %s", e)
+
+async def __run_import__(document: Document, progress: Message, chat_id: int, user_id: int) -> None:
+    report = ImportReport()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Streamed from disk: memory doesn't grow with the file size
+            path = Path(tmp) / "import.csv"
+            tg_file = await document.get_file()
+            await tg_file.download_to_drive(path)
+            with path.open(encoding="utf-8-sig", newline="") as lines:
+                await import_outcomes(
+                    parse_csv_rows(lines, progress.date),
+                    chat_id,
+                    user_id,
+                    report,
+                    on_progress=lambda r: __edit_progress__(progress, r.progress()),
+                )
+        await __edit_progress__(progress, report.summary())
+    except Exception as e:
+        log.exception("Import failed")
+        await __edit_progress__(progress, f"Import failed: {e}\n\n{report.summary()}")
+    finally:
+        __RUNNING_IMPORTS__.discard((chat_id, user_id))
+
+async def __start_import__(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    msg = update.effective_message
+    if not msg or not update.effective_chat or not update.effective_user:
+        return
+    document = msg.document or (msg.reply_to_message.document if msg.reply_to_message else None)
+    if document is None:
+        await msg.reply_text(IMPORT_USAGE, reply_to_message_id=msg.message_id)
+        return
+    if not (document.file_name or "").lower().endswith(".csv") and document.mime_type != "text/csv":
+        await msg.reply_text("Please send a .csv file.", reply_to_message_id=msg.message_id)
+        return
+    if document.file_size and document.file_size > MAX_DOWNLOAD_BYTES:
+        await msg.reply_text(
+            "File too big: bots can download up to 20 MB.", reply_to_message_id=msg.message_id
+        )
+        return
+    key = (update.effective_chat.id, update.effective_user.id)
+    if key in __RUNNING_IMPORTS__:
+        await msg.reply_text("An import is already running.", reply_to_message_id=msg.message_id)
+        return
+    __RUNNING_IMPORTS__.add(key)
+    progress = await msg.reply_text("Importing...", reply_to_message_id=msg.message_id)
+    # Runs in the background: a long import must not hold back other updates
+    context.application.create_task(__run_import__(document, progress, *key), update=update)
+
+@ensure_access_guard
+async def import_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles /import as a document caption or as a reply to a document."""
+    await __start_import__(update, context)
+    # A captioned document is not a command: keep the expense message handler away from it
+    raise ApplicationHandlerStop
@@ -0,0 +1,181 @@
+"""Handles the /list command browsing the user's expenses, newest first, one page at a time."""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Message, Update
+from telegram.ext import ContextTypes
+
+from expanses_tracker.application.features.search.search_command_handler import outcome_line
+from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
+from expanses_tracker.application.models.constants import CATEGORIES, LIST_PAGE_SIZE, TYPES
+from expanses_tracker.application.models.outcome import OutcomeSchema
+from expanses_tracker.application.utils.callback_codec import encode_callback_data
+from expanses_tracker.application.utils.decorators import ensure_access_guard
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+
+log = logging.getLogger(__name__)
+
+LIST_USAGE = (
+    "Usage: /list [category] [type]\n"
+    f"Categories: {', '.join(CATEGORIES)}\n"
+    f"Types: {', '.join(TYPES)}"
+)
+
+# Keyset cursors count microseconds from here: dates are stored without time zone
+__EPOCH__ = datetime(1970, 1, 1)
+__NEWER__ = "p"
+__OLDER__ = "n"
+
+@dataclass(slots=True)
+class ListRequest:
+    """What /list was asked for."""
+    category: Optional[str] = None
+    type: Optional[str] = None
+
+@dataclass(frozen=True, slots=True)
+class ListCursor:
+    """Key of the outcome a page starts after, and on which side of it the page is."""
+    date: datetime
+    msg_id: int
+    newer: bool = False
+
+def parse_list_args(args: list[str]) -> ListRequest:
+    """Parse the /list arguments, a category and a type in any order.
+
+    Raises:
+        ValueError: with the usage, for any other argument
+    """
+    request = ListRequest()
+    for arg in (arg.lower() for arg in args):
+        if arg in CATEGORIES and request.category is None:
+            request.category = arg
+        elif arg in TYPES and request.type is None:
+            request.type = arg
+        else:
+            raise ValueError(LIST_USAGE)
+    return request
+
+def encode_list_cursor(cursor: ListCursor) -> str:
+    """Cursor as a button value: direction, hex microseconds since 1970, hex msg_id.
+
+    E.g. 'n63e5d7753c600.1e240'.
+    """
+    date = cursor.date
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    micros = (date - __EPOCH__) // timedelta(microseconds=1)
+    return f"{__NEWER__ if cursor.newer else __OLDER__}{micros:x}.{cursor.msg_id:x}"
+
+def decode_list_cursor(value: str) -> ListCursor:
+    """
+    Decode a cursor written by encode_list_cursor.
+
+    Raises:
+        ValueError: if value is malformed
+    """
+    direction, (micros, separator, msg_id) = value[:1], value[1:].partition(".")
+    if direction not in (__NEWER__, __OLDER__) or not separator:
+        raise ValueError(f"Malformed list cursor: {value!r}")
+    return ListCursor(
+        __EPOCH__ + timedelta(microseconds=int(micros, 16)), int(msg_id, 16), direction == __NEWER__
+    )
+
+def format_list_page(request: ListRequest, outcomes: list[OutcomeSchema], first_page: bool) -> str:
+    """Render a page of outcomes as the /list reply."""
+    filters = " ".join(tag for tag in (request.category, request.type) if tag)
+    if not outcomes:
+        return f"No {filters + ' ' if filters else ''}expenses{'' if first_page else ' left'}."
+    lines = [f"Your {filters + ' ' if filters else ''}expenses, newest first:"]
+    lines.extend(outcome_line(outcome) for outcome in outcomes)
+    return "\n".join(lines)
+
+def list_keyboard(
+        message_id: int,
+        chat_id: int,
+        outcomes: list[OutcomeSchema],
+        has_newer: bool,
+        has_older: bool) -> Optional[InlineKeyboardMarkup]:
+    """Previous/next buttons of a page carrying the key of its first/last outcome.
+
+    message_id identifies the /list message.
+    """
+    if not outcomes:
+        return None
+    first, last = outcomes[0], outcomes[-1]
+    buttons = [
+        InlineKeyboardButton(
+            text=text,
+            callback_data=encode_callback_data(ButtonDataDto(
+                action=ButtonActions.LIST_PAGE, message_id=message_id, chat_id=chat_id,
+                value=encode_list_cursor(cursor),
+            )),
+        )
+        for text, cursor, shown in (
+            ("◀️ Previous", ListCursor(first.date, first.msg_id, newer=True), has_newer),
+            ("Next ▶️", ListCursor(last.date, last.msg_id), has_older),
+        )
+        if shown
+    ]
+    return InlineKeyboardMarkup([buttons]) if buttons else None
+
+async def list_page(
+        request: ListRequest,
+        command: Message,
+        chat_id: int,
+        user_id: int,
+        cursor: Optional[ListCursor] = None) -> tuple[str, Optional[InlineKeyboardMarkup]]:
+    """Text and buttons of the page of the /list `command` message after `cursor`.
+
+    The newest page if `cursor` is None.
+    """
+    async def fetch(after: Optional[ListCursor]) -> list[OutcomeSchema]:
+        # On the primary for a while after the user's writes: the new expense is on the first page
+        async with AsyncDatabaseFactory.get_read_session(chat_id, user_id) as session:
+            # One more row than shown tells whether there is another page past this one
+            return await AsyncOutcomeRepository.list_page(
+                session, chat_id, user_id,
+                cursor=None if after is None else (after.date, after.msg_id),
+                newer=after is not None and after.newer,
+                category=request.category, outcome_type=request.type, limit=LIST_PAGE_SIZE + 1,
+            )
+
+    outcomes = await fetch(cursor)
+    if cursor is not None and cursor.newer and len(outcomes) <= LIST_PAGE_SIZE:
+        # Back to the newest outcomes: show a full first page, not what is left above the cursor
+        cursor = None
+        outcomes = await fetch(cursor)
+    if cursor is not None and cursor.newer:
+        has_newer, has_older = True, True
+        outcomes = outcomes[-LIST_PAGE_SIZE:]
+    else:
+        has_newer, has_older = cursor is not None, len(outcomes) > LIST_PAGE_SIZE
+        outcomes = outcomes[:LIST_PAGE_SIZE]
+    return (
+        format_list_page(request, outcomes, cursor is None),
+        list_keyboard(command.message_id, chat_id, outcomes, has_newer, has_older),
+    )
+
+@ensure_access_guard
+async def list_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles /list [category] [type]."""
+    if not (msg := update.message) or not update.effective_chat or not update.effective_user:
+        return
+    try:
+        request = parse_list_args(context.args or [])
+    except ValueError as e:
+        await msg.reply_text(str(e), reply_to_message_id=msg.message_id)
+        return
+    try:
+        text, keyboard = await list_page(
+            request, msg, update.effective_chat.id, update.effective_user.id
+        )
+    except Exception as e:
+        log.error("Error listing expenses: %s", e)
+        await msg.reply_text(
+            f"Error listing expenses: {str(e)}", reply_to_message_id=msg.message_id
+        )
+        return
+    # The reply keeps a link to the command: the page buttons read the filters back from it
+    await msg.reply_text(text, reply_markup=keyboard, reply_to_message_id=msg.message_id)
@@ -0,0 +1,92 @@
+"""Handles the /report command summarizing a month of expenses."""
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from expanses_tracker.application.models.monthly_total import MonthlyTotalSchema
+from expanses_tracker.application.utils.decorators import ensure_access_guard
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.monthly_totals_repository import (
+    MonthlyTotalsRepository,
+    year_month,
+)
+
+log = logging.getLogger(__name__)
+
+INVALID_MONTH = "Invalid month. Use YYYY-MM, MM/YYYY or MM."
+
+__MONTH_PATTERNS__ = (
+    (re.compile(r"(\d{4})-(\d{1,2})"), 1, 2),
+    (re.compile(r"(\d{1,2})/(\d{4})"), 2, 1),
+)
+__MONTH_ONLY_PATTERN__ = re.compile(r"\d{1,2}")
+
+def parse_report_month(args: list[str], default_date: datetime) -> str:
+    """Get the YYYY-MM month asked by the /report arguments, default_date's month if none."""
+    if not args:
+        return year_month(default_date)
+    token = args[0]
+    year, month = default_date.year, None
+    for pattern, year_group, month_group in __MONTH_PATTERNS__:
+        if match := pattern.fullmatch(token):
+            year, month = int(match.group(year_group)), int(match.group(month_group))
+            break
+    else:
+        if __MONTH_ONLY_PATTERN__.fullmatch(token):
+            month = int(token)
+    if month is None or not 1 <= month <= 12:
+        raise ValueError(INVALID_MONTH)
+    return f"{year:04d}-{month:02d}"
+
+def format_report(month: str, rows: list[MonthlyTotalSchema]) -> str:
+    """Render the rollup rows of a month as the /report reply."""
+    if not rows:
+        return f"No expenses recorded in {month}."
+    # Decimal sums of exact amounts, no re-rounding needed
+    by_category: dict[str, list] = defaultdict(lambda: [Decimal(0), 0])
+    by_type: dict[str, list] = defaultdict(lambda: [Decimal(0), 0])
+    for row in rows:
+        for bucket, key in ((by_category, row.category), (by_type, row.type)):
+            bucket[key or "Not specified"][0] += row.total
+            bucket[key or "Not specified"][1] += row.count
+    total = sum((row.total for row in rows), Decimal(0))
+    count = sum(row.count for row in rows)
+    lines = [f"Report for {month}", f"Total: {total:.2f} ({count} expenses)", "", "By category:"]
+    lines += [
+        f"- {name}: {value:.2f} ({n})"
+        for name, (value, n) in sorted(by_category.items(), key=lambda kv: -kv[1][0])
+    ]
+    lines += ["", "By type:"]
+    lines += [
+        f"- {name}: {value:.2f} ({n})"
+        for name, (value, n) in sorted(by_type.items(), key=lambda kv: -kv[1][0])
+    ]
+    return "\n".join(lines)
+
+@ensure_access_guard
+async def report_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles the /report [month] command, read from the monthly_totals rollup."""
+    if not update.message or not update.effective_chat or not update.effective_user:
+        return
+    try:
+        month = parse_report_month(context.args or [], update.message.date)
+    except ValueError as e:
+        await update.message.reply_text(str(e), reply_to_message_id=update.message.message_id)
+        return
+    chat_id, user_id = update.effective_chat.id, update.effective_user.id
+    try:
+        async with AsyncDatabaseFactory.get_read_session(chat_id, user_id) as session:
+            rows = await MonthlyTotalsRepository.get_month_totals(session, chat_id, user_id, month)
+    except Exception as e:
+        log.error("Error reading report: %s", e)
+        await update.message.reply_text(
+            f"Error reading report: {str(e)}", reply_to_message_id=update.message.message_id
+        )
+        return
+    await update.message.reply_text(
+        format_report(month, rows), reply_to_message_id=update.message.message_id
+    )
@@ -0,0 +1,136 @@
+"""Handles the /search command finding expenses by description, one page of results at a time."""
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Message, Update
+from telegram.ext import ContextTypes
+
+from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
+from expanses_tracker.application.models.constants import SEARCH_PAGE_SIZE
+from expanses_tracker.application.models.outcome import OutcomeSchema
+from expanses_tracker.application.utils.callback_codec import encode_callback_data
+from expanses_tracker.application.utils.decorators import ensure_access_guard
+from expanses_tracker.application.utils.message_parser import parse_date_argument
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.search_repository import (
+    SearchRepository,
+    search_terms,
+)
+
+log = logging.getLogger(__name__)
+
+SEARCH_USAGE = (
+    "Usage: /search <terms> [from] [to]\n"
+    "Finds your expenses whose description has every term (or a word starting with it), "
+    "dates are d/m/yyyy or yyyy-mm-dd (both included)."
+)
+
+@dataclass(slots=True)
+class SearchRequest:
+    """What /search was asked for."""
+    terms: list[str] = field(default_factory=list)
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None  # excluded
+
+def parse_search_args(args: list[str], today: datetime) -> SearchRequest:
+    """Parse the /search arguments, up to two trailing dates.
+
+    Raises:
+        ValueError: with the usage, if no terms are left
+    """
+    args = list(args)
+    dates = []
+    while args and len(dates) < 2 and (date := parse_date_argument(args[-1], today)) is not None:
+        dates.insert(0, date)
+        args.pop()
+    request = SearchRequest(terms=search_terms(" ".join(args)))
+    if not request.terms:
+        raise ValueError(SEARCH_USAGE)
+    if dates:
+        request.start = dates[0]
+    if len(dates) == 2:
+        request.end = dates[1] + timedelta(days=1)
+    return request
+
+def outcome_line(outcome: OutcomeSchema) -> str:
+    """One line of a list of outcomes: date, amount, description and tags."""
+    tags = "/".join(tag for tag in (outcome.category, outcome.type) if tag)
+    return (
+        f"- {outcome.date.strftime('%Y-%m-%d')} {outcome.amount:.2f} {outcome.description}"
+        + (f" [{tags}]" if tags else "")
+    )
+
+def format_search_page(request: SearchRequest, results: list[OutcomeSchema], page: int) -> str:
+    """Render one page of results as the /search reply."""
+    terms = " ".join(request.terms)
+    if not results:
+        if page == 0:
+            return f'No expenses match "{terms}".'
+        return f'No more expenses match "{terms}".'
+    lines = [f'Expenses matching "{terms}", page {page + 1}:']
+    lines.extend(outcome_line(outcome) for outcome in results)
+    return "\n".join(lines)
+
+def search_keyboard(
+    message_id: int, chat_id: int, page: int, has_more: bool
+) -> Optional[InlineKeyboardMarkup]:
+    """Previous/next buttons of a page, None if there is only one.
+
+    message_id identifies the /search message.
+    """
+    buttons = [
+        InlineKeyboardButton(
+            text=text,
+            callback_data=encode_callback_data(ButtonDataDto(
+                action=ButtonActions.SEARCH_PAGE, message_id=message_id, chat_id=chat_id,
+                value=str(target),
+            )),
+        )
+        for text, target, shown in (
+            ("◀️ Previous", page - 1, page > 0), ("Next ▶️", page + 1, has_more)
+        )
+        if shown
+    ]
+    return InlineKeyboardMarkup([buttons]) if buttons else None
+
+async def search_page(
+        request: SearchRequest,
+        command: Message,
+        chat_id: int,
+        user_id: int,
+        page: int) -> tuple[str, Optional[InlineKeyboardMarkup]]:
+    """Text and buttons of a page of results of the /search `command` message."""
+    async with AsyncDatabaseFactory.get_read_session(chat_id, user_id) as session:
+        # One more row than shown tells whether there is a next page
+        results = await SearchRepository.search(
+            session, chat_id, user_id, request.terms, request.start, request.end,
+            limit=SEARCH_PAGE_SIZE + 1, offset=page * SEARCH_PAGE_SIZE,
+        )
+    has_more = len(results) > SEARCH_PAGE_SIZE
+    results = results[:SEARCH_PAGE_SIZE]
+    keyboard = search_keyboard(command.message_id, chat_id, page, has_more)
+    return format_search_page(request, results, page), keyboard
+
+@ensure_access_guard
+async def search_command_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles /search <terms> [from] [to]."""
+    if not (msg := update.message) or not update.effective_chat or not update.effective_user:
+        return
+    try:
+        request = parse_search_args(context.args or [], msg.date)
+    except ValueError as e:
+        await msg.reply_text(str(e), reply_to_message_id=msg.message_id)
+        return
+    try:
+        text, keyboard = await search_page(
+            request, msg, update.effective_chat.id, update.effective_user.id, 0
+        )
+    except Exception as e:
+        log.error("Error searching expenses: %s", e)
+        await msg.reply_text(
+            f"Error searching expenses: {str(e)}", reply_to_message_id=msg.message_id
+        )
+        return
+    # The reply keeps a link to the command: the page buttons read the terms back from it
+    await msg.reply_text(text, reply_markup=keyboard, reply_to_message_id=msg.message_id)
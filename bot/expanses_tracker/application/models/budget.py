@@ -0,0 +1,14 @@
+"""Data Transfer Object for the monthly budget of a category."""
+from pydantic import BaseModel
+
+from expanses_tracker.application.models.money import Amount
+
+class BudgetSchema(BaseModel):
+    """Pydantic model of one budgets row"""
+    chat_id: int
+    user_id: int
+    category: str
+    limit: Amount
+
+    class Config:
+        from_attributes = True
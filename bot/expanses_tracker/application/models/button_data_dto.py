@@ -1,6 +1,6 @@
 """Data Transfer Object for button data in the outcome tracker bot."""
+from dataclasses import dataclass
 from typing import Optional
-from pydantic import BaseModel
 from enum import Enum
 
 class ButtonActions(Enum):
@@ -8,6 +8,8 @@ class ButtonActions(Enum):
     RESTORE = 'restore'
     CATEGORY = 'category'
     TYPE = 'type'
+    SEARCH_PAGE = 'search_page'
+    LIST_PAGE = 'list_page'
 
 class ButtonCallbacksRegistry:
     """Registry for button callback actions."""
@@ -19,8 +21,11 @@ class ButtonCallbacksRegistry:
             raise ValueError(f"Callback for action {action} is already registered.")
         ButtonCallbacksRegistry.BTN_CALLBACKS[action] = func
 
-class ButtonDataDto(BaseModel):
-    """Data Transfer Object for button data."""
+# A plain dataclass: built on every button tap,
+# where pydantic validation would dominate the decoding cost
+@dataclass(slots=True)
+class ButtonDataDto:
+    """Data Transfer Object for button data, encoded by utils.callback_codec."""
     action: ButtonActions
     message_id: int
     chat_id: int
@@ -21,3 +21,24 @@ CATEGORIES: List[str] = [
 TYPES: List[str] = ["need", "want", "goal"]
 
 UNDO_GRACE_SECONDS = int(os.environ.get("UNDO_GRACE_SECONDS", "10"))
+
+# Sweeper hard deleting soft deleted expenses whose undo window elapsed
+PURGE_INTERVAL_SECONDS = int(os.environ.get("PURGE_INTERVAL_SECONDS", "3600"))
+PURGE_BATCH_SIZE = int(os.environ.get("PURGE_BATCH_SIZE", "1000"))
+
+# CSV import of historical expenses
+IMPORT_CHUNK_SIZE = int(os.environ.get("IMPORT_CHUNK_SIZE", "500"))
+IMPORT_PROGRESS_INTERVAL_SECONDS = float(os.environ.get("IMPORT_PROGRESS_INTERVAL_SECONDS", "2"))
+
+# /export of expenses
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "1000"))
+# Exports kept in memory up to this size, then spilled to a temporary file
+EXPORT_SPOOL_MAX_BYTES = int(os.environ.get("EXPORT_SPOOL_MAX_BYTES", str(1024 * 1024)))
+# Exports larger than this are sent gzipped
+EXPORT_GZIP_THRESHOLD_BYTES = int(os.environ.get("EXPORT_GZIP_THRESHOLD_BYTES", str(1024 * 1024)))
+
+# /search results per page
+SEARCH_PAGE_SIZE = int(os.environ.get("SEARCH_PAGE_SIZE", "10"))
+
+# /list expenses per page
+LIST_PAGE_SIZE = int(os.environ.get("LIST_PAGE_SIZE", "10"))
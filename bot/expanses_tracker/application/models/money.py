@@ -0,0 +1,36 @@
+"""
+Exact money amounts: Decimal with two places in the application, integer cents in the database.
+"""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Annotated, Union
+from pydantic import BeforeValidator
+
+CENT = Decimal("0.01")
+
+def to_amount(value: Union[Decimal, float, int, str]) -> Decimal:
+    """
+    Round a value to cents (half up)
+
+    Floats go through their shortest repr, so 0.29 becomes 0.29 and not 0.28999...
+
+    Raises:
+        ValueError: If the value is not a finite number
+    """
+    try:
+        amount = value if isinstance(value, Decimal) else Decimal(str(value))
+        if not amount.is_finite():
+            raise ValueError(f"Invalid amount: {value}")
+        return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value}") from None
+
+def to_cents(value: Union[Decimal, float, int, str]) -> int:
+    """Amount as integer cents, e.g. 10.5 -> 1050."""
+    return int(to_amount(value).scaleb(2))
+
+def from_cents(cents: int) -> Decimal:
+    """Integer cents as an amount, e.g. 1050 -> Decimal('10.50')."""
+    return Decimal(cents).scaleb(-2)
+
+# Pydantic field type of an amount rounded to cents
+Amount = Annotated[Decimal, BeforeValidator(to_amount)]
@@ -0,0 +1,17 @@
+"""Data Transfer Object for the monthly rollup of outcomes."""
+from pydantic import BaseModel
+
+from expanses_tracker.application.models.money import Amount
+
+class MonthlyTotalSchema(BaseModel):
+    """Pydantic model of one monthly_totals row; empty category/type mean not specified"""
+    chat_id: int
+    user_id: int
+    year_month: str
+    category: str
+    type: str
+    total: Amount
+    count: int
+
+    class Config:
+        from_attributes = True
@@ -4,9 +4,11 @@ from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel
 
+from expanses_tracker.application.models.money import Amount
+
 class OutcomeDto(BaseModel):
     """Model representing the arguments extracted from a message."""
-    amount: float
+    amount: Amount
     description: str
     type: Optional[str] = None
     category: Optional[str] = None
@@ -19,7 +21,7 @@ class OutcomeSchema(BaseModel):
     msg_id: int
     chat_id: int
     user_id: int
-    amount: float
+    amount: Amount
     description: str
     type: Optional[str] = None
     category: Optional[str] = None
@@ -0,0 +1,226 @@
+"""Allowlist and per-user rate limits checked by ensure_access_guard."""
+import asyncio
+import logging
+import os
+import signal
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+def parse_allowed_ids(text: str) -> frozenset[int]:
+    """Numeric IDs separated by commas or whitespace; `#` starts a comment."""
+    ids = set()
+    for line in text.splitlines():
+        for token in line.split("#", 1)[0].replace(",", " ").split():
+            if token.isdigit():
+                ids.add(int(token))
+            else:
+                log.warning("Ignoring invalid allowlist entry: %r", token)
+    return frozenset(ids)
+
+class AccessControl:
+    """
+    IDs allowed to use the bot, read from ALLOWED_CHAT_IDS_FILE if set, else from ALLOWED_CHAT_IDS.
+
+    An empty allowlist lets everybody in. reload() re-reads the source; it is
+    bound to SIGHUP, so `kill -HUP <pid>` applies a new allowlist without a restart.
+    """
+
+    # Environment variables naming the allowlist source
+    ENV_IDS = "ALLOWED_CHAT_IDS"
+    ENV_FILE = "ALLOWED_CHAT_IDS_FILE"
+
+    __allowed: Optional[frozenset[int]] = None
+
+    @classmethod
+    def load(cls) -> frozenset[int]:
+        """
+        Read the allowlist from its source
+
+        Raises:
+            OSError: If ALLOWED_CHAT_IDS_FILE is set but can't be read
+        """
+        if path := os.environ.get(cls.ENV_FILE):
+            with open(path, encoding="utf-8") as file:
+                return parse_allowed_ids(file.read())
+        return parse_allowed_ids(os.environ.get(cls.ENV_IDS, ""))
+
+    @classmethod
+    def allowed(cls) -> frozenset[int]:
+        """Current allowlist, loaded on first use."""
+        allowed = cls.__allowed
+        if allowed is None:
+            allowed = cls.__allowed = cls.load()
+        return allowed
+
+    @classmethod
+    def is_allowed(cls, user_id: int) -> bool:
+        """True if the allowlist is empty or contains `user_id`."""
+        allowed = cls.allowed()
+        return not allowed or user_id in allowed
+
+    @classmethod
+    def reload(cls) -> bool:
+        """Re-read the allowlist.
+
+        Returns:
+            False, keeping the current allowlist, if the source can't be read
+        """
+        try:
+            allowed = cls.load()
+        except OSError as e:
+            log.error("Allowlist not reloaded, keeping the current one: %s", e)
+            return False
+        cls.__allowed = allowed
+        log.info(
+            "Allowlist reloaded: %d IDs%s", len(allowed), "" if allowed else " (everybody allowed)"
+        )
+        return True
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forget the loaded allowlist, the next check loads it again."""
+        cls.__allowed = None
+
+    @classmethod
+    def install_reload_signal(cls, sig: int = getattr(signal, "SIGHUP", 0)) -> bool:
+        """Reload the allowlist when the process gets `sig`; must run in the event loop.
+
+        Returns:
+            False where signal handlers are unsupported
+        """
+        if not sig:
+            return False
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, cls.reload)
+        except (NotImplementedError, RuntimeError) as e:
+            log.warning("Allowlist reload on signal not available: %s", e)
+            return False
+        return True
+
+@dataclass(slots=True)
+class TokenBucket:
+    """Tokens available to one user, refilled continuously."""
+    tokens: float
+    updated: float
+    # Last update charged, so an update reaching several guarded handlers is only counted once
+    last_update_id: Optional[int] = None
+
+class UserRateLimiter:
+    """
+    Per-user token buckets: `burst` updates at once, then `rate` updates per second.
+
+    An update over the limit is dropped, or in "defer" mode delayed until a
+    token is available (dropped anyway if that takes more than `max_delay`).
+    A dropped expense message is not saved, so the shared limiter is off
+    unless RATE_LIMIT_PER_SECOND is set.
+    """
+
+    # Environment variables configuring the shared limiter
+    ENV_RATE = "RATE_LIMIT_PER_SECOND"
+    ENV_BURST = "RATE_LIMIT_BURST"
+    ENV_MODE = "RATE_LIMIT_MODE"
+    ENV_MAX_DELAY = "RATE_LIMIT_MAX_DELAY_SECONDS"
+
+    # Idle (full) buckets are pruned once there are this many
+    MAX_BUCKETS = 10_000
+
+    __instance: Optional["UserRateLimiter"] = None
+    __instance_loaded = False
+
+    def __init__(self, rate: float, burst: int, mode: str = "drop", max_delay: float = 5.0):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1.")
+        if mode not in ("drop", "defer"):
+            raise ValueError(f"Unknown rate limit mode '{mode}', use 'drop' or 'defer'.")
+        self.rate = rate
+        self.burst = burst
+        self.mode = mode
+        self.max_delay = max_delay
+        self.dropped = 0
+        self.deferred = 0
+        self.__buckets: dict[int, TokenBucket] = {}
+
+    @classmethod
+    def get_instance(cls) -> Optional["UserRateLimiter"]:
+        """Shared limiter configured from the environment.
+
+        Returns:
+            The limiter, None if RATE_LIMIT_PER_SECOND is unset or 0
+        """
+        if not cls.__instance_loaded:
+            rate = float(os.environ.get(cls.ENV_RATE, "0"))
+            cls.__instance = cls(
+                rate=rate,
+                burst=int(os.environ.get(cls.ENV_BURST, "10")),
+                mode=os.environ.get(cls.ENV_MODE, "drop").lower(),
+                max_delay=float(os.environ.get(cls.ENV_MAX_DELAY, "5")),
+            ) if rate > 0 else None
+            cls.__instance_loaded = True
+        return cls.__instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Drop the shared limiter, the next get_instance() reads the environment again."""
+        cls.__instance = None
+        cls.__instance_loaded = False
+
+    def __prune(self, now: float) -> None:
+        for user_id, bucket in list(self.__buckets.items()):
+            if bucket.tokens + (now - bucket.updated) * self.rate >= self.burst:
+                del self.__buckets[user_id]
+
+    def reserve(
+        self, user_id: int, update_id: Optional[int] = None, now: Optional[float] = None
+    ) -> float:
+        """
+        Take a token for an update of `user_id`
+
+        Args:
+            user_id: Telegram user ID
+            update_id: ID of the update, an update already charged is not charged again
+            now: Current monotonic time, time.monotonic() by default
+
+        Returns:
+            0 if the update can run now, else the seconds to wait for the token (already taken)
+        """
+        now = time.monotonic() if now is None else now
+        bucket = self.__buckets.get(user_id)
+        if bucket is None:
+            if len(self.__buckets) >= self.MAX_BUCKETS:
+                self.__prune(now)
+            bucket = self.__buckets[user_id] = TokenBucket(tokens=self.burst, updated=now)
+        elif update_id is not None and bucket.last_update_id == update_id:
+            return 0.0
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+        bucket.updated = now
+        bucket.last_update_id = update_id
+        bucket.tokens -= 1
+        return 0.0 if bucket.tokens >= 0 else -bucket.tokens / self.rate
+
+    def refund(self, user_id: int) -> None:
+        """Give back the token of an update that won't run."""
+        if bucket := self.__buckets.get(user_id):
+            bucket.tokens = min(self.burst, bucket.tokens + 1)
+            # Another guarded handler of the same update must be charged (and dropped) again
+            bucket.last_update_id = None
+
+    async def acquire(self, user_id: int, update_id: Optional[int] = None) -> bool:
+        """Wait for the update's token in defer mode.
+
+        Returns:
+            True if the update may run, False to drop it
+        """
+        wait = self.reserve(user_id, update_id)
+        if not wait:
+            return True
+        if self.mode == "defer" and wait <= self.max_delay:
+            self.deferred += 1
+            await asyncio.sleep(wait)
+            return True
+        # Dropped updates don't use up the budget of the next ones
+        self.refund(user_id)
+        self.dropped += 1
+        return False
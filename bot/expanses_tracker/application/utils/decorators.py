@@ -1,24 +1,20 @@
 """Utility decorators for access control and button handling."""
 
-import os
+import functools
 import logging
 from telegram import Update
 from telegram.ext import ContextTypes
 from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonCallbacksRegistry
+from expanses_tracker.application.utils.access_control import AccessControl, UserRateLimiter
 
 log = logging.getLogger(__name__)
 
-# Comma-separated list of numeric chat IDs allowed to use the bot
-ALLOWED = {
-    int(x) for x in os.environ.get("ALLOWED_CHAT_IDS", "").split(",") if x.strip().isdigit()
-}
-
 # Decorator to guard handlers with access control
 def ensure_access_guard(func):
     """Decorator to ensure that only authorized users can access the decorated handler."""
     async def __ensure_access(update: Update) -> bool:
         uid = update.effective_user.id if update.effective_user else 0
-        if not (not ALLOWED or uid in ALLOWED):
+        if not AccessControl.is_allowed(uid):
             if effective_chat := update.effective_chat:
                 await effective_chat.send_message("⛔ Unauthorized.")
             else:
@@ -27,9 +23,19 @@ def ensure_access_guard(func):
             return False
         return True
 
+    # Keep the handler name, the metrics are labelled with it
+    @functools.wraps(func)
     async def __wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        if await __ensure_access(update):
-            return await func(update, context)
+        if not await __ensure_access(update):
+            return None
+        # Throttle before the handler parses anything or touches the database
+        if (limiter := UserRateLimiter.get_instance()) and update.effective_user:
+            if not await limiter.acquire(update.effective_user.id, update.update_id):
+                log.debug(
+                    "Rate limited update %s of user %s", update.update_id, update.effective_user.id
+                )
+                return None
+        return await func(update, context)
     return __wrapper
 
 def button_callback(action: ButtonActions):
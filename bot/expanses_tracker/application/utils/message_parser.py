@@ -2,38 +2,91 @@
 
 import logging
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
 import re
 import shlex
-from typing import Optional
+from typing import Collection, Optional
 
 from expanses_tracker.application.models.constants import CATEGORIES, TYPES
+from expanses_tracker.application.models.money import to_amount
 from expanses_tracker.application.models.outcome import OutcomeDto
 
 log = logging.getLogger(__name__)
 
 AMBIGUOUS_CMD_NOT_ENOUGH_PARAMS = "Ambiguous command. Not enough parameters."
 
+__TYPES__ = frozenset(TYPES)
+__CATEGORIES__ = frozenset(CATEGORIES)
+# d/m or d/m/yyyy
+__DATE_PATTERN__ = re.compile(r"(\d{1,2})/(\d{1,2})(?:/(\d{4}))?")
+# Apostrophe embedded in a word, e.g. "that's"
+__IN_WORD_APOSTROPHE__ = re.compile(r"(?<=\w)'(?=\w)")
+# Apostrophe that shlex would treat as a quote
+__QUOTING_APOSTROPHE__ = re.compile(r"(?<!\w)'|'(?!\w)")
+# Tokens as split by shlex: runs of anything but its whitespace characters
+__TOKEN__ = re.compile(r"[^ \t\r\n]+")
+
+def parse_date(date_token: str, default_date: datetime) -> Optional[datetime]:
+    """Parse a d/m or d/m/yyyy token, taking the year from default_date if missing.
+
+    Returns:
+        The parsed date, None if the token isn't a date
+    """
+    date_match_candidate = __DATE_PATTERN__.fullmatch(date_token)
+    if not date_match_candidate:
+        return None
+    day = int(date_match_candidate.group(1))
+    month = int(date_match_candidate.group(2))
+    year_group = date_match_candidate.group(3)
+    year = int(year_group) if year_group else default_date.year
+    try:
+        return datetime(year, month, day)
+    except ValueError as e:
+        log.warning("Exception while parsing date from message: %s", e)
+        # Intentionally hide original cause from end users
+        raise ValueError("Ambiguous command. Invalid date.") from None
+
+def parse_date_argument(token: str, today: datetime) -> Optional[datetime]:
+    """Parse a command argument as a d/m, d/m/yyyy or yyyy-mm-dd date; None if it isn't one."""
+    try:
+        parsed = parse_date(token, today)
+        return parsed if parsed is not None else datetime.strptime(token, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+def parse_amount(amount_str: str) -> Decimal:
+    """Parse an amount, either a number or a num/den division, exactly rounded to cents."""
+    try:
+        if "/" in amount_str:
+            nums = amount_str.split("/")
+            if len(nums) != 2:
+                raise ValueError("Ambiguous command. Invalid amount.")
+            num1 = Decimal(nums[0])
+            num2 = Decimal(nums[1])
+            if num2 == 0:
+                raise ZeroDivisionError("Ambiguous command. Division by zero in amount.")
+            return to_amount(num1 / num2)
+        return to_amount(Decimal(amount_str))
+    except ZeroDivisionError as e:
+        log.warning("Exception while parsing amount from message: %s", e)
+        # Preserve user-friendly message while suppressing original context
+        raise ValueError(str(e)) from e
+    except (ValueError, InvalidOperation) as e:
+        log.warning("Exception while parsing amount from message: %s", e)
+        # Suppress original parsing error details to keep message concise
+        raise ValueError("Ambiguous command. Invalid amount.") from None
+
 def __get_message_date__(parts: list[str], default_date: datetime) -> tuple[datetime, list[str]]:
     """Extract date from the last element of parts if it matches d/m or d/m/yyyy format."""
-    msg_dt = default_date
-    date_token = parts[-1]
-    # match d/m or d/m/yyyy
-    date_match_candidate = re.fullmatch(r"(\d{1,2})/(\d{1,2})(?:/(\d{4}))?", date_token)
-    to_return = default_date
-    if date_match_candidate:
-        day = int(date_match_candidate.group(1))
-        month = int(date_match_candidate.group(2))
-        year = int(date_match_candidate.group(3)) if date_match_candidate.group(3) else msg_dt.year
-        try:
-            to_return = datetime(year, month, day)
-            parts.pop() # remove the date part
-        except ValueError as e:
-            log.warning("Exception while parsing date from message: %s", e)
-            # Intentionally hide original cause from end users
-            raise ValueError("Ambiguous command. Invalid date.") from None
+    to_return = parse_date(parts[-1], default_date)
+    if to_return is None:
+        return default_date, parts
+    parts.pop() # remove the date part
     return to_return, parts
 
-def __get_message_domain__(parts: list[str], domain: list[str]) -> tuple[Optional[str], list[str]]:
+def __get_message_domain__(
+    parts: list[str], domain: Collection[str]
+) -> tuple[Optional[str], list[str]]:
     """Extract type from the last element of parts if it matches a known type."""
     to_return = None
     if parts and parts[-1].lower() in domain:
@@ -42,10 +95,30 @@ def __get_message_domain__(parts: list[str], domain: list[str]) -> tuple[Optiona
     return to_return, parts
 
 def __get_message_type__(parts: list[str]) -> tuple[Optional[str], list[str]]:
-    return __get_message_domain__(parts, TYPES)
+    return __get_message_domain__(parts, __TYPES__)
 
 def __get_message_category__(parts: list[str]) -> tuple[Optional[str], list[str]]:
-    return __get_message_domain__(parts, CATEGORIES)
+    return __get_message_domain__(parts, __CATEGORIES__)
+
+def __split_message__(text: str, fast_path: bool = True) -> list[str]:
+    """
+    Split a message text into shell-like tokens.
+
+    Without double quotes, backslashes or apostrophes outside words, shlex
+    gives the same tokens as a plain whitespace split. The fast path then
+    skips the sanitization and shlex entirely.
+    """
+    if fast_path and '"' not in text and "\\" not in text and (
+            "'" not in text or not __QUOTING_APOSTROPHE__.search(text)):
+        return __TOKEN__.findall(text)
+    # Escape apostrophes embedded in words so shlex keeps the token intact
+    # Example: "4 that's ok" becomes "4 that\'s ok"
+    sanitized_text = __IN_WORD_APOSTROPHE__.sub(r"\\'", text)
+    try:
+        return shlex.split(sanitized_text)
+    except ValueError as exc:
+        log.warning("Exception while splitting message text: %s", exc)
+        raise ValueError(AMBIGUOUS_CMD_NOT_ENOUGH_PARAMS) from None
 
 # valid strings formats:
 # - 10 spesa casa food need -> type: need, category: food, amount: 10, description: spesa casa
@@ -55,18 +128,14 @@ def __get_message_category__(parts: list[str]) -> tuple[Optional[str], list[str]
 # - 10/2 spesa -> type: TBD (via buttons), category: TBD (via buttons), amount: 5 (10/2), description: spesa
 # - 10 spesa casa 21/05 -> type: TBD (via buttons), category: TBD (via buttons), amount: 10, description: spesa casa, date: 21/05/current_year
 # - 10 spesa casa food need 21/05 -> type: need, category: food, amount: 10, description: spesa casa, date: 21/05/current_year
-def get_message_args(text: str | None, date: datetime) -> OutcomeDto:
-    """Parse a message text to extract outcome details."""
+def get_message_args(text: str | None, date: datetime, fast_path: bool = True) -> OutcomeDto:
+    """Parse a message text to extract outcome details.
+
+    fast_path=False always tokenizes with shlex.
+    """
     if text is None or not text.strip():
         raise ValueError("Empty command. Not enough parameters.")
-    # Escape apostrophes embedded in words so shlex keeps the token intact
-    # Example: "4 that's ok" becomes "4 that\'s ok"
-    sanitized_text = re.sub(r"(?<=\w)'(?=\w)", r"\\'", text)
-    try:
-        parts = shlex.split(sanitized_text)
-    except ValueError as exc:
-        log.warning("Exception while splitting message text: %s", exc)
-        raise ValueError(AMBIGUOUS_CMD_NOT_ENOUGH_PARAMS) from None
+    parts = __split_message__(text, fast_path)
     if not parts:
         raise ValueError(AMBIGUOUS_CMD_NOT_ENOUGH_PARAMS)
 
@@ -84,27 +153,7 @@ def get_message_args(text: str | None, date: datetime) -> OutcomeDto:
     out_desc = " ".join(parts[1:])
 
     # Extract amount
-    amount_str = parts[0]
-    try:
-        if "/" in amount_str:
-            nums = amount_str.split("/")
-            if len(nums) != 2:
-                raise ValueError("Ambiguous command. Invalid amount.")
-            num1 = float(nums[0])
-            num2 = float(nums[1])
-            if num2 == 0:
-                raise ZeroDivisionError("Ambiguous command. Division by zero in amount.")
-            out_amount = round(num1 / num2, 2)
-        else:
-            out_amount = float(amount_str)
-    except ZeroDivisionError as e:
-        log.warning("Exception while parsing amount from message: %s", e)
-        # Preserve user-friendly message while suppressing original context
-        raise ValueError(str(e)) from e
-    except ValueError as e:
-        log.warning("Exception while parsing amount from message: %s", e)
-        # Suppress original parsing error details to keep message concise
-        raise ValueError("Ambiguous command. Invalid amount.") from None
+    out_amount = parse_amount(parts[0])
 
     # Create and return the MessageArgs model instance
     return OutcomeDto(
@@ -0,0 +1,70 @@
+"""Window of recently received update IDs, dropping the updates Telegram delivers twice."""
+import logging
+import os
+from collections import OrderedDict
+from typing import Optional
+from telegram import Update
+from telegram.ext import ApplicationHandlerStop, ContextTypes
+
+log = logging.getLogger(__name__)
+
+class RecentUpdates:
+    """
+    The last `size` update IDs received, oldest forgotten first.
+
+    Telegram redelivers an update when its delivery wasn't acknowledged in time
+    (a slow webhook response, a restart between getUpdates calls): the copy is
+    dropped before any parsing or database work.
+    """
+
+    # Environment variable sizing the shared window
+    ENV_SIZE = "UPDATE_DEDUPE_WINDOW"
+
+    __instance: Optional["RecentUpdates"] = None
+    __instance_loaded = False
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("size must be at least 1.")
+        self.size = size
+        self.duplicates = 0
+        self.__seen: OrderedDict[int, None] = OrderedDict()
+
+    @classmethod
+    def get_instance(cls) -> Optional["RecentUpdates"]:
+        """Shared window sized from the environment (10000 by default).
+
+        Returns:
+            The window, None if UPDATE_DEDUPE_WINDOW is 0
+        """
+        if not cls.__instance_loaded:
+            size = int(os.environ.get(cls.ENV_SIZE, "10000"))
+            cls.__instance = cls(size) if size > 0 else None
+            cls.__instance_loaded = True
+        return cls.__instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Drop the shared window, the next get_instance() reads the environment again."""
+        cls.__instance = None
+        cls.__instance_loaded = False
+
+    def __len__(self) -> int:
+        return len(self.__seen)
+
+    def check_and_add(self, update_id: int) -> bool:
+        """Remember `update_id`; True if it is new, False if it was already in the window."""
+        if update_id in self.__seen:
+            self.duplicates += 1
+            return False
+        self.__seen[update_id] = None
+        if len(self.__seen) > self.size:
+            self.__seen.popitem(last=False)
+        return True
+
+async def drop_redelivered_updates(update: Update, _: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handler of group -1 stopping an update already received, so no other handler sees it."""
+    window = RecentUpdates.get_instance()
+    if window is not None and not window.check_and_add(update.update_id):
+        log.info("Dropping redelivered update %d", update.update_id)
+        raise ApplicationHandlerStop
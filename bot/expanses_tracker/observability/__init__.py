@@ -0,0 +1,4 @@
+"""Metrics of the bot: instrumentation helpers and the Prometheus endpoint."""
+
+from expanses_tracker.observability.metrics import REGISTRY, MetricsRegistry
+from expanses_tracker.observability.server import MetricsServer
@@ -0,0 +1,244 @@
+"""Counts, errors and latencies of the handlers, repositories, Bot API calls and connection pool."""
+import functools
+import heapq
+import inspect
+import time
+from typing import TYPE_CHECKING, Any, Optional
+from telegram.ext import Application, ApplicationHandlerStop
+from telegram.request import BaseRequest
+
+from expanses_tracker.api.update_processor import ChatOrderedUpdateProcessor
+from expanses_tracker.observability.metrics import REGISTRY
+
+if TYPE_CHECKING:
+    # The application package imports the repositories, which import this module
+    from expanses_tracker.application.utils.access_control import UserRateLimiter
+    from expanses_tracker.application.utils.update_dedupe import RecentUpdates
+
+HANDLER_LATENCY = REGISTRY.histogram(
+    "bot_handler_duration_seconds", "Time spent in each update handler.", ["handler"]
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "bot_handler_errors_total", "Update handlers that raised.", ["handler"]
+)
+DB_LATENCY = REGISTRY.histogram(
+    "db_operation_duration_seconds", "Time spent in each repository method.",
+    ["repository", "method"]
+)
+DB_ERRORS = REGISTRY.counter(
+    "db_operation_errors_total", "Repository methods that raised.", ["repository", "method"]
+)
+TELEGRAM_LATENCY = REGISTRY.histogram(
+    "telegram_api_request_duration_seconds", "Round trip of each Bot API call.", ["method"]
+)
+TELEGRAM_ERRORS = REGISTRY.counter(
+    "telegram_api_errors_total", "Bot API calls that failed or got an HTTP error status.",
+    ["method"]
+)
+POOL_CHECKOUT_WAIT = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds", "Time waited to get a connection from the pool.", ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+
+def __timed_handler__(name: str, callback):
+    @functools.wraps(callback)
+    async def __wrapper(update: object, context: Any):
+        start = time.perf_counter()
+        try:
+            return await callback(update, context)
+        except ApplicationHandlerStop:
+            # Flow control, not a failure
+            raise
+        except Exception:
+            HANDLER_ERRORS.inc(name)
+            raise
+        finally:
+            HANDLER_LATENCY.observe(time.perf_counter() - start, name)
+    return __wrapper
+
+def instrument_handlers(app: Application) -> Application:
+    """Time every handler registered on `app`; call once all the handlers are added."""
+    for handlers in app.handlers.values():
+        for handler in handlers:
+            if not getattr(handler.callback, "__instrumented__", False):
+                handler.callback = __timed_handler__(handler.callback.__name__, handler.callback)
+                handler.callback.__instrumented__ = True
+    return app
+
+def __timed_method__(repository: str, method: str, func):
+    labels = (repository, method)
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        async def __async_gen_wrapper(*args, **kwargs):
+            # Timed until the caller is done iterating
+            start = time.perf_counter()
+            try:
+                async for item in func(*args, **kwargs):
+                    yield item
+            except Exception:
+                DB_ERRORS.inc(*labels)
+                raise
+            finally:
+                DB_LATENCY.observe(time.perf_counter() - start, *labels)
+        return __async_gen_wrapper
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def __async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                DB_ERRORS.inc(*labels)
+                raise
+            finally:
+                DB_LATENCY.observe(time.perf_counter() - start, *labels)
+        return __async_wrapper
+
+    @functools.wraps(func)
+    def __wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            DB_ERRORS.inc(*labels)
+            raise
+        finally:
+            DB_LATENCY.observe(time.perf_counter() - start, *labels)
+    return __wrapper
+
+def instrument_repository(cls):
+    """Class decorator timing every public static method of a repository."""
+    for name, member in list(vars(cls).items()):
+        if name.startswith("_") or not isinstance(member, staticmethod):
+            continue
+        setattr(cls, name, staticmethod(__timed_method__(cls.__name__, name, member.__func__)))
+    return cls
+
+class InstrumentedRequest(BaseRequest):
+    """BaseRequest timing the Bot API calls made through the wrapped request."""
+
+    def __init__(self, request: BaseRequest):
+        self.request = request
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return self.request.read_timeout
+
+    async def initialize(self) -> None:
+        await self.request.initialize()
+
+    async def shutdown(self) -> None:
+        await self.request.shutdown()
+
+    async def do_request(self, url: str, method: str, *args, **kwargs) -> tuple[int, bytes]:
+        # Bot API method name, e.g. https://api.telegram.org/bot<token>/sendMessage
+        api_method = url.rsplit("/", 1)[-1]
+        start = time.perf_counter()
+        try:
+            # Request data and timeouts as BaseRequest passed them
+            code, payload = await self.request.do_request(url, method, *args, **kwargs)
+        except Exception:
+            TELEGRAM_ERRORS.inc(api_method)
+            raise
+        finally:
+            TELEGRAM_LATENCY.observe(time.perf_counter() - start, api_method)
+        if code >= 400:
+            TELEGRAM_ERRORS.inc(api_method)
+        return code, payload
+
+def instrument_pool(pool, name: str) -> None:
+    """
+    Time the connection checkouts of a SQLAlchemy pool and report its usage
+
+    Args:
+        pool: SQLAlchemy pool, e.g. engine.pool or async_engine.sync_engine.pool
+        name: Value of the `pool` label
+    """
+    get = pool._do_get  # pylint: disable=protected-access
+
+    def __timed_get():
+        # Includes opening a new connection when the pool has no idle one
+        start = time.perf_counter()
+        try:
+            return get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, name)
+    pool._do_get = __timed_get  # pylint: disable=protected-access
+
+    if hasattr(pool, "checkedout"):
+        REGISTRY.callback(
+            "db_pool_checked_out_connections", "Connections currently checked out of the pool.",
+            lambda: [((name,), pool.checkedout())], ["pool"],
+        )
+    if hasattr(pool, "size"):
+        REGISTRY.callback(
+            "db_pool_size", "Connections the pool keeps open, overflow excluded.",
+            lambda: [((name,), pool.size())], ["pool"],
+        )
+
+def instrument_application(
+        app: Application,
+        *,
+        limiter: Optional["UserRateLimiter"] = None,
+        window: Optional["RecentUpdates"] = None,
+        top_chats: int = 0) -> None:
+    """
+    Report the job queue size and, if any, the update queues of the application
+
+    Args:
+        app: Application to report on
+        limiter: Per-user rate limiter of the application, if any
+        window: Window of recent update IDs of the application, if any
+        top_chats: Also report the queue depth of the `top_chats` chats with the most
+            pending updates, labelled by chat ID; 0 reports only the totals across chats
+    """
+    if job_queue := app.job_queue:
+        REGISTRY.callback(
+            "bot_job_queue_jobs", "Jobs scheduled in the job queue.",
+            lambda: [((), len(job_queue.jobs()))],
+        )
+    if limiter:
+        REGISTRY.callback(
+            "bot_rate_limited_updates_total",
+            "Updates over their user's rate limit, by action taken.",
+            lambda: [(("dropped",), limiter.dropped), (("deferred",), limiter.deferred)],
+            ["action"],
+            metric_type="counter",
+        )
+    if window:
+        REGISTRY.callback(
+            "bot_duplicate_updates_total", "Redelivered updates dropped by the update ID window.",
+            lambda: [((), window.duplicates)], metric_type="counter",
+        )
+    processor = app.update_processor
+    if not isinstance(processor, ChatOrderedUpdateProcessor):
+        return
+    totals = processor.totals
+    REGISTRY.callback(
+        "bot_update_queue_depth", "Updates received and not finished yet.",
+        lambda: [((), totals.pending)],
+    )
+    REGISTRY.callback(
+        "bot_updates_processed_total", "Updates processed.",
+        lambda: [((), totals.processed)], metric_type="counter",
+    )
+    REGISTRY.callback(
+        "bot_update_wait_seconds_total", "Time updates waited for their turn and a free slot.",
+        lambda: [((), totals.total_wait)], metric_type="counter",
+    )
+    REGISTRY.callback(
+        "bot_update_wait_seconds_max", "Longest wait of an update for its turn and a free slot.",
+        lambda: [((), totals.max_wait)],
+    )
+    if top_chats > 0:
+        def __busiest_chats():
+            # Bounded: only chats with pending updates, the busiest first
+            busy = (
+                (stats.pending, chat) for chat, stats in processor.stats().items() if stats.pending
+            )
+            return [((str(chat),), pending) for pending, chat in heapq.nlargest(top_chats, busy)]
+        REGISTRY.callback(
+            "bot_chat_update_queue_depth", "Updates pending in the chats with the most of them.",
+            __busiest_chats, ["chat_id"],
+        )
@@ -0,0 +1,185 @@
+"""In-process metrics rendered in the Prometheus text exposition format."""
+import math
+import threading
+from typing import Callable, Iterable, Optional, Sequence
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def __escape_label__(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+def __format_value__(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+def format_sample(name: str, labels: dict[str, str], value: float) -> str:
+    """One exposition line, e.g. `name{label="value"} 1.5`."""
+    if labels:
+        rendered = ",".join(f'{key}="{__escape_label__(str(val))}"' for key, val in labels.items())
+        return f"{name}{{{rendered}}} {__format_value__(value)}"
+    return f"{name} {__format_value__(value)}"
+
+class Metric:
+    """Base class of the metrics: a name, a help text and label names."""
+    TYPE = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, values: tuple) -> dict[str, str]:
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}.")
+        return dict(zip(self.labelnames, values))
+
+    def samples(self) -> Iterable[str]:
+        """Exposition lines of the metric, without the HELP and TYPE header."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """HELP and TYPE header followed by the samples."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.TYPE}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+class Counter(Metric):
+    """Monotonically increasing value per label set."""
+    TYPE = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.__values: dict[tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        """Add `amount` to the counter of the given label values."""
+        with self._lock:
+            self.__values[labelvalues] = self.__values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues) -> float:
+        """Current value for the given label values."""
+        return self.__values.get(labelvalues, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self.__values.items())
+        for labelvalues, value in values:
+            yield format_sample(self.name, self._labels(labelvalues), value)
+
+class Histogram(Metric):
+    """Cumulative bucket counts, sum and count of observations per label set."""
+    TYPE = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per bucket counts..., +Inf count, sum]
+        self.__values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labelvalues) -> None:
+        """Record one observation for the given label values."""
+        with self._lock:
+            state = self.__values.get(labelvalues)
+            if state is None:
+                state = self.__values[labelvalues] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            else:
+                state[len(self.buckets)] += 1
+            state[-1] += value
+
+    def count(self, *labelvalues) -> int:
+        """Number of observations for the given label values."""
+        state = self.__values.get(labelvalues)
+        return int(sum(state[:-1])) if state else 0
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = [(labelvalues, list(state)) for labelvalues, state in self.__values.items()]
+        for labelvalues, state in values:
+            labels = self._labels(labelvalues)
+            cumulative = 0.0
+            for bound, hits in zip((*self.buckets, math.inf), state):
+                cumulative += hits
+                yield format_sample(
+                    f"{self.name}_bucket", {**labels, "le": __format_value__(bound)}, cumulative
+                )
+            yield format_sample(f"{self.name}_sum", labels, state[-1])
+            yield format_sample(f"{self.name}_count", labels, cumulative)
+
+class CallbackMetric(Metric):
+    """Metric whose samples are read from a callback at every scrape (gauges of live state)."""
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            collect: Callable[[], Iterable[tuple[tuple, float]]],
+            labelnames: Sequence[str] = (),
+            metric_type: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self.TYPE = metric_type  # pylint: disable=invalid-name
+
+    def samples(self) -> Iterable[str]:
+        for labelvalues, value in self.collect():
+            yield format_sample(self.name, self._labels(labelvalues), value)
+
+class MetricsRegistry:
+    """Named set of metrics rendered together."""
+
+    def __init__(self):
+        self.__metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric, replacing the one with the same name if any; returns it."""
+        self.__metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str) -> None:
+        """Remove a metric, if registered."""
+        self.__metrics.pop(name, None)
+
+    def get(self, name: str) -> Optional[Metric]:
+        """Registered metric with the given name, None if missing."""
+        return self.__metrics.get(name)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Register a new counter."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Register a new histogram."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(
+            self,
+            name: str,
+            documentation: str,
+            collect: Callable[[], Iterable[tuple[tuple, float]]],
+            labelnames: Sequence[str] = (),
+            metric_type: str = "gauge") -> CallbackMetric:
+        """Register a metric read from `collect` at every scrape."""
+        return self.register(CallbackMetric(name, documentation, collect, labelnames, metric_type))
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        return "".join(f"{metric.render()}\n" for metric in self.__metrics.values())
+
+# Registry served by the metrics endpoint
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,80 @@
+"""Minimal HTTP endpoint serving the metrics registry to Prometheus."""
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from expanses_tracker.observability.metrics import REGISTRY, MetricsRegistry
+
+log = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class MetricsServer:
+    """Serves GET /metrics on a local port; every other request gets a 404."""
+
+    # Environment variables: the endpoint is disabled unless METRICS_PORT is set
+    ENV_PORT = "METRICS_PORT"
+    ENV_HOST = "METRICS_HOST"
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 9464, registry: MetricsRegistry = REGISTRY
+    ):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self.__server: Optional[asyncio.base_events.Server] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["MetricsServer"]:
+        """Server configured from METRICS_PORT and METRICS_HOST, None if METRICS_PORT is not set."""
+        if not (port := os.environ.get(cls.ENV_PORT)):
+            return None
+        return cls(host=os.environ.get(cls.ENV_HOST, "127.0.0.1"), port=int(port))
+
+    @property
+    def bound_port(self) -> int:
+        """Port actually listened on (useful when started on port 0)."""
+        if self.__server is None:
+            raise RuntimeError("Metrics server is not started.")
+        return self.__server.sockets[0].getsockname()[1]
+
+    async def start(self) -> None:
+        """Start listening."""
+        self.__server = await asyncio.start_server(self.__handle, self.host, self.port)
+        log.info("Serving metrics on http://%s:%d/metrics", self.host, self.bound_port)
+
+    async def stop(self) -> None:
+        """Stop listening and wait for the open connections to close."""
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+            self.__server = None
+
+    async def __handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Skip the headers, the endpoint takes no input
+            end_of_headers = (b"\r\n", b"\n", b"")
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in end_of_headers:
+                pass
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) >= 2 else None
+            if parts and parts[0] in ("GET", "HEAD") and path == "/metrics":
+                body = self.registry.render().encode()
+                status = "200 OK"
+                content_type = CONTENT_TYPE
+            else:
+                body = b"Not found\n"
+                status = "404 Not Found"
+                content_type = "text/plain; charset=utf-8"
+            head = (
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+            ).encode()
+            writer.write(head if parts and parts[0] == "HEAD" else head + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            log.debug("Metrics request dropped: %s", e)
+        finally:
+            writer.close()
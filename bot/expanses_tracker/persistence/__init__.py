@@ -1,9 +1,41 @@
 """Database initialization and table creation for the expenses tracker application."""
+import logging
 
 # Initialize the database connection
-from expanses_tracker.persistence.database_context.database import DatabaseFactory
+from expanses_tracker.persistence.database_context.database import (
+    AsyncDatabaseFactory,
+    DatabaseFactory,
+)
+from expanses_tracker.persistence.repositories.budget_repository import BudgetRepository
+from expanses_tracker.persistence.repositories.write_behind import OutcomeWriteBehindQueue
 
-def persistence_registration():
-    """Register persistence layer by initializing the database and creating necessary tables."""
+log = logging.getLogger(__name__)
+
+def persistence_registration(check_revision: bool = False):
+    """
+    Register persistence layer by initializing the database and creating necessary tables
+
+    With `check_revision`, tables are only created if the database isn't at the latest
+    Alembic revision: a migrated schema is current and create_all would only inspect it.
+    """
     DatabaseFactory.init_db()
-    DatabaseFactory.create_tables()
+    if check_revision and DatabaseFactory.schema_is_current():
+        log.info("Database schema at the latest revision, skipping table creation")
+    else:
+        DatabaseFactory.create_tables()
+    AsyncDatabaseFactory.init_db()
+    OutcomeWriteBehindQueue.init_from_env()
+
+async def persistence_startup(_=None):
+    """Load the budgets and their totals into memory before any update; a post_init hook."""
+    async with AsyncDatabaseFactory.get_session() as session:
+        loaded = await BudgetRepository.load_tracker(session)
+    log.info("Budget tracker: %d budgets", loaded)
+
+async def persistence_shutdown(_=None):
+    """Flush queued writes and release the async connection pool.
+
+    Usable as an Application post_shutdown hook.
+    """
+    await OutcomeWriteBehindQueue.shutdown()
+    await AsyncDatabaseFactory.dispose()
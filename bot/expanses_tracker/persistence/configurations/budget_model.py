@@ -0,0 +1,25 @@
+from decimal import Decimal
+from sqlalchemy import BigInteger, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from expanses_tracker.application.models.money import from_cents
+from expanses_tracker.persistence.configurations.base import Base
+
+class BudgetModel(Base):
+    """SQLAlchemy model for the monthly budget of a user for a category"""
+    __tablename__ = 'budgets'
+
+    # Database columns
+    chat_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # telegram chat id
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # telegram user id
+    category: Mapped[str] = mapped_column(String(50), primary_key=True)
+    # spending limit of each month
+    limit_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    @property
+    def limit(self) -> Decimal:
+        """Limit with two decimal places."""
+        return from_cents(self.limit_cents)
+
+    def __repr__(self):
+        return (f"<Budget(chat_id={self.chat_id}, user_id={self.user_id}, "
+                f"category='{self.category}', limit={self.limit})>")
@@ -0,0 +1,32 @@
+from decimal import Decimal
+from sqlalchemy import BigInteger, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from expanses_tracker.application.models.money import from_cents
+from expanses_tracker.persistence.configurations.base import Base
+
+# Stored in place of a missing category/type, primary key columns can't be NULL
+UNSPECIFIED = ''
+
+class MonthlyTotalModel(Base):
+    """SQLAlchemy model for the per-month rollup of live outcomes"""
+    __tablename__ = 'monthly_totals'
+
+    # Database columns
+    chat_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # telegram chat id
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # telegram user id
+    # YYYY-MM of the outcome date
+    year_month: Mapped[str] = mapped_column(String(7), primary_key=True)
+    category: Mapped[str] = mapped_column(String(50), primary_key=True, default=UNSPECIFIED)
+    type: Mapped[str] = mapped_column(String(50), primary_key=True, default=UNSPECIFIED)
+    total_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    @property
+    def total(self) -> Decimal:
+        """Total with two decimal places."""
+        return from_cents(self.total_cents)
+
+    def __repr__(self):
+        return (f"<MonthlyTotal(chat_id={self.chat_id}, user_id={self.user_id}, "
+                f"year_month='{self.year_month}', category='{self.category}', type='{self.type}', "
+                f"total={self.total}, count={self.count})>")
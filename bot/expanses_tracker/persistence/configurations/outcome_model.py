@@ -1,25 +1,55 @@
-from datetime import datetime, timezone
+from datetime import datetime
+from decimal import Decimal
 from typing import Optional
-from sqlalchemy import Integer, Float, String, DateTime
+from sqlalchemy import BigInteger, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column
+from expanses_tracker.application.models.money import from_cents, to_cents
 from expanses_tracker.persistence.configurations.base import Base
+from expanses_tracker.persistence.configurations.timestamps import UtcDateTime, utc_now
 
 class OutcomeModel(Base):
     """SQLAlchemy model for an outcome in the database"""
     __tablename__ = 'expenses'
+    __table_args__ = (
+        # Per chat/user time range scans
+        Index('ix_expenses_chat_user_date', 'chat_id', 'user_id', 'date'),
+        # Same scans restricted to live rows, msg_id breaks ties between equal dates
+        Index(
+            'ix_expenses_live_chat_user_date', 'chat_id', 'user_id', 'date', 'msg_id',
+            postgresql_where=text('deleted_at IS NULL'),
+            sqlite_where=text('deleted_at IS NULL'),
+        ),
+        # Soft deleted rows only, for the purge sweeper
+        Index(
+            'ix_expenses_deleted_at', 'deleted_at',
+            postgresql_where=text('deleted_at IS NOT NULL'),
+            sqlite_where=text('deleted_at IS NOT NULL'),
+        ),
+    )
 
     # Database columns
     msg_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # telegram message id
     chat_id: Mapped[int] = mapped_column(Integer, primary_key=True) # telegram chat id
     user_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # telegram user id
-    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    # exact, SUM runs on integers
+    amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
     description: Mapped[str] = mapped_column(String(255), nullable=False)
     type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     category: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
-    date: Mapped[datetime] = mapped_column(DateTime, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(timezone.utc))
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
-    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # Timestamp for soft deletion
+    date: Mapped[datetime] = mapped_column(UtcDateTime, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(UtcDateTime, default=utc_now)
+    updated_at: Mapped[datetime] = mapped_column(UtcDateTime, default=utc_now, onupdate=utc_now)
+    # Timestamp for soft deletion
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(UtcDateTime, nullable=True)
+
+    @property
+    def amount(self) -> Decimal:
+        """Amount with two decimal places."""
+        return from_cents(self.amount_cents)
+
+    @amount.setter
+    def amount(self, value) -> None:
+        self.amount_cents = to_cents(value)
 
     def __repr__(self):
         return (f"<Outcome(msg_id={self.msg_id}, chat_id={self.chat_id}, user_id={self.user_id}, "
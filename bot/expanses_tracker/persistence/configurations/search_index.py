@@ -0,0 +1,53 @@
+from sqlalchemy import DDL, Index, String, cast, column, event, func, literal, literal_column, table
+from expanses_tracker.persistence.configurations.outcome_model import OutcomeModel
+
+# Text search configuration of PostgreSQL: no stemming, descriptions mix languages
+TS_CONFIG = 'simple'
+
+# PostgreSQL: GIN index on the description vector, kept up to date by the database
+DESCRIPTION_VECTOR = func.to_tsvector(literal_column(f"'{TS_CONFIG}'"), OutcomeModel.description)
+OutcomeModel.__table__.append_constraint(
+    Index('ix_expenses_description_fts', DESCRIPTION_VECTOR, postgresql_using='gin')
+    .ddl_if(dialect='postgresql')
+)
+
+# SQLite: FTS5 table of the live descriptions, kept up to date by the repositories.
+# Each row stores the primary key of its expense, not indexed: the rowids of expenses
+# are implicit with a composite primary key, and VACUUM or a table copy renumbers them.
+# FTS5 can't filter by the columns of expenses, so each row also indexes its owner as a single
+# token: a MATCH on it reads the doclist of one user instead of ranking the term in every chat.
+SEARCH_TABLE = 'expenses_fts'
+SEARCH_TABLE_DDL = (
+    f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+    f"description, owner, msg_id UNINDEXED, chat_id UNINDEXED, user_id UNINDEXED, "
+    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+# Columns usable in statements; rank is the bm25 score of a MATCH, lower is better
+expenses_fts = table(
+    SEARCH_TABLE,
+    column('description'), column('owner'),
+    column('msg_id'), column('chat_id'), column('user_id'),
+    column('rank'),
+)
+
+def owner_token(chat_id: int, user_id: int) -> str:
+    """Owner token of the outcomes of a user in a chat.
+
+    Group chat IDs are negative, and '-' would split the token.
+    """
+    return f"c{chat_id}u{user_id}".replace("-", "n")
+
+# owner_token() of a row, in SQL
+OWNER_TOKEN = func.replace(
+    literal('c') + cast(OutcomeModel.chat_id, String)
+    + literal('u') + cast(OutcomeModel.user_id, String),
+    '-', 'n',
+)
+
+event.listen(
+    OutcomeModel.__table__, 'after_create', DDL(SEARCH_TABLE_DDL).execute_if(dialect='sqlite')
+)
+event.listen(
+    OutcomeModel.__table__, 'before_drop',
+    DDL(f"DROP TABLE IF EXISTS {SEARCH_TABLE}").execute_if(dialect='sqlite'),
+)
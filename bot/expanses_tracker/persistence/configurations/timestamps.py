@@ -0,0 +1,28 @@
+"""Timestamps of the expenses table: naive UTC, the columns have no time zone."""
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import DateTime
+from sqlalchemy.types import TypeDecorator
+
+def naive_utc(value: datetime) -> datetime:
+    """Aware datetimes converted to UTC without tzinfo; naive ones are already UTC and kept."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def utc_now() -> datetime:
+    """Current time as naive UTC, comparable with the stored timestamps."""
+    return naive_utc(datetime.now(timezone.utc))
+
+class UtcDateTime(TypeDecorator):
+    """
+    DateTime without time zone binding every value as naive UTC.
+
+    Telegram dates are aware: asyncpg refuses them for a `timestamp` column,
+    and SQLite would store their local wall clock.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[datetime], dialect) -> Optional[datetime]:
+        return None if value is None else naive_utc(value)
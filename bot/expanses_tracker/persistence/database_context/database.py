@@ -1,7 +1,51 @@
 import os
-from sqlalchemy import Engine, create_engine
+import re
+from ast import literal_eval
+from pathlib import Path
+from sqlalchemy import Engine, create_engine, inspect, text
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session
 from expanses_tracker.persistence.configurations.outcome_model import Base
+# Imported so that every table is registered on Base.metadata
+from expanses_tracker.persistence.configurations import (  # pylint: disable=unused-import
+    budget_model,
+    monthly_total_model,
+    search_index,
+)
+from expanses_tracker.persistence.database_context.read_replicas import (
+    REPLICA_KEY,
+    ReadReplicas,
+    RoutingSession,
+)
+
+# Alembic scripts of the schema
+MIGRATIONS_PATH = Path(__file__).resolve().parents[1] / "migrations"
+
+# `revision = '...'` and `down_revision = ...` lines of a migration script
+__REVISION_LINE__ = re.compile(
+    r"^(revision|down_revision)\s*(?::[^=]*)?=\s*(.+?)\s*$", re.MULTILINE
+)
+
+def migration_heads(versions_path: Path = MIGRATIONS_PATH / "versions") -> frozenset[str]:
+    """Head revisions of the migration scripts.
+
+    Read from the files, without importing them or Alembic.
+    """
+    revisions, parents = set(), set()
+    for script in versions_path.glob("*.py"):
+        values = dict(__REVISION_LINE__.findall(script.read_text(encoding="utf-8")))
+        if "revision" not in values:
+            continue
+        revisions.add(literal_eval(values["revision"]))
+        down_revision = literal_eval(values.get("down_revision", "None"))
+        parents.update((down_revision,) if isinstance(down_revision, str) else down_revision or ())
+    return frozenset(revisions - parents)
 
 class DatabaseFactory:
     """Factory class to create database connections based on environment variables"""
@@ -56,6 +100,24 @@ class DatabaseFactory:
             raise ValueError("Database engine is not initialized. Call init_db() first.")
         Base.metadata.create_all(cls.__engine)
 
+    @classmethod
+    def schema_is_current(cls) -> bool:
+        """
+        Check whether the database is stamped at the latest Alembic revision
+
+        Returns:
+            bool: True if the database revisions are the migration heads,
+                False if it's behind or unversioned
+        """
+        if cls.__engine is None:
+            raise ValueError("Database engine is not initialized. Call init_db() first.")
+        # Importing Alembic would take longer than the create_all this check saves
+        with cls.__engine.connect() as conn:
+            if not inspect(conn).has_table("alembic_version"):
+                return False
+            current = frozenset(conn.scalars(text("SELECT version_num FROM alembic_version")))
+        return current == migration_heads()
+
     @classmethod
     def get_session(cls) -> Session:
         """Get a new database session"""
@@ -74,3 +136,171 @@ class DatabaseFactory:
         """
         url = cls.get_connection_url()
         return url.split('://')[0].split('+')[0]
+
+    @classmethod
+    def dispose(cls) -> None:
+        """Close every pooled connection and forget the engine"""
+        if cls.__engine is not None:
+            cls.__engine.dispose()
+        cls.__engine = None
+
+class AsyncDatabaseFactory:
+    """Factory class to create asyncio database connections based on environment variables"""
+
+    # Connection settings
+    __engine: AsyncEngine | None = None
+    __session_maker: async_sessionmaker[AsyncSession] | None = None
+    __read_session_maker: async_sessionmaker[AsyncSession] | None = None
+    __replicas: ReadReplicas | None = None
+
+    # Async drivers used for each backend named in DATABASE_URL
+    ASYNC_DRIVERS = {
+        "postgresql": "asyncpg",
+        "sqlite": "aiosqlite",
+    }
+
+    @classmethod
+    def get_connection_url(cls) -> URL:
+        """
+        Get the asyncio flavour of the DATABASE_URL connection URL
+
+        The backend named in DATABASE_URL is kept and only the driver is swapped
+        (e.g. 'postgresql://...' becomes 'postgresql+asyncpg://...').
+
+        Returns:
+            URL: Database connection URL using an asyncio driver
+
+        Raises:
+            ValueError: If DATABASE_URL is not set or its backend has no known async driver
+        """
+        return cls.to_async_url(DatabaseFactory.get_connection_url())
+
+    @classmethod
+    def get_read_urls(cls) -> list[URL]:
+        """
+        Get the asyncio flavour of the comma-separated DATABASE_READ_URL replica URLs
+
+        Returns:
+            list[URL]: Replica connection URLs, empty if DATABASE_READ_URL is not set
+
+        Raises:
+            ValueError: If a replica's backend has no known async driver
+        """
+        urls = os.environ.get(ReadReplicas.ENV_READ_URL, "")
+        return [cls.to_async_url(url.strip()) for url in urls.split(",") if url.strip()]
+
+    @classmethod
+    def to_async_url(cls, conn_url: str) -> URL:
+        """
+        Swap the driver of a connection URL for the asyncio one of its backend
+
+        Raises:
+            ValueError: If the backend has no known async driver
+        """
+        url = make_url(conn_url)
+        backend = url.get_backend_name()
+        if backend not in cls.ASYNC_DRIVERS:
+            raise ValueError(
+                f"No asyncio driver configured for the '{backend}' backend. "
+                f"Supported backends: {', '.join(cls.ASYNC_DRIVERS)}"
+            )
+        url = url.set(drivername=f"{backend}+{cls.ASYNC_DRIVERS[backend]}")
+        # asyncpg does not understand libpq's sslmode, it expects ssl instead
+        if backend == "postgresql" and "sslmode" in url.query:
+            url = url.difference_update_query(["sslmode"]).update_query_dict(
+                {"ssl": url.query["sslmode"]}
+            )
+        return url
+
+    @classmethod
+    def create_engine_with_args(cls, **kwargs) -> AsyncEngine:
+        """Create a SQLAlchemy async engine with custom arguments"""
+        conn_url = cls.get_connection_url()
+        to_return = create_async_engine(conn_url, **kwargs)
+        return to_return
+
+    @classmethod
+    def init_db(cls, **engine_kwargs) -> None:
+        """Initialize the async database connection"""
+        if cls.__engine is None:
+            cls.__engine = cls.create_engine_with_args(**engine_kwargs)
+            cls.__session_maker = async_sessionmaker(
+                bind=cls.__engine, autoflush=False, expire_on_commit=False
+            )
+            if read_urls := cls.get_read_urls():
+                window = float(os.environ.get(ReadReplicas.ENV_READ_YOUR_WRITES_SECONDS, "5"))
+                cls.__replicas = ReadReplicas(
+                    [create_async_engine(url, **engine_kwargs) for url in read_urls],
+                    read_your_writes=window,
+                    retry_after=float(os.environ.get(ReadReplicas.ENV_RETRY_SECONDS, "30")),
+                )
+                cls.__read_session_maker = async_sessionmaker(
+                    bind=cls.__engine,
+                    sync_session_class=RoutingSession,
+                    autoflush=False,
+                    expire_on_commit=False,
+                )
+
+    @classmethod
+    def get_engine(cls) -> AsyncEngine:
+        """Get the async engine, initializing it on first use"""
+        if cls.__engine is None:
+            cls.init_db()
+        assert cls.__engine is not None
+        return cls.__engine
+
+    @classmethod
+    def get_session(cls) -> AsyncSession:
+        """Get a new async database session"""
+        if cls.__session_maker is None:
+            cls.init_db()
+        assert cls.__session_maker is not None
+        return cls.__session_maker()
+
+    @classmethod
+    def get_read_session(cls, chat_id: int, user_id: int) -> AsyncSession:
+        """
+        Get a new async session for read-only repository methods on behalf of a user
+
+        Its SELECTs go to a DATABASE_READ_URL replica, chosen round-robin among the
+        healthy ones, and anything else to the primary. It is a primary session when
+        no replica is configured or up, or when the user wrote within the
+        READ_YOUR_WRITES_SECONDS window.
+        """
+        if cls.__session_maker is None:
+            cls.init_db()
+        assert cls.__session_maker is not None
+        replicas = cls.__replicas
+        if replicas is None or cls.__read_session_maker is None:
+            return cls.__session_maker()
+        replica = None if replicas.recently_wrote(chat_id, user_id) else replicas.choose()
+        if replica is None:
+            return cls.__session_maker()
+        return cls.__read_session_maker(info={REPLICA_KEY: replica.sync_engine})
+
+    @classmethod
+    def get_read_engines(cls) -> list[AsyncEngine]:
+        """Get the replica engines, empty if DATABASE_READ_URL is not set"""
+        return cls.__replicas.engines if cls.__replicas is not None else []
+
+    @classmethod
+    def wrote(cls, chat_id: int, user_id: int) -> None:
+        """
+        Record a committed write of a user
+
+        Their reads stay on the primary for the read-your-writes window.
+        """
+        if cls.__replicas is not None:
+            cls.__replicas.wrote(chat_id, user_id)
+
+    @classmethod
+    async def dispose(cls) -> None:
+        """Close every pooled connection and forget the engines"""
+        if cls.__engine is not None:
+            await cls.__engine.dispose()
+        if cls.__replicas is not None:
+            await cls.__replicas.dispose()
+        cls.__engine = None
+        cls.__session_maker = None
+        cls.__read_session_maker = None
+        cls.__replicas = None
@@ -0,0 +1,108 @@
+"""Read replicas: routing of read-only sessions, replica health, the read-your-writes window."""
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+log = logging.getLogger(__name__)
+
+# Session.info key of the engine a read session sends its SELECTs to
+REPLICA_KEY = "replica"
+
+class RoutingSession(Session):
+    """
+    Session sending its SELECTs to `info["replica"]`, everything else to its bind, the primary.
+
+    SELECT ... FOR UPDATE goes to the primary too. After its first write the
+    session stays on the primary, so it reads what it wrote.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get(REPLICA_KEY)
+        if replica is not None and not self._flushing and clause is not None:
+            if clause.is_select and getattr(clause, "_for_update_arg", None) is None:
+                return replica
+            if clause.is_dml:
+                del self.info[REPLICA_KEY]
+        return super().get_bind(mapper, clause=clause, **kw)
+
+class ReadReplicas:
+    """
+    Engines of the read replicas, chosen round-robin among the healthy ones, and the recent writers.
+
+    A replica that fails to connect or drops its connection is skipped for
+    `retry_after` seconds; with every replica down, reads go to the primary.
+    A user who wrote less than `read_your_writes` seconds ago reads from the
+    primary, so a replica lagging less than that never hides their own changes.
+    Like OutcomeCache, the window only covers the writes of this bot process.
+    """
+
+    # Environment variables configuring the replicas
+    ENV_READ_URL = "DATABASE_READ_URL"
+    ENV_READ_YOUR_WRITES_SECONDS = "READ_YOUR_WRITES_SECONDS"
+    ENV_RETRY_SECONDS = "READ_REPLICA_RETRY_SECONDS"
+
+    def __init__(
+        self, engines: Sequence[AsyncEngine], read_your_writes: float = 5, retry_after: float = 30
+    ):
+        if not engines:
+            raise ValueError("At least one replica engine is required.")
+        self.engines = list(engines)
+        self.read_your_writes = read_your_writes
+        self.retry_after = retry_after
+        self.__next = 0
+        self.__down_until = [0.0] * len(self.engines)
+        # Deadlines in insertion order: the window is the same for everyone
+        self.__writers: OrderedDict[tuple[int, int], float] = OrderedDict()
+        for position, engine in enumerate(self.engines):
+            event.listen(engine.sync_engine, "handle_error", self.__error_listener(position))
+
+    def __error_listener(self, position: int):
+        def __on_error(context: ExceptionContext) -> None:
+            # No connection: the connect itself failed
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(position)
+        return __on_error
+
+    def mark_down(self, position: int) -> None:
+        """Skip the replica at `position` for retry_after seconds."""
+        self.__down_until[position] = time.monotonic() + self.retry_after
+        log.warning("Read replica %d unreachable, skipped for %.0fs", position, self.retry_after)
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """Next healthy replica in turn, None if they are all down."""
+        now = time.monotonic()
+        for _ in range(len(self.engines)):
+            position = self.__next % len(self.engines)
+            self.__next += 1
+            if self.__down_until[position] <= now:
+                return self.engines[position]
+        return None
+
+    def wrote(self, chat_id: int, user_id: int) -> None:
+        """Send the reads of a user to the primary for the next read_your_writes seconds."""
+        if self.read_your_writes <= 0:
+            return
+        now = time.monotonic()
+        key = (chat_id, user_id)
+        self.__writers[key] = now + self.read_your_writes
+        self.__writers.move_to_end(key)
+        while self.__writers:
+            oldest, deadline = next(iter(self.__writers.items()))
+            if deadline > now:
+                break
+            del self.__writers[oldest]
+
+    def recently_wrote(self, chat_id: int, user_id: int) -> bool:
+        """Whether the user wrote within the read-your-writes window."""
+        deadline = self.__writers.get((chat_id, user_id))
+        return deadline is not None and deadline > time.monotonic()
+
+    async def dispose(self) -> None:
+        """Close every pooled connection of the replicas."""
+        for engine in self.engines:
+            await engine.dispose()
@@ -0,0 +1,48 @@
+"""monthly totals rollup
+
+Revision ID: 24769468bb83
+Revises: e93f91998d30
+Create Date: 2026-10-17 20:21:40.771964
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '24769468bb83'
+down_revision: Union[str, Sequence[str], None] = 'e93f91998d30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('monthly_totals',
+    sa.Column('chat_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year_month', sa.String(length=7), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('chat_id', 'user_id', 'year_month', 'category', 'type')
+    )
+    # Backfill from the live expenses
+    if op.get_bind().dialect.name == 'postgresql':
+        year_month = "to_char(date, 'YYYY-MM')"
+    else:
+        year_month = "strftime('%Y-%m', date)"
+    op.execute(
+        "INSERT INTO monthly_totals (chat_id, user_id, year_month, category, type, total, count) "
+        f"SELECT chat_id, user_id, {year_month}, COALESCE(category, ''), COALESCE(type, ''), SUM(amount), COUNT(*) "
+        "FROM expenses WHERE deleted_at IS NULL "
+        f"GROUP BY chat_id, user_id, {year_month}, COALESCE(category, ''), COALESCE(type, '')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('monthly_totals')
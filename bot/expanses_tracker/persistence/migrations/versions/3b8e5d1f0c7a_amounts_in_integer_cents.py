@@ -0,0 +1,88 @@
+"""amounts in integer cents
+
+Revision ID: 3b8e5d1f0c7a
+Revises: 24769468bb83
+Create Date: 2026-10-17 22:14:05.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e5d1f0c7a'
+down_revision: Union[str, Sequence[str], None] = '24769468bb83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows converted per UPDATE, each in its own transaction
+BATCH_SIZE = 10_000
+
+
+def __fill_in_batches__(set_clause: str, pending: str) -> None:
+    """Run `UPDATE expenses SET <set_clause>` over the rows matching `pending`, BATCH_SIZE at a time."""
+    bind = op.get_bind()
+    # Physical row address: cheap to look up and present on every row
+    row_id = 'ctid' if bind.dialect.name == 'postgresql' else 'rowid'
+    statement = sa.text(
+        f"UPDATE expenses SET {set_clause} "
+        f"WHERE {row_id} IN (SELECT {row_id} FROM expenses WHERE {pending} LIMIT :batch_size)"
+    )
+    # Short transactions keep locks brief, and a rerun after a failure resumes where it stopped
+    with op.get_context().autocommit_block():
+        while bind.execute(statement, {"batch_size": BATCH_SIZE}).rowcount:
+            pass
+
+
+def __recreate_monthly_totals__(total_column: sa.Column, total_expression: str) -> None:
+    """Rebuild the monthly_totals rollup with the given total column, from the live expenses."""
+    op.drop_table('monthly_totals')
+    op.create_table('monthly_totals',
+    sa.Column('chat_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('year_month', sa.String(length=7), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    total_column,
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('chat_id', 'user_id', 'year_month', 'category', 'type')
+    )
+    if op.get_bind().dialect.name == 'postgresql':
+        year_month = "to_char(date, 'YYYY-MM')"
+    else:
+        year_month = "strftime('%Y-%m', date)"
+    op.execute(
+        f"INSERT INTO monthly_totals (chat_id, user_id, year_month, category, type, {total_column.name}, count) "
+        f"SELECT chat_id, user_id, {year_month}, COALESCE(category, ''), COALESCE(type, ''), {total_expression}, COUNT(*) "
+        "FROM expenses WHERE deleted_at IS NULL "
+        f"GROUP BY chat_id, user_id, {year_month}, COALESCE(category, ''), COALESCE(type, '')"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('expenses', sa.Column('amount_cents', sa.BigInteger(), nullable=True))
+    if op.get_bind().dialect.name == 'postgresql':
+        # Through numeric: half away from zero on the decimal value, not on its binary approximation
+        cents = "CAST(ROUND(CAST(amount AS NUMERIC) * 100) AS BIGINT)"
+    else:
+        cents = "CAST(ROUND(amount * 100) AS INTEGER)"
+    __fill_in_batches__(f"amount_cents = {cents}", "amount_cents IS NULL")
+    # SQLite can't alter columns in place: batch mode copies the table (indexes included)
+    with op.batch_alter_table('expenses') as batch_op:
+        batch_op.alter_column('amount_cents', existing_type=sa.BigInteger(), nullable=False)
+        batch_op.drop_column('amount')
+    # The float totals may have drifted: recompute them exactly
+    __recreate_monthly_totals__(sa.Column('total_cents', sa.BigInteger(), nullable=False), "SUM(amount_cents)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('expenses', sa.Column('amount', sa.Float(), nullable=True))
+    __fill_in_batches__("amount = amount_cents / 100.0", "amount IS NULL")
+    with op.batch_alter_table('expenses') as batch_op:
+        batch_op.alter_column('amount', existing_type=sa.Float(), nullable=False)
+        batch_op.drop_column('amount_cents')
+    __recreate_monthly_totals__(sa.Column('total', sa.Float(), nullable=False), "SUM(amount)")
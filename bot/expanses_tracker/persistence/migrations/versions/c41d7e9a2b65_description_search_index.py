@@ -0,0 +1,51 @@
+"""description search index
+
+Revision ID: c41d7e9a2b65
+Revises: 3b8e5d1f0c7a
+Create Date: 2026-10-17 23:02:47.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e9a2b65'
+down_revision: Union[str, Sequence[str], None] = '3b8e5d1f0c7a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # Same expression as the /search queries, or the planner won't use the index
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_expenses_description_fts', 'expenses', [sa.text("to_tsvector('simple', description)")],
+                unique=False, postgresql_using='gin', postgresql_concurrently=True,
+            )
+        return
+    # SQLite: FTS5 table of the live descriptions, their owner token (see owner_token())
+    # and their expense's key, maintained by the repositories from now on
+    op.execute(
+        "CREATE VIRTUAL TABLE expenses_fts USING fts5("
+        "description, owner, msg_id UNINDEXED, chat_id UNINDEXED, user_id UNINDEXED, "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        "INSERT INTO expenses_fts (msg_id, chat_id, user_id, description, owner) "
+        "SELECT msg_id, chat_id, user_id, description, "
+        "'c' || replace(chat_id, '-', 'n') || 'u' || user_id "
+        "FROM expenses WHERE deleted_at IS NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_expenses_description_fts', table_name='expenses')
+    else:
+        op.execute("DROP TABLE expenses_fts")
@@ -0,0 +1,34 @@
+"""category budgets
+
+Revision ID: d5a83f17c2e4
+Revises: c41d7e9a2b65
+Create Date: 2026-10-18 10:12:31.402877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a83f17c2e4'
+down_revision: Union[str, Sequence[str], None] = 'c41d7e9a2b65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('budgets',
+    sa.Column('chat_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('limit_cents', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('chat_id', 'user_id', 'category')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('budgets')
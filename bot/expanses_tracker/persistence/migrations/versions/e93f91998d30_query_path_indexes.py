@@ -0,0 +1,48 @@
+"""query path indexes
+
+Revision ID: e93f91998d30
+Revises: add6e601ccc7
+Create Date: 2026-10-17 19:58:12.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e93f91998d30'
+down_revision: Union[str, Sequence[str], None] = 'add6e601ccc7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build the indexes without blocking writes on Postgres (CONCURRENTLY can't run in a transaction)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_expenses_chat_user_date', 'expenses', ['chat_id', 'user_id', 'date'], unique=False,
+            postgresql_concurrently=True,
+        )
+        # Partial indexes: Postgres and SQLite (>= 3.8) only index the rows matching the WHERE clause
+        op.create_index(
+            'ix_expenses_live_chat_user_date', 'expenses', ['chat_id', 'user_id', 'date', 'msg_id'], unique=False,
+            postgresql_where=sa.text('deleted_at IS NULL'),
+            sqlite_where=sa.text('deleted_at IS NULL'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_expenses_deleted_at', 'expenses', ['deleted_at'], unique=False,
+            postgresql_where=sa.text('deleted_at IS NOT NULL'),
+            sqlite_where=sa.text('deleted_at IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_expenses_deleted_at', table_name='expenses')
+    op.drop_index('ix_expenses_live_chat_user_date', table_name='expenses')
+    op.drop_index('ix_expenses_chat_user_date', table_name='expenses')
@@ -0,0 +1,557 @@
+from datetime import datetime
+from typing import AsyncIterator, Optional, Sequence
+from sqlalchemy import Row, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from expanses_tracker.application.models.money import to_cents
+from expanses_tracker.application.models.outcome import OutcomeDto, OutcomeSchema
+from expanses_tracker.observability.instrumentation import instrument_repository
+from expanses_tracker.persistence.configurations.outcome_model import OutcomeModel
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.budget_tracker import BudgetTracker
+from expanses_tracker.persistence.repositories.category_index import CategoryIndex
+from expanses_tracker.persistence.repositories.monthly_totals_repository import (
+    monthly_totals_delta_statement,
+)
+from expanses_tracker.persistence.repositories.outcome_cache import OutcomeCache
+from expanses_tracker.persistence.repositories.outcome_statements import (
+    delete_statement,
+    insert_if_absent_statement,
+    insert_many_if_absent_statement,
+    purge_expired_statement,
+    restore_statement,
+    soft_delete_statement,
+    update_if_unchanged_statement,
+)
+from expanses_tracker.persistence.repositories.search_repository import (
+    search_index_delta_statements,
+)
+
+@instrument_repository
+class AsyncOutcomeRepository:
+    """Repository class for the outcomes, to be used from the bot event loop"""
+
+    @staticmethod
+    async def create_outcome(
+        session: AsyncSession,
+        outcome: OutcomeDto,
+        message_id: int,
+        chat_id: int,
+        user_id: int
+    ) -> tuple[Optional[OutcomeSchema], bool]:
+        """
+        Create a new outcome record in the database
+
+        Args:
+            session: Async database session
+            outcome: Outcome data
+            message_id: Telegram message ID
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+
+        Returns:
+            The created OutcomeSchema instance and True, or the stored one and False if
+            the outcome already exists (None if it was hard deleted in the meantime)
+        """
+        # A redelivered update must not fail on the primary key: the stored outcome wins
+        created = (await session.scalars(insert_if_absent_statement(
+            session.get_bind().dialect.name, outcome, message_id, chat_id, user_id
+        ))).one_or_none()
+        if created is None:
+            existing = await AsyncOutcomeRepository.get_outcome_by_id(
+                session, message_id, chat_id, user_id, include_deleted=True
+            )
+            return existing, False
+        to_return = OutcomeSchema.model_validate(created)
+        await AsyncOutcomeRepository.__update_derived_tables(session, added=[to_return])
+        await session.commit()
+        OutcomeCache.get_instance().put(to_return)
+        AsyncOutcomeRepository.__after_commit(added=[to_return])
+        return to_return, True
+
+    @staticmethod
+    async def create_outcomes(
+        session: AsyncSession,
+        outcomes: Sequence[tuple[OutcomeDto, int, int, int]],
+        fill_cache: bool = True
+    ) -> list[tuple[Optional[OutcomeSchema], bool]]:
+        """
+        Create many outcome records with one multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING
+
+        Outcomes that already exist, e.g. of a redelivered message, are read back
+        with one SELECT instead of failing the whole batch.
+
+        Args:
+            session: Async database session
+            outcomes: (outcome, message_id, chat_id, user_id) tuples
+            fill_cache: Whether to store the created outcomes in the OutcomeCache
+
+        Returns:
+            What create_outcome returns for each of the outcomes, in the same order
+        """
+        if not outcomes:
+            return []
+        rows = [
+            {
+                "msg_id": message_id,
+                "chat_id": chat_id,
+                "user_id": user_id,
+                "amount_cents": to_cents(outcome.amount),
+                "description": outcome.description,
+                "type": outcome.type,
+                "category": outcome.category,
+                "date": outcome.date,
+            }
+            for outcome, message_id, chat_id, user_id in outcomes
+        ]
+        result = await session.scalars(
+            insert_many_if_absent_statement(session.get_bind().dialect.name), rows
+        )
+        inserted = {
+            OutcomeCache.key(created): created
+            for created in map(OutcomeSchema.model_validate, result.all())
+        }
+        keys = [(message_id, chat_id, user_id) for _, message_id, chat_id, user_id in outcomes]
+        existing: dict[tuple[int, int, int], OutcomeSchema] = {}
+        if conflicting := [key for key in dict.fromkeys(keys) if key not in inserted]:
+            key = tuple_(OutcomeModel.msg_id, OutcomeModel.chat_id, OutcomeModel.user_id)
+            stored = await session.scalars(select(OutcomeModel).where(key.in_(conflicting)))
+            existing = {
+                OutcomeCache.key(outcome): outcome
+                for outcome in map(OutcomeSchema.model_validate, stored.all())
+            }
+        to_return = list(inserted.values())
+        await AsyncOutcomeRepository.__update_derived_tables(session, added=to_return)
+        await session.commit()
+        AsyncOutcomeRepository.__after_commit(added=to_return)
+        if fill_cache:
+            cache = OutcomeCache.get_instance()
+            for created in to_return:
+                cache.put(created)
+        results: list[tuple[Optional[OutcomeSchema], bool]] = []
+        for key in keys:
+            # The same key twice in a batch: only its first occurrence is created
+            if (created := inserted.pop(key, None)) is not None:
+                existing[key] = created
+                results.append((created, True))
+            else:
+                results.append((existing.get(key), False))
+        return results
+
+    @staticmethod
+    async def get_min_msg_id(session: AsyncSession, chat_id: int, user_id: int) -> Optional[int]:
+        """
+        Get the lowest message ID of a user's outcomes in a chat, soft deleted ones included
+
+        Args:
+            session: Async database session
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+
+        Returns:
+            The lowest msg_id, None if the user has no outcomes in the chat
+        """
+        return await session.scalar(
+            select(func.min(OutcomeModel.msg_id)).where(
+                OutcomeModel.chat_id == chat_id,
+                OutcomeModel.user_id == user_id
+            )
+        )
+
+    @staticmethod
+    async def __update_derived_tables(
+        session: AsyncSession,
+        added: Sequence[OutcomeSchema] = (),
+        removed: Sequence[OutcomeSchema] = ()
+    ) -> None:
+        """Apply outcome changes to the monthly_totals rollup and the search index
+
+        Runs within the caller's transaction.
+        """
+        dialect_name = session.get_bind().dialect.name
+        stmt = monthly_totals_delta_statement(dialect_name, added, removed)
+        if stmt is not None:
+            await session.execute(stmt)
+        for stmt in search_index_delta_statements(dialect_name, added, removed):
+            await session.execute(stmt)
+
+    @staticmethod
+    def __after_commit(
+        added: Sequence[OutcomeSchema] = (), removed: Sequence[OutcomeSchema] = ()
+    ) -> None:
+        """
+        Apply committed outcome changes to the in-memory indexes
+
+        Their owners' reads stay on the primary for a while.
+        """
+        CategoryIndex.apply(added=added, removed=removed)
+        BudgetTracker.apply(added=added, removed=removed)
+        for outcome in (*added, *removed):
+            AsyncDatabaseFactory.wrote(outcome.chat_id, outcome.user_id)
+
+    @staticmethod
+    async def __get_outcome_model_by_id(
+        session: AsyncSession,
+        message_id: int,
+        chat_id: int,
+        user_id: int,
+        include_deleted: bool = False,
+    ) -> OutcomeModel | None:
+        """
+        Get an outcome by its message ID, chat ID and user ID
+
+        Args:
+            session: Async database session
+            message_id: Telegram message ID
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+            include_deleted: Whether to include soft-deleted outcomes
+
+        Returns:
+            OutcomeModel if found, None otherwise
+        """
+        q = select(OutcomeModel).where(
+            OutcomeModel.msg_id == message_id,
+            OutcomeModel.chat_id == chat_id,
+            OutcomeModel.user_id == user_id
+        )
+        if not include_deleted:
+            q = q.where(OutcomeModel.deleted_at.is_(None))
+        to_return = (await session.scalars(q.limit(1))).first()
+        return to_return
+
+    @staticmethod
+    async def get_outcome_by_id(
+        session: AsyncSession,
+        message_id: int,
+        chat_id: int,
+        user_id: int,
+        include_deleted: bool = False,
+    ) -> Optional[OutcomeSchema]:
+        """
+        Get an outcome by its message ID, chat ID and user ID
+
+        Args:
+            session: Async database session
+            message_id: Telegram message ID
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+            include_deleted: Whether to include soft-deleted outcomes
+
+        Returns:
+            OutcomeSchema if found, None otherwise
+        """
+        if not include_deleted:
+            cached = OutcomeCache.get_instance().get(message_id, chat_id, user_id)
+            if cached is not None:
+                return cached
+        to_return = await AsyncOutcomeRepository.__get_outcome_model_by_id(
+            session, message_id, chat_id, user_id, include_deleted=include_deleted
+        )
+        return None if to_return is None else OutcomeSchema.model_validate(to_return)
+
+    @staticmethod
+    async def update_outcome(
+        session: AsyncSession,
+        updated_outcome: OutcomeSchema
+    ) -> Optional[OutcomeSchema]:
+        """
+        Update an outcome record
+
+        When the outcome is cached, a single conditional UPDATE ... RETURNING replaces
+        the SELECT + UPDATE; it falls back to them if the row changed since caching.
+
+        Args:
+            session: Async database session
+            updated_outcome: OutcomeSchema instance containing new field values
+
+        Returns:
+            Updated OutcomeSchema if found, None otherwise
+        """
+        cache = OutcomeCache.get_instance()
+        cached = cache.get(updated_outcome.msg_id, updated_outcome.chat_id, updated_outcome.user_id)
+        if cached is not None:
+            db_outcome = (
+                await session.scalars(update_if_unchanged_statement(cached, updated_outcome))
+            ).first()
+            if db_outcome is not None:
+                to_return = OutcomeSchema.model_validate(db_outcome)
+                await AsyncOutcomeRepository.__update_derived_tables(
+                    session, added=[to_return], removed=[cached]
+                )
+                await session.commit()
+                cache.put(to_return)
+                AsyncOutcomeRepository.__after_commit(added=[to_return], removed=[cached])
+                return to_return
+            cache.invalidate(
+                updated_outcome.msg_id, updated_outcome.chat_id, updated_outcome.user_id
+            )
+
+        db_outcome = await AsyncOutcomeRepository.__get_outcome_model_by_id(
+            session, updated_outcome.msg_id, updated_outcome.chat_id, updated_outcome.user_id
+        )
+        if not db_outcome:
+            return None
+        previous = OutcomeSchema.model_validate(db_outcome)
+
+        # Update fields from provided model
+        db_outcome.amount = updated_outcome.amount
+        db_outcome.description = updated_outcome.description
+        db_outcome.type = updated_outcome.type
+        db_outcome.category = updated_outcome.category
+        db_outcome.date = updated_outcome.date
+
+        await session.flush()
+        to_return = OutcomeSchema.model_validate(db_outcome)
+        await AsyncOutcomeRepository.__update_derived_tables(
+            session, added=[to_return], removed=[previous]
+        )
+        await session.commit()
+        cache.put(to_return)
+        AsyncOutcomeRepository.__after_commit(added=[to_return], removed=[previous])
+        return to_return
+
+    @staticmethod
+    async def soft_delete(
+        session: AsyncSession, message_id: int, chat_id: int, user_id: int
+    ) -> Optional[OutcomeSchema]:
+        """
+        Set deleted_at=now if owned by user_id and not already deleted,
+        in a single UPDATE ... RETURNING
+
+        Args:
+            session: Async database session
+            message_id: Telegram message ID
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+
+        Returns:
+            The soft deleted OutcomeSchema, None if nothing changed
+        """
+        OutcomeCache.get_instance().invalidate(message_id, chat_id, user_id)
+        db_outcome = (
+            await session.scalars(soft_delete_statement(message_id, chat_id, user_id))
+        ).first()
+        to_return = None if db_outcome is None else OutcomeSchema.model_validate(db_outcome)
+        if to_return is not None:
+            await AsyncOutcomeRepository.__update_derived_tables(session, removed=[to_return])
+        await session.commit()
+        if to_return is not None:
+            AsyncOutcomeRepository.__after_commit(removed=[to_return])
+        return to_return
+
+    @staticmethod
+    async def restore(
+        session: AsyncSession, chat_id: int, message_id: int, user_id: int, undo_grace_seconds: int
+    ) -> Optional[OutcomeSchema]:
+        """
+        If deleted_at is within undo_grace_seconds, clear it, in a single UPDATE ... RETURNING
+
+        Ownership, the soft deleted state and the grace window are all checked in the
+        WHERE clause, so a concurrent hard delete or restore simply matches no row.
+
+        Args:
+            session: Async database session
+            chat_id: Telegram chat ID
+            message_id: Telegram message ID
+            user_id: Telegram user ID
+            undo_grace_seconds: Time window in seconds during which restoration is allowed
+
+        Returns:
+            The restored OutcomeSchema, None otherwise
+        """
+        db_outcome = (await session.scalars(
+            restore_statement(message_id, chat_id, user_id, undo_grace_seconds)
+        )).first()
+        to_return = None if db_outcome is None else OutcomeSchema.model_validate(db_outcome)
+        if to_return is not None:
+            await AsyncOutcomeRepository.__update_derived_tables(session, added=[to_return])
+        await session.commit()
+        if to_return is not None:
+            OutcomeCache.get_instance().put(to_return)
+            AsyncOutcomeRepository.__after_commit(added=[to_return])
+        return to_return
+
+    @staticmethod
+    async def delete_outcome(
+        session: AsyncSession, message_id: int, chat_id: int, user_id: int
+    ) -> Optional[OutcomeSchema]:
+        """
+        Delete an outcome record that is still marked as soft deleted,
+        in a single DELETE ... RETURNING
+
+        Args:
+            session: Async database session
+            message_id: Telegram message ID
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+
+        Returns:
+            The deleted OutcomeSchema, None if not found or restored in the meantime
+        """
+        # Soft deleted rows already left the monthly totals and the search index:
+        # nothing to update there
+        OutcomeCache.get_instance().invalidate(message_id, chat_id, user_id)
+        db_outcome = (await session.scalars(delete_statement(message_id, chat_id, user_id))).first()
+        to_return = None if db_outcome is None else OutcomeSchema.model_validate(db_outcome)
+        await session.commit()
+        return to_return
+
+    @staticmethod
+    async def stream_outcome_rows(
+        session: AsyncSession,
+        chat_id: int,
+        user_id: Optional[int] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Row]:
+        """
+        Stream the live outcomes of a chat, oldest first, through a server-side cursor
+
+        Rows are plain column tuples fetched batch_size at a time, so memory doesn't
+        grow with the number of outcomes.
+
+        Args:
+            session: Async database session
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID, None for every user of the chat
+            start: Earliest date included, None for no lower bound
+            end: Date from which outcomes are excluded, None for no upper bound
+            batch_size: Rows fetched per round trip
+
+        Returns:
+            An async iterator of rows with msg_id, chat_id, user_id, date, amount_cents,
+            description, category, type
+        """
+        q = select(
+            OutcomeModel.msg_id,
+            OutcomeModel.chat_id,
+            OutcomeModel.user_id,
+            OutcomeModel.date,
+            OutcomeModel.amount_cents,
+            OutcomeModel.description,
+            OutcomeModel.category,
+            OutcomeModel.type,
+        ).where(OutcomeModel.chat_id == chat_id, OutcomeModel.deleted_at.is_(None))
+        if user_id is not None:
+            q = q.where(OutcomeModel.user_id == user_id)
+        if start is not None:
+            q = q.where(OutcomeModel.date >= start)
+        if end is not None:
+            q = q.where(OutcomeModel.date < end)
+        q = q.order_by(OutcomeModel.date, OutcomeModel.msg_id)
+        result = await session.stream(q.execution_options(yield_per=batch_size))
+        async for row in result:
+            yield row
+
+    @staticmethod
+    async def stream_tagged_rows(
+        session: AsyncSession, batch_size: int = 1000
+    ) -> AsyncIterator[Row]:
+        """
+        Stream the description, category and type of every live outcome with a category or a type
+
+        Args:
+            session: Async database session
+            batch_size: Rows fetched per round trip
+
+        Returns:
+            An async iterator of rows with chat_id, user_id, description, category, type
+        """
+        q = select(
+            OutcomeModel.chat_id,
+            OutcomeModel.user_id,
+            OutcomeModel.description,
+            OutcomeModel.category,
+            OutcomeModel.type,
+        ).where(
+            OutcomeModel.deleted_at.is_(None),
+            (OutcomeModel.category.is_not(None)) | (OutcomeModel.type.is_not(None)),
+        )
+        # In table order: sorting every outcome would cost the database
+        # more than the index gains from it
+        result = await session.stream(q.execution_options(yield_per=batch_size))
+        # A batch per switch to the driver's greenlet, rather than a row: this reads the whole table
+        async for partition in result.partitions():
+            for row in partition:
+                yield row
+
+    @staticmethod
+    async def list_page(
+        session: AsyncSession,
+        chat_id: int,
+        user_id: int,
+        cursor: Optional[tuple[datetime, int]] = None,
+        newer: bool = False,
+        category: Optional[str] = None,
+        outcome_type: Optional[str] = None,
+        limit: int = 10
+    ) -> list[OutcomeSchema]:
+        """
+        A page of the live outcomes of a user, newest first, starting after a keyset cursor
+
+        The page is read from the (chat_id, user_id, date, msg_id) index from the cursor on,
+        so its cost doesn't depend on how many pages come before it.
+
+        Args:
+            session: Async database session
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+            cursor: (date, msg_id) of the outcome the page starts after, None for the newest page
+            newer: Whether the page holds the outcomes newer than the cursor,
+                instead of the older ones
+            category: Only outcomes of this category
+            outcome_type: Only outcomes of this type
+            limit: Maximum number of outcomes
+
+        Returns:
+            The OutcomeSchema instances of the page, newest first
+        """
+        key = tuple_(OutcomeModel.date, OutcomeModel.msg_id)
+        q = select(OutcomeModel).where(
+            OutcomeModel.chat_id == chat_id,
+            OutcomeModel.user_id == user_id,
+            OutcomeModel.deleted_at.is_(None),
+        )
+        if cursor is not None:
+            q = q.where(key > tuple_(*cursor) if newer else key < tuple_(*cursor))
+        if category is not None:
+            q = q.where(OutcomeModel.category == category)
+        if outcome_type is not None:
+            q = q.where(OutcomeModel.type == outcome_type)
+        # Newer outcomes are the closest ones to the cursor going up:
+        # read them upwards, then flip them
+        if newer:
+            order = (OutcomeModel.date, OutcomeModel.msg_id)
+        else:
+            order = (OutcomeModel.date.desc(), OutcomeModel.msg_id.desc())
+        result = await session.scalars(q.order_by(*order).limit(limit))
+        rows = [OutcomeSchema.model_validate(row) for row in result.all()]
+        return rows[::-1] if newer else rows
+
+    @staticmethod
+    async def purge_expired(
+        session: AsyncSession, grace_seconds: int, batch_size: int = 1000
+    ) -> int:
+        """
+        Hard delete every outcome soft deleted more than grace_seconds ago
+
+        Rows are removed with set-based DELETE statements of at most batch_size
+        rows, each committed on its own to keep transactions and locks short.
+
+        Args:
+            session: Async database session
+            grace_seconds: Undo window after which soft deleted outcomes are purged
+            batch_size: Maximum number of rows removed per statement
+
+        Returns:
+            Number of purged outcomes
+        """
+        purged = 0
+        while True:
+            result = await session.execute(purge_expired_statement(grace_seconds, batch_size))
+            await session.commit()
+            purged += result.rowcount
+            if result.rowcount < batch_size:
+                return purged
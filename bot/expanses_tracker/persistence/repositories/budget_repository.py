@@ -0,0 +1,145 @@
+"""Monthly budgets per chat, user and category."""
+from decimal import Decimal
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from expanses_tracker.application.models.budget import BudgetSchema
+from expanses_tracker.application.models.money import to_cents
+from expanses_tracker.observability.instrumentation import instrument_repository
+from expanses_tracker.persistence.configurations.budget_model import BudgetModel
+from expanses_tracker.persistence.configurations.monthly_total_model import MonthlyTotalModel
+from expanses_tracker.persistence.repositories.budget_tracker import BudgetTracker
+from expanses_tracker.persistence.repositories.monthly_totals_repository import UPSERT_INSERTS
+
+@instrument_repository
+class BudgetRepository:
+    """Repository class for the budgets table, kept in sync with the BudgetTracker"""
+
+    @staticmethod
+    async def set_budget(
+        session: AsyncSession, chat_id: int, user_id: int, category: str, limit: Decimal
+    ) -> BudgetSchema:
+        """
+        Create or replace the monthly budget of a user for a category
+
+        The tracker starts from the category's monthly totals read in the same
+        transaction; a user's expenses and commands are handled in chat order,
+        so none of them is written in between.
+
+        Args:
+            session: Async database session
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+            category: Budgeted category
+            limit: Spending limit of each month, positive
+
+        Returns:
+            The stored BudgetSchema
+        """
+        limit_cents = to_cents(limit)
+        if limit_cents <= 0:
+            raise ValueError("A budget must be positive.")
+        dialect_name = session.get_bind().dialect.name
+        if dialect_name not in UPSERT_INSERTS:
+            raise ValueError(f"Budgets are not supported on the '{dialect_name}' backend.")
+        stmt = UPSERT_INSERTS[dialect_name](BudgetModel).values(
+            chat_id=chat_id, user_id=user_id, category=category, limit_cents=limit_cents
+        )
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[BudgetModel.chat_id, BudgetModel.user_id, BudgetModel.category],
+            set_={"limit_cents": stmt.excluded.limit_cents},
+        ))
+        months = dict((await session.execute(
+            select(MonthlyTotalModel.year_month, func.sum(MonthlyTotalModel.total_cents))
+            .where(
+                MonthlyTotalModel.chat_id == chat_id,
+                MonthlyTotalModel.user_id == user_id,
+                MonthlyTotalModel.category == category,
+            )
+            .group_by(MonthlyTotalModel.year_month)
+        )).all())
+        await session.commit()
+        spent = {month: total for month, total in months.items() if total}
+        BudgetTracker.get_instance().set_budget(chat_id, user_id, category, limit_cents, spent)
+        return BudgetSchema(chat_id=chat_id, user_id=user_id, category=category, limit=limit)
+
+    @staticmethod
+    async def remove_budget(
+        session: AsyncSession, chat_id: int, user_id: int, category: str
+    ) -> bool:
+        """
+        Remove the monthly budget of a user for a category
+
+        Args:
+            session: Async database session
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+            category: Budgeted category
+
+        Returns:
+            True if there was one, False otherwise
+        """
+        result = await session.execute(delete(BudgetModel).where(
+            BudgetModel.chat_id == chat_id,
+            BudgetModel.user_id == user_id,
+            BudgetModel.category == category,
+        ))
+        await session.commit()
+        BudgetTracker.get_instance().remove_budget(chat_id, user_id, category)
+        return result.rowcount > 0
+
+    @staticmethod
+    async def get_budgets(session: AsyncSession, chat_id: int, user_id: int) -> list[BudgetSchema]:
+        """
+        Get the budgets of a user in a chat
+
+        Args:
+            session: Async database session
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+
+        Returns:
+            The BudgetSchema rows, by category
+        """
+        result = await session.scalars(
+            select(BudgetModel)
+            .where(BudgetModel.chat_id == chat_id, BudgetModel.user_id == user_id)
+            .order_by(BudgetModel.category)
+        )
+        return [BudgetSchema.model_validate(row) for row in result.all()]
+
+    @staticmethod
+    async def load_tracker(session: AsyncSession) -> int:
+        """
+        Fill the shared BudgetTracker from the budgets table and the monthly_totals rollup
+
+        Only the budgeted categories are read, summed over the types.
+
+        Args:
+            session: Async database session
+
+        Returns:
+            Number of budgets loaded
+        """
+        budgets = (await session.execute(select(
+            BudgetModel.chat_id, BudgetModel.user_id, BudgetModel.category, BudgetModel.limit_cents
+        ))).all()
+        totals = (await session.execute(
+            select(
+                MonthlyTotalModel.chat_id,
+                MonthlyTotalModel.user_id,
+                MonthlyTotalModel.category,
+                MonthlyTotalModel.year_month,
+                func.sum(MonthlyTotalModel.total_cents),
+            )
+            .join(BudgetModel, (BudgetModel.chat_id == MonthlyTotalModel.chat_id)
+                  & (BudgetModel.user_id == MonthlyTotalModel.user_id)
+                  & (BudgetModel.category == MonthlyTotalModel.category))
+            .group_by(
+                MonthlyTotalModel.chat_id,
+                MonthlyTotalModel.user_id,
+                MonthlyTotalModel.category,
+                MonthlyTotalModel.year_month,
+            )
+        )).all()
+        return BudgetTracker.get_instance().load(budgets, totals)
@@ -0,0 +1,168 @@
+"""In-process monthly budgets and their category totals, to check a budget without a query."""
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from expanses_tracker.application.models.money import to_cents
+from expanses_tracker.application.models.outcome import OutcomeSchema
+from expanses_tracker.persistence.repositories.monthly_totals_repository import year_month
+
+log = logging.getLogger(__name__)
+
+BudgetKey = tuple[int, int, str]
+AlertKey = tuple[int, int, int]
+
+@dataclass(frozen=True, slots=True)
+class BudgetAlert:
+    """The spending of a category in a month went past `percent` of its budget."""
+    category: str
+    year_month: str
+    percent: int
+    spent_cents: int
+    limit_cents: int
+
+class TrackedBudget:
+    """Limit of a budget and the live total of its category in each month, in cents."""
+    __slots__ = ("limit_cents", "months")
+
+    def __init__(self, limit_cents: int, months: Optional[dict[str, int]] = None):
+        self.limit_cents = limit_cents
+        self.months: dict[str, int] = months or {}
+
+class BudgetTracker:
+    """
+    Monthly budgets of each user, with the running totals of the budgeted categories.
+
+    Loaded from the budgets table and the monthly_totals rollup at startup, then
+    updated by the repositories after every committed write, so checking a budget
+    is a dict lookup and never a query. Crossing a threshold is recorded for the
+    outcome that caused it, until the handler that wrote it pops the alert; like
+    OutcomeCache, it is only coherent within one bot process.
+    """
+
+    # Percents of a budget announced when an outcome goes past them
+    ALERT_PERCENTS = (80, 100)
+    # Alerts nobody popped (imports, restores) are dropped oldest first beyond this
+    MAX_PENDING_ALERTS = 1024
+
+    __instance: Optional["BudgetTracker"] = None
+
+    def __init__(self):
+        self.loaded = False
+        self.__budgets: dict[BudgetKey, TrackedBudget] = {}
+        self.__alerts: OrderedDict[AlertKey, BudgetAlert] = OrderedDict()
+
+    @classmethod
+    def get_instance(cls) -> "BudgetTracker":
+        """Get the shared tracker."""
+        if cls.__instance is None:
+            cls.__instance = cls()
+        return cls.__instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Drop the shared tracker, budgets and totals included."""
+        cls.__instance = None
+
+    @classmethod
+    def apply(
+        cls, added: Iterable[OutcomeSchema] = (), removed: Iterable[OutcomeSchema] = ()
+    ) -> None:
+        """Apply `added` and `removed` to the shared totals; called after each committed write."""
+        cls.get_instance().record(added, removed)
+
+    def __len__(self) -> int:
+        """Number of budgets."""
+        return len(self.__budgets)
+
+    def get(self, chat_id: int, user_id: int, category: str) -> Optional[TrackedBudget]:
+        """Budget of a user for a category, None if there is none."""
+        return self.__budgets.get((chat_id, user_id, category))
+
+    def set_budget(
+        self, chat_id: int, user_id: int, category: str, limit_cents: int, months: dict[str, int]
+    ) -> None:
+        """Track a budget, starting from `months`, the live total of its category in each month."""
+        self.__budgets[(chat_id, user_id, category)] = TrackedBudget(limit_cents, months)
+
+    def remove_budget(self, chat_id: int, user_id: int, category: str) -> None:
+        """Stop tracking a budget and the totals of its category."""
+        self.__budgets.pop((chat_id, user_id, category), None)
+
+    def load(
+        self,
+        budgets: Iterable[tuple[int, int, str, int]],
+        totals: Iterable[tuple[int, int, str, str, int]],
+    ) -> int:
+        """
+        Replace every budget with the (chat_id, user_id, category, limit_cents) rows of `budgets`
+        and the (chat_id, user_id, category, year_month, total_cents) rows of `totals`.
+
+        Returns:
+            How many budgets were loaded
+        """
+        loaded = {
+            (chat_id, user_id, category): TrackedBudget(limit)
+            for chat_id, user_id, category, limit in budgets
+        }
+        for chat_id, user_id, category, month, total in totals:
+            tracked = loaded.get((chat_id, user_id, category))
+            if tracked is not None and total:
+                tracked.months[month] = total
+        self.__budgets = loaded
+        self.loaded = True
+        return len(loaded)
+
+    def record(
+        self, added: Iterable[OutcomeSchema] = (), removed: Iterable[OutcomeSchema] = ()
+    ) -> None:
+        """Update the budgeted totals and record the thresholds each added outcome crossed."""
+        added = [outcome for outcome in added if outcome.category]
+        # An edit is measured from the total before it, not the one without the previous version
+        before = {}
+        for outcome in added:
+            if tracked := self.get(outcome.chat_id, outcome.user_id, outcome.category):
+                month = year_month(outcome.date)
+                key = (outcome.chat_id, outcome.user_id, outcome.category, month)
+                before.setdefault(key, tracked.months.get(month, 0))
+        for outcome in removed:
+            self.__add(outcome, -to_cents(outcome.amount))
+        for outcome in added:
+            spent = self.__add(outcome, to_cents(outcome.amount))
+            if spent is None:
+                continue
+            key = (outcome.chat_id, outcome.user_id, outcome.category, year_month(outcome.date))
+            previous, before[key] = before[key], spent
+            limit = self.__budgets[key[:3]].limit_cents
+            crossed = [percent for percent in self.ALERT_PERCENTS
+                       if previous * 100 < percent * limit <= spent * 100]
+            if crossed:
+                self.__alerts[(outcome.msg_id, outcome.chat_id, outcome.user_id)] = BudgetAlert(
+                    outcome.category, key[3], crossed[-1], spent, limit
+                )
+                if len(self.__alerts) > self.MAX_PENDING_ALERTS:
+                    self.__alerts.popitem(last=False)
+
+    def pop_alert(self, outcome: OutcomeSchema) -> Optional[BudgetAlert]:
+        """The highest threshold `outcome` made its category cross, None if none; returned once."""
+        return self.__alerts.pop((outcome.msg_id, outcome.chat_id, outcome.user_id), None)
+
+    def __add(self, outcome: OutcomeSchema, cents: int) -> Optional[int]:
+        """Add cents to the month of a budgeted outcome.
+
+        Returns:
+            The new total, None if the outcome is not budgeted
+        """
+        if not outcome.category:
+            return None
+        tracked = self.get(outcome.chat_id, outcome.user_id, outcome.category)
+        if tracked is None:
+            return None
+        month = year_month(outcome.date)
+        total = tracked.months.get(month, 0) + cents
+        if total:
+            tracked.months[month] = total
+        else:
+            tracked.months.pop(month, None)
+        return total
@@ -0,0 +1,213 @@
+"""
+In-process index of each user's description words to the categories and types they were filed under.
+"""
+import logging
+import os
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterable, Optional
+
+from expanses_tracker.application.models.outcome import OutcomeSchema
+
+log = logging.getLogger(__name__)
+
+UserKey = tuple[int, int]
+
+# Words of a description; numbers say nothing about the category
+__WORD__ = re.compile(r"[^\W\d_]{2,}")
+
+def description_words(description: str) -> set[str]:
+    """Distinct lowercased words of a description, the keys of the index."""
+    return set(__WORD__.findall(description.lower()))
+
+class WordCounts:
+    """How many live outcomes with a word were filed under each category and type."""
+    __slots__ = ("categories", "types")
+
+    def __init__(self):
+        self.categories: dict[str, int] = {}
+        self.types: dict[str, int] = {}
+
+@dataclass(slots=True)
+class Suggestion:
+    """Categories and types of a description, best first, and the ones to fill in."""
+    categories: list[str] = field(default_factory=list)
+    types: list[str] = field(default_factory=list)
+    category: Optional[str] = None
+    type: Optional[str] = None
+
+def __count__(counts: dict[str, int], value: Optional[str], delta: int) -> None:
+    if value is None:
+        return
+    total = counts.get(value, 0) + delta
+    if total > 0:
+        counts[value] = total
+    else:
+        counts.pop(value, None)
+
+def __best__(
+    scores: dict[str, int], threshold: float, min_support: int
+) -> tuple[list[str], Optional[str]]:
+    # Ties in name order: the words of a description come out of a set
+    ranked = sorted(scores, key=lambda value: (-scores[value], value))
+    if not ranked:
+        return ranked, None
+    top = scores[ranked[0]]
+    confident = top >= min_support and top >= threshold * sum(scores.values())
+    return ranked, ranked[0] if confident else None
+
+class CategoryIndex:
+    """
+    Per user counts of the categories and types of the live outcomes containing each word.
+
+    Built once from the expenses table, then updated by the repositories on every
+    write in O(words of the description), so a suggestion is a few dict lookups
+    and never a query. Each user keeps at most `max_words` words, the least
+    recently seen one forgotten first; like OutcomeCache, it is only coherent
+    within one bot process.
+    """
+
+    # Environment variables configuring the shared index
+    ENV_MAX_WORDS = "CATEGORY_INDEX_MAX_WORDS"
+    ENV_FILL_THRESHOLD = "CATEGORY_FILL_THRESHOLD"
+
+    # Outcomes a word must have been filed under a category before it is filled in
+    MIN_SUPPORT = 2
+
+    __instance: Optional["CategoryIndex"] = None
+    __instance_loaded = False
+
+    def __init__(self, max_words: int = 1000, fill_threshold: float = 0.6):
+        if max_words < 1:
+            raise ValueError("max_words must be at least 1.")
+        self.max_words = max_words
+        self.fill_threshold = fill_threshold
+        self.loaded = False
+        self.__users: dict[UserKey, OrderedDict[str, WordCounts]] = {}
+        # Outcomes applied while load() runs, with their delta, counted once it is done
+        self.__deferred: Optional[list[tuple[OutcomeSchema, int]]] = None
+
+    @classmethod
+    def get_instance(cls) -> Optional["CategoryIndex"]:
+        """
+        Shared index sized from the environment, None if CATEGORY_INDEX_MAX_WORDS is 0
+
+        CATEGORY_INDEX_MAX_WORDS (1000 by default) bounds the words kept per user,
+        CATEGORY_FILL_THRESHOLD (0.6) is the share of the votes a category or type
+        needs to be filled in; above 1, nothing is filled in and only the buttons are ranked.
+        """
+        if not cls.__instance_loaded:
+            max_words = int(os.environ.get(cls.ENV_MAX_WORDS, "1000"))
+            cls.__instance = cls(
+                max_words=max_words,
+                fill_threshold=float(os.environ.get(cls.ENV_FILL_THRESHOLD, "0.6")),
+            ) if max_words > 0 else None
+            cls.__instance_loaded = True
+        return cls.__instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Drop the shared index, the next get_instance() reads the environment again."""
+        cls.__instance = None
+        cls.__instance_loaded = False
+
+    @classmethod
+    def apply(
+        cls, added: Iterable[OutcomeSchema] = (), removed: Iterable[OutcomeSchema] = ()
+    ) -> None:
+        """Count `added` and discount `removed` in the shared index, if enabled.
+
+        Called after each committed write.
+        """
+        index = cls.get_instance()
+        if index is None:
+            return
+        changes = [(outcome, -1) for outcome in removed] + [(outcome, 1) for outcome in added]
+        if index.__deferred is not None:
+            index.__deferred.extend(changes)
+            return
+        index.__count_outcomes(changes)
+
+    def __count_outcomes(self, changes: Iterable[tuple[OutcomeSchema, int]]) -> None:
+        for outcome, delta in changes:
+            self.update(
+                outcome.chat_id, outcome.user_id, outcome.description, outcome.category,
+                outcome.type, delta,
+            )
+
+    def __len__(self) -> int:
+        """Number of (user, word) entries."""
+        return sum(len(words) for words in self.__users.values())
+
+    def update(
+            self,
+            chat_id: int,
+            user_id: int,
+            description: str,
+            category: Optional[str],
+            outcome_type: Optional[str],
+            delta: int = 1) -> None:
+        """Add (delta=1) or remove (delta=-1) one outcome in the word counts of its description."""
+        if category is None and outcome_type is None:
+            return
+        words = self.__users.setdefault((chat_id, user_id), OrderedDict())
+        for word in description_words(description):
+            counts = words.get(word)
+            if counts is None:
+                if delta < 0:
+                    continue
+                counts = words[word] = WordCounts()
+                if len(words) > self.max_words:
+                    words.popitem(last=False)
+            else:
+                words.move_to_end(word)
+            __count__(counts.categories, category, delta)
+            __count__(counts.types, outcome_type, delta)
+            if not counts.categories and not counts.types:
+                del words[word]
+
+    async def load(self, rows: AsyncIterator) -> int:
+        """
+        Count rows of (chat_id, user_id, description, category, type) streamed from the database
+
+        `rows` must come from one query, i.e. one snapshot of the table, started by the first
+        row read: the outcomes applied meanwhile were committed after it, so they are counted
+        once the rows are, rather than mixed with rows that may still show their old version.
+
+        Returns:
+            Number of rows counted
+        """
+        loaded = 0
+        self.__deferred = []
+        try:
+            async for chat_id, user_id, description, category, outcome_type in rows:
+                self.update(chat_id, user_id, description, category, outcome_type)
+                loaded += 1
+        finally:
+            deferred, self.__deferred = self.__deferred, None
+            self.__count_outcomes(deferred)
+        self.loaded = True
+        return loaded
+
+    def suggest(self, chat_id: int, user_id: int, description: str) -> Suggestion:
+        """Categories and types of the user's outcomes sharing words with the description."""
+        words = self.__users.get((chat_id, user_id))
+        if not words:
+            return Suggestion()
+        categories: dict[str, int] = {}
+        types: dict[str, int] = {}
+        for word in description_words(description):
+            counts = words.get(word)
+            if counts is None:
+                continue
+            for category, count in counts.categories.items():
+                categories[category] = categories.get(category, 0) + count
+            for outcome_type, count in counts.types.items():
+                types[outcome_type] = types.get(outcome_type, 0) + count
+        suggestion = Suggestion()
+        suggestion.categories, suggestion.category = __best__(
+            categories, self.fill_threshold, self.MIN_SUPPORT
+        )
+        suggestion.types, suggestion.type = __best__(types, self.fill_threshold, self.MIN_SUPPORT)
+        return suggestion
@@ -0,0 +1,198 @@
+"""Rollup of live outcomes per chat, user, month, category and type."""
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import Insert, func, delete, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from expanses_tracker.application.models.money import to_cents
+from expanses_tracker.application.models.monthly_total import MonthlyTotalSchema
+from expanses_tracker.application.models.outcome import OutcomeSchema
+from expanses_tracker.observability.instrumentation import instrument_repository
+from expanses_tracker.persistence.configurations.monthly_total_model import (
+    UNSPECIFIED,
+    MonthlyTotalModel,
+)
+from expanses_tracker.persistence.configurations.outcome_model import OutcomeModel
+
+# Dialects able to run INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+def year_month(date: datetime) -> str:
+    """Rollup month of an outcome date, as YYYY-MM."""
+    return date.strftime("%Y-%m")
+
+def year_month_expression(dialect_name: str, column):
+    """SQL expression computing year_month() of a date column."""
+    if dialect_name == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    if dialect_name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    raise ValueError(f"Monthly totals are not supported on the '{dialect_name}' backend.")
+
+def monthly_totals_delta_statement(
+        dialect_name: str,
+        added: Iterable[OutcomeSchema] = (),
+        removed: Iterable[OutcomeSchema] = ()) -> Optional[Insert]:
+    """
+    Multi-row upsert adding `added` to and subtracting `removed` from the rollup
+
+    Returns:
+        The INSERT ... ON CONFLICT DO UPDATE statement, None if the totals don't change
+    """
+    deltas: dict[tuple[int, int, str, str, str], list] = defaultdict(lambda: [0, 0])
+    for sign, outcomes in ((1, added), (-1, removed)):
+        for outcome in outcomes:
+            delta = deltas[(
+                outcome.chat_id,
+                outcome.user_id,
+                year_month(outcome.date),
+                outcome.category or UNSPECIFIED,
+                outcome.type or UNSPECIFIED,
+            )]
+            delta[0] += sign * to_cents(outcome.amount)
+            delta[1] += sign
+    rows = [
+        {
+            "chat_id": chat_id,
+            "user_id": user_id,
+            "year_month": month,
+            "category": category,
+            "type": type_,
+            "total_cents": total,
+            "count": count,
+        }
+        for (chat_id, user_id, month, category, type_), (total, count) in deltas.items()
+        if total or count
+    ]
+    if not rows:
+        return None
+    if dialect_name not in UPSERT_INSERTS:
+        raise ValueError(f"Monthly totals are not supported on the '{dialect_name}' backend.")
+    stmt = UPSERT_INSERTS[dialect_name](MonthlyTotalModel).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[
+            MonthlyTotalModel.chat_id,
+            MonthlyTotalModel.user_id,
+            MonthlyTotalModel.year_month,
+            MonthlyTotalModel.category,
+            MonthlyTotalModel.type,
+        ],
+        set_={
+            "total_cents": MonthlyTotalModel.total_cents + stmt.excluded.total_cents,
+            "count": MonthlyTotalModel.count + stmt.excluded.count,
+        },
+    )
+
+def __raw_totals_query__(dialect_name: str):
+    month = year_month_expression(dialect_name, OutcomeModel.date)
+    category = func.coalesce(OutcomeModel.category, UNSPECIFIED)
+    type_ = func.coalesce(OutcomeModel.type, UNSPECIFIED)
+    return (
+        select(
+            OutcomeModel.chat_id,
+            OutcomeModel.user_id,
+            month.label("year_month"),
+            category.label("category"),
+            type_.label("type"),
+            func.sum(OutcomeModel.amount_cents).label("total_cents"),
+            func.count().label("count"),
+        )
+        .where(OutcomeModel.deleted_at.is_(None))
+        .group_by(OutcomeModel.chat_id, OutcomeModel.user_id, month, category, type_)
+    )
+
+@instrument_repository
+class MonthlyTotalsRepository:
+    """Repository class to read and maintain the monthly_totals rollup"""
+
+    @staticmethod
+    async def get_month_totals(
+        session: AsyncSession, chat_id: int, user_id: int, month: str
+    ) -> list[MonthlyTotalSchema]:
+        """
+        Get the rollup rows of a user in a chat for one month
+
+        Args:
+            session: Async database session
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+            month: Month as YYYY-MM
+
+        Returns:
+            The non-empty MonthlyTotalSchema rows, biggest total first
+        """
+        result = await session.scalars(
+            select(MonthlyTotalModel)
+            .where(
+                MonthlyTotalModel.chat_id == chat_id,
+                MonthlyTotalModel.user_id == user_id,
+                MonthlyTotalModel.year_month == month,
+                MonthlyTotalModel.count > 0,
+            )
+            .order_by(MonthlyTotalModel.total_cents.desc())
+        )
+        return [MonthlyTotalSchema.model_validate(row) for row in result.all()]
+
+    @staticmethod
+    def rebuild(session: Session) -> int:
+        """
+        Recompute the whole rollup from the expenses table in one transaction
+
+        Args:
+            session: Database session
+
+        Returns:
+            Number of rollup rows written
+        """
+        dialect_name = session.get_bind().dialect.name
+        if dialect_name == "postgresql":
+            # Concurrent upserts wait for the rebuild and then apply on top of it
+            session.execute(text("LOCK TABLE monthly_totals IN EXCLUSIVE MODE"))
+        session.execute(delete(MonthlyTotalModel))
+        raw = __raw_totals_query__(dialect_name).subquery()
+        result = session.execute(
+            insert(MonthlyTotalModel).from_select(
+                ["chat_id", "user_id", "year_month", "category", "type", "total_cents", "count"],
+                select(raw)
+            )
+        )
+        session.commit()
+        return result.rowcount
+
+    @staticmethod
+    def verify(session: Session) -> list[str]:
+        """
+        Compare the rollup with totals computed from the expenses table, exactly (integer cents)
+
+        Args:
+            session: Database session
+
+        Returns:
+            One line per mismatching rollup key, empty if the rollup is consistent
+        """
+        expected = {
+            tuple(row[:5]): (row.total_cents, row.count)
+            for row in session.execute(__raw_totals_query__(session.get_bind().dialect.name))
+        }
+        rollup = session.scalars(select(MonthlyTotalModel).where(MonthlyTotalModel.count != 0))
+        actual = {
+            (row.chat_id, row.user_id, row.year_month, row.category, row.type):
+                (row.total_cents, row.count)
+            for row in rollup
+        }
+        mismatches = []
+        for key in sorted(expected.keys() | actual.keys()):
+            exp_total, exp_count = expected.get(key, (0, 0))
+            act_total, act_count = actual.get(key, (0, 0))
+            if (exp_total, exp_count) != (act_total, act_count):
+                mismatches.append(
+                    f"{key}: expected total_cents={exp_total} count={exp_count}, "
+                    f"rollup has total_cents={act_total} count={act_count}"
+                )
+        return mismatches
@@ -0,0 +1,112 @@
+"""In-process LRU/TTL cache of live outcomes, keyed by (msg_id, chat_id, user_id)."""
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from expanses_tracker.application.models.outcome import OutcomeSchema
+
+log = logging.getLogger(__name__)
+
+CacheKey = tuple[int, int, int]
+
+class OutcomeCache:
+    """
+    Bounded cache of recently written outcomes.
+
+    Entries are evicted least recently used first once `max_size` is reached,
+    and ignored `ttl` seconds after being stored. Only live (not soft deleted)
+    outcomes are cached; the repositories store and invalidate entries on every
+    write, so the cache is only coherent within one bot process.
+    """
+
+    # Environment variables configuring the shared cache
+    ENV_SIZE = "OUTCOME_CACHE_SIZE"
+    ENV_TTL_SECONDS = "OUTCOME_CACHE_TTL_SECONDS"
+
+    __instance: Optional["OutcomeCache"] = None
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        if max_size < 0:
+            raise ValueError("max_size can't be negative.")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[CacheKey, tuple[float, OutcomeSchema]] = OrderedDict()
+
+    @classmethod
+    def get_instance(cls) -> "OutcomeCache":
+        """Get the shared cache.
+
+        It is sized from OUTCOME_CACHE_SIZE (0 disables it) and OUTCOME_CACHE_TTL_SECONDS.
+        """
+        if cls.__instance is None:
+            cls.__instance = cls(
+                max_size=int(os.environ.get(cls.ENV_SIZE, "1024")),
+                ttl=float(os.environ.get(cls.ENV_TTL_SECONDS, "300")),
+            )
+            log.info(
+                "Outcome cache: max_size=%d, ttl=%.0fs", cls.__instance.max_size, cls.__instance.ttl
+            )
+        return cls.__instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Drop the shared cache, the next get_instance() reads the environment again."""
+        cls.__instance = None
+
+    @staticmethod
+    def key(outcome: OutcomeSchema) -> CacheKey:
+        """Cache key of an outcome."""
+        return (outcome.msg_id, outcome.chat_id, outcome.user_id)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, message_id: int, chat_id: int, user_id: int) -> Optional[OutcomeSchema]:
+        """Get a cached outcome, counting a hit or a miss."""
+        key = (message_id, chat_id, user_id)
+        entry = self.__entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self.__entries[key]
+            self.misses += 1
+            return None
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, outcome: OutcomeSchema) -> None:
+        """Store a live outcome, evicting the least recently used entries beyond max_size."""
+        if self.max_size == 0:
+            return
+        if outcome.deleted_at is not None:
+            self.invalidate(outcome.msg_id, outcome.chat_id, outcome.user_id)
+            return
+        key = self.key(outcome)
+        self.__entries[key] = (time.monotonic() + self.ttl, outcome)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+
+    def invalidate(self, message_id: int, chat_id: int, user_id: int) -> None:
+        """Forget an outcome."""
+        self.__entries.pop((message_id, chat_id, user_id), None)
+
+    def clear(self) -> None:
+        """Forget every outcome and reset the counters."""
+        self.__entries.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, float]:
+        """Size, hits, misses and hit ratio of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.__entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,124 @@
+"""Single-statement mutations of OutcomeModel used by the async repository."""
+from datetime import timedelta
+from sqlalchemy import Delete, Insert, Update, delete, select, tuple_, update
+
+from expanses_tracker.application.models.money import to_cents
+from expanses_tracker.application.models.outcome import OutcomeDto, OutcomeSchema
+from expanses_tracker.persistence.configurations.outcome_model import OutcomeModel
+from expanses_tracker.persistence.configurations.timestamps import utc_now
+from expanses_tracker.persistence.repositories.monthly_totals_repository import UPSERT_INSERTS
+
+def __by_id__(message_id: int, chat_id: int, user_id: int):
+    # Ownership is part of the key: other users never match
+    return (
+        OutcomeModel.msg_id == message_id,
+        OutcomeModel.chat_id == chat_id,
+        OutcomeModel.user_id == user_id,
+    )
+
+def insert_many_if_absent_statement(dialect_name: str) -> Insert:
+    """
+    INSERT ... ON CONFLICT DO NOTHING RETURNING, to execute with one parameter set per row.
+
+    Only the inserted rows are returned: the outcomes that already exist are skipped.
+    """
+    if dialect_name not in UPSERT_INSERTS:
+        raise ValueError(
+            f"Conflict-free inserts are not supported on the '{dialect_name}' backend."
+        )
+    return (
+        UPSERT_INSERTS[dialect_name](OutcomeModel)
+        .on_conflict_do_nothing(
+            index_elements=[OutcomeModel.msg_id, OutcomeModel.chat_id, OutcomeModel.user_id]
+        )
+        .returning(OutcomeModel)
+    )
+
+def insert_if_absent_statement(
+    dialect_name: str, outcome: OutcomeDto, message_id: int, chat_id: int, user_id: int
+) -> Insert:
+    """INSERT ... ON CONFLICT DO NOTHING RETURNING: returns no row if the outcome already exists."""
+    return insert_many_if_absent_statement(dialect_name).values(
+        msg_id=message_id,
+        chat_id=chat_id,
+        user_id=user_id,
+        amount_cents=to_cents(outcome.amount),
+        description=outcome.description,
+        type=outcome.type,
+        category=outcome.category,
+        date=outcome.date,
+    )
+
+def soft_delete_statement(message_id: int, chat_id: int, user_id: int) -> Update:
+    """UPDATE ... RETURNING setting deleted_at=now on a live outcome."""
+    return (
+        update(OutcomeModel)
+        .where(*__by_id__(message_id, chat_id, user_id), OutcomeModel.deleted_at.is_(None))
+        .values(deleted_at=utc_now())
+        .returning(OutcomeModel)
+    )
+
+def restore_statement(
+    message_id: int, chat_id: int, user_id: int, undo_grace_seconds: int
+) -> Update:
+    """UPDATE ... RETURNING clearing deleted_at when it is within the grace window."""
+    # deleted_at is written with the same naive UTC clock, so the cutoff compares like for like
+    cutoff = utc_now() - timedelta(seconds=undo_grace_seconds)
+    return (
+        update(OutcomeModel)
+        .where(
+            *__by_id__(message_id, chat_id, user_id),
+            OutcomeModel.deleted_at.is_not(None),
+            OutcomeModel.deleted_at >= cutoff,
+        )
+        .values(deleted_at=None)
+        .returning(OutcomeModel)
+    )
+
+def delete_statement(message_id: int, chat_id: int, user_id: int) -> Delete:
+    """DELETE ... RETURNING of an outcome that is still soft deleted."""
+    return (
+        delete(OutcomeModel)
+        .where(*__by_id__(message_id, chat_id, user_id), OutcomeModel.deleted_at.is_not(None))
+        .returning(OutcomeModel)
+    )
+
+def purge_expired_statement(grace_seconds: int, batch_size: int) -> Delete:
+    """DELETE of at most batch_size outcomes soft deleted longer than grace_seconds ago."""
+    cutoff = utc_now() - timedelta(seconds=grace_seconds)
+    expired = (
+        select(OutcomeModel.msg_id, OutcomeModel.chat_id, OutcomeModel.user_id)
+        .where(OutcomeModel.deleted_at.is_not(None), OutcomeModel.deleted_at < cutoff)
+        .limit(batch_size)
+    )
+    return delete(OutcomeModel).where(
+        tuple_(OutcomeModel.msg_id, OutcomeModel.chat_id, OutcomeModel.user_id).in_(expired)
+    ).execution_options(synchronize_session=False)
+
+def update_if_unchanged_statement(previous: OutcomeSchema, updated: OutcomeSchema) -> Update:
+    """
+    UPDATE ... RETURNING writing updated's fields only if the live row still holds previous's.
+
+    Lets a cached copy of the row stand in for the SELECT: if the row changed
+    in the meantime (or the cache was stale) nothing matches.
+    """
+    return (
+        update(OutcomeModel)
+        .where(
+            *__by_id__(previous.msg_id, previous.chat_id, previous.user_id),
+            OutcomeModel.deleted_at.is_(None),
+            OutcomeModel.amount_cents == to_cents(previous.amount),
+            OutcomeModel.description == previous.description,
+            OutcomeModel.type.is_not_distinct_from(previous.type),
+            OutcomeModel.category.is_not_distinct_from(previous.category),
+            OutcomeModel.date == previous.date,
+        )
+        .values(
+            amount_cents=to_cents(updated.amount),
+            description=updated.description,
+            type=updated.type,
+            category=updated.category,
+            date=updated.date,
+        )
+        .returning(OutcomeModel)
+    )
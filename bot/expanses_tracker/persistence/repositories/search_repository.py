@@ -0,0 +1,183 @@
+"""Full-text search over the descriptions of live outcomes."""
+import re
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import Executable, and_, delete, func, insert, literal_column, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from expanses_tracker.application.models.outcome import OutcomeSchema
+from expanses_tracker.observability.instrumentation import instrument_repository
+from expanses_tracker.persistence.configurations.outcome_model import OutcomeModel
+from expanses_tracker.persistence.configurations.search_index import (
+    DESCRIPTION_VECTOR,
+    OWNER_TOKEN,
+    SEARCH_TABLE,
+    TS_CONFIG,
+    expenses_fts,
+    owner_token,
+)
+
+# Terms beyond this are ignored
+MAX_TERMS = 8
+
+__TERM_PATTERN__ = re.compile(r"\w+")
+# An expenses_fts row of each outcome, from its columns in expenses
+__INDEX_COLUMNS__ = ["msg_id", "chat_id", "user_id", "description", "owner"]
+__INDEX_ROW__ = (
+    OutcomeModel.msg_id, OutcomeModel.chat_id, OutcomeModel.user_id,
+    OutcomeModel.description, OWNER_TOKEN,
+)
+# Key of the expense of an expenses_fts row
+__INDEX_KEY__ = tuple_(expenses_fts.c.msg_id, expenses_fts.c.chat_id, expenses_fts.c.user_id)
+
+def search_terms(query: str) -> list[str]:
+    """Words of a search query, lowercased; punctuation and operators are dropped."""
+    return __TERM_PATTERN__.findall(query.lower())[:MAX_TERMS]
+
+def __by_keys__(outcomes: Iterable[OutcomeSchema]):
+    keys = [(o.msg_id, o.chat_id, o.user_id) for o in outcomes]
+    return tuple_(OutcomeModel.msg_id, OutcomeModel.chat_id, OutcomeModel.user_id).in_(keys)
+
+def __match__(query: str):
+    return text(f"{SEARCH_TABLE} MATCH :query").bindparams(query=query)
+
+def search_index_delta_statements(
+        dialect_name: str,
+        added: Iterable[OutcomeSchema] = (),
+        removed: Iterable[OutcomeSchema] = ()) -> list[Executable]:
+    """
+    Statements removing `removed` from and adding `added` to the search index, in this order
+
+    `added` are read by primary key from expenses, so they must be there; `removed` are found
+    by their key in the index. Outcomes in both with the same description are left alone.
+
+    Returns:
+        The statements to run, none on PostgreSQL whose index follows the table by itself
+    """
+    if dialect_name != "sqlite":
+        return []
+    added = {(o.msg_id, o.chat_id, o.user_id): o for o in added}
+    removed = {(o.msg_id, o.chat_id, o.user_id): o for o in removed}
+    for key in added.keys() & removed.keys():
+        if added[key].description == removed[key].description:
+            del added[key], removed[key]
+    statements = []
+    if removed:
+        # The key columns aren't indexed: the owner tokens narrow the scan to their users' rows
+        owners = sorted({owner_token(o.chat_id, o.user_id) for o in removed.values()})
+        owners_query = " OR ".join(f'"{owner}"' for owner in owners)
+        statements.append(delete(expenses_fts).where(
+            __match__(f"owner : ({owners_query})"), __INDEX_KEY__.in_(list(removed))
+        ))
+    if added:
+        statements.append(insert(expenses_fts).from_select(
+            __INDEX_COLUMNS__, select(*__INDEX_ROW__).where(__by_keys__(added.values()))
+        ))
+    return statements
+
+def search_statement(
+        dialect_name: str,
+        terms: list[str],
+        chat_id: int,
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None):
+    """SELECT of the live outcomes of a user matching every term (as a prefix), best match first."""
+    filters = [
+        OutcomeModel.chat_id == chat_id, OutcomeModel.user_id == user_id,
+        OutcomeModel.deleted_at.is_(None),
+    ]
+    if start is not None:
+        filters.append(OutcomeModel.date >= start)
+    if end is not None:
+        filters.append(OutcomeModel.date < end)
+    if dialect_name == "postgresql":
+        prefixes = " & ".join(f"{term}:*" for term in terms)
+        query = func.to_tsquery(literal_column(f"'{TS_CONFIG}'"), prefixes)
+        return (
+            select(OutcomeModel)
+            .where(DESCRIPTION_VECTOR.op("@@")(query), *filters)
+            .order_by(
+                func.ts_rank(DESCRIPTION_VECTOR, query).desc(),
+                OutcomeModel.date.desc(), OutcomeModel.msg_id.desc(),
+            )
+        )
+    if dialect_name == "sqlite":
+        # Quoted terms can't be read as FTS5 operators;
+        # the owner token narrows the match to the user's rows
+        prefixes = " ".join(f'"{term}"*' for term in terms)
+        query = f'owner : "{owner_token(chat_id, user_id)}" AND description : ({prefixes})'
+        return (
+            select(OutcomeModel)
+            .select_from(expenses_fts)
+            .join(OutcomeModel, and_(
+                OutcomeModel.msg_id == expenses_fts.c.msg_id,
+                OutcomeModel.chat_id == expenses_fts.c.chat_id,
+                OutcomeModel.user_id == expenses_fts.c.user_id,
+            ))
+            .where(__match__(query), *filters)
+            .order_by(expenses_fts.c.rank, OutcomeModel.date.desc(), OutcomeModel.msg_id.desc())
+        )
+    raise ValueError(f"Search is not supported on the '{dialect_name}' backend.")
+
+@instrument_repository
+class SearchRepository:
+    """Repository class to search outcomes and maintain the search index"""
+
+    @staticmethod
+    async def search(
+        session: AsyncSession,
+        chat_id: int,
+        user_id: int,
+        terms: list[str],
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: int = 10,
+        offset: int = 0
+    ) -> list[OutcomeSchema]:
+        """
+        Search the live outcomes of a user in a chat by description
+
+        Args:
+            session: Async database session
+            chat_id: Telegram chat ID
+            user_id: Telegram user ID
+            terms: Words every result contains, as a word prefix (see search_terms())
+            start: Only outcomes dated from start
+            end: Only outcomes dated before end
+            limit: Maximum number of results
+            offset: Results skipped, for the pages after the first
+
+        Returns:
+            The matching OutcomeSchema instances, best match first, then newest first
+        """
+        if not terms:
+            return []
+        stmt = search_statement(
+            session.get_bind().dialect.name, terms, chat_id, user_id, start, end
+        )
+        result = await session.scalars(stmt.limit(limit).offset(offset))
+        return [OutcomeSchema.model_validate(row) for row in result.all()]
+
+    @staticmethod
+    def rebuild(session: Session) -> int:
+        """
+        Recompute the SQLite search index from the expenses table in one transaction
+
+        Needed if expenses was written without the repositories, e.g. by hand or by a restore.
+
+        Args:
+            session: Database session
+
+        Returns:
+            Number of indexed outcomes, 0 on PostgreSQL where there is nothing to rebuild
+        """
+        if session.get_bind().dialect.name != "sqlite":
+            return 0
+        session.execute(delete(expenses_fts))
+        result = session.execute(insert(expenses_fts).from_select(
+            __INDEX_COLUMNS__, select(*__INDEX_ROW__).where(OutcomeModel.deleted_at.is_(None))
+        ))
+        session.commit()
+        return result.rowcount
@@ -0,0 +1,160 @@
+"""Write-behind queue batching outcome inserts from every chat into multi-row INSERTs."""
+import asyncio
+import logging
+import os
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from expanses_tracker.application.models.outcome import OutcomeDto, OutcomeSchema
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+
+log = logging.getLogger(__name__)
+
+class OutcomeWriteBehindQueue:
+    """
+    Collects outcome inserts and flushes them as one INSERT ... RETURNING.
+
+    A flush happens once `max_batch` inserts are pending or `flush_interval`
+    seconds after the first pending insert, whichever comes first. Every
+    caller awaits what create_outcome would return it (or its own exception):
+    a redelivered message gets the stored outcome without failing the batch.
+    """
+
+    # Environment variables configuring the queue
+    ENV_ENABLED = "WRITE_BEHIND_ENABLED"
+    ENV_MAX_BATCH = "WRITE_BEHIND_MAX_BATCH"
+    ENV_FLUSH_INTERVAL_MS = "WRITE_BEHIND_FLUSH_INTERVAL_MS"
+
+    __instance: Optional["OutcomeWriteBehindQueue"] = None
+
+    def __init__(
+        self,
+        max_batch: int = 100,
+        flush_interval: float = 0.05,
+        session_factory: Callable[[], AsyncSession] = AsyncDatabaseFactory.get_session,
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1.")
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.__session_factory = session_factory
+        self.__pending: list[tuple[tuple[OutcomeDto, int, int, int], asyncio.Future]] = []
+        self.__timer: Optional[asyncio.TimerHandle] = None
+        self.__flushes: set[asyncio.Task] = set()
+        self.__flush_lock = asyncio.Lock()
+        self.__closed = False
+
+    @classmethod
+    def init_from_env(cls) -> Optional["OutcomeWriteBehindQueue"]:
+        """Create the shared queue if WRITE_BEHIND_ENABLED is set, return it (or None)."""
+        if os.environ.get(cls.ENV_ENABLED, "").lower() not in ("1", "true", "yes"):
+            return None
+        if cls.__instance is None:
+            cls.__instance = cls(
+                max_batch=int(os.environ.get(cls.ENV_MAX_BATCH, "100")),
+                flush_interval=int(os.environ.get(cls.ENV_FLUSH_INTERVAL_MS, "50")) / 1000,
+            )
+            log.info(
+                "Write-behind enabled (max_batch=%d, flush_interval=%.3fs)",
+                cls.__instance.max_batch, cls.__instance.flush_interval
+            )
+        return cls.__instance
+
+    @classmethod
+    def get_instance(cls) -> Optional["OutcomeWriteBehindQueue"]:
+        """Get the shared queue, None when write-behind is disabled."""
+        return cls.__instance
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Flush and close the shared queue; meant to run on application shutdown."""
+        if cls.__instance is not None:
+            await cls.__instance.close()
+            cls.__instance = None
+
+    @property
+    def pending(self) -> int:
+        """Number of inserts waiting for the next flush."""
+        return len(self.__pending)
+
+    async def submit(
+        self, outcome: OutcomeDto, message_id: int, chat_id: int, user_id: int
+    ) -> tuple[Optional[OutcomeSchema], bool]:
+        """Queue an insert and wait until the batch holding it has been committed.
+
+        See create_outcome.
+        """
+        if self.__closed:
+            async with self.__session_factory() as session:
+                return await AsyncOutcomeRepository.create_outcome(
+                    session, outcome, message_id, chat_id, user_id
+                )
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.__pending.append(((outcome, message_id, chat_id, user_id), future))
+        if len(self.__pending) >= self.max_batch:
+            self.__schedule_flush()
+        elif self.__timer is None:
+            self.__timer = loop.call_later(self.flush_interval, self.__schedule_flush)
+        return await future
+
+    def __schedule_flush(self) -> None:
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self.__flushes.add(task)
+        task.add_done_callback(self.__flushes.discard)
+
+    async def flush(self) -> None:
+        """Write every pending insert, max_batch rows per statement."""
+        async with self.__flush_lock:
+            while self.__pending:
+                batch = self.__pending[:self.max_batch]
+                del self.__pending[:self.max_batch]
+                await self.__write_batch(batch)
+
+    async def __write_batch(
+        self, batch: list[tuple[tuple[OutcomeDto, int, int, int], asyncio.Future]]
+    ) -> None:
+        try:
+            async with self.__session_factory() as session:
+                created = await AsyncOutcomeRepository.create_outcomes(
+                    session, [args for args, _ in batch]
+                )
+        except Exception as e:
+            log.warning(
+                "Batch insert of %d outcomes failed, retrying one by one: %s", len(batch), e
+            )
+            await self.__write_one_by_one(batch)
+            return
+        for (_, future), result in zip(batch, created):
+            if not future.done():
+                future.set_result(result)
+
+    async def __write_one_by_one(
+        self, batch: list[tuple[tuple[OutcomeDto, int, int, int], asyncio.Future]]
+    ) -> None:
+        # Isolate the failing rows so every caller gets its own outcome or error
+        for args, future in batch:
+            try:
+                async with self.__session_factory() as session:
+                    result = await AsyncOutcomeRepository.create_outcome(session, *args)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def close(self) -> None:
+        """Stop batching and flush whatever is still pending."""
+        self.__closed = True
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        if self.__flushes:
+            await asyncio.gather(*self.__flushes, return_exceptions=True)
+        await self.flush()
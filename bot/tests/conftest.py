@@ -0,0 +1,122 @@
+"""Shared fixtures for the test suite."""
+
+from __future__ import annotations
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from expanses_tracker.application.models.outcome import OutcomeDto, OutcomeSchema
+from expanses_tracker.application.utils.access_control import AccessControl, UserRateLimiter
+from expanses_tracker.application.utils.update_dedupe import RecentUpdates
+from expanses_tracker.persistence.configurations.base import Base
+# Register every table on Base.metadata
+from expanses_tracker.persistence.database_context import database  # pylint: disable=unused-import
+from expanses_tracker.persistence.repositories.budget_tracker import BudgetTracker
+from expanses_tracker.persistence.repositories.category_index import CategoryIndex
+from expanses_tracker.persistence.repositories.outcome_cache import OutcomeCache
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Create the schema in a temporary SQLite file and return its aiosqlite URL."""
+    db_path = tmp_path / "expenses.db"
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return f"sqlite+aiosqlite:///{db_path}"
+
+
+@pytest.fixture
+def run_with_sessions(sqlite_db):
+    """
+    Run `scenario(session_maker, *args)` in a new event loop and return its result.
+
+    The session maker is configured like AsyncDatabaseFactory's, on an engine
+    of sqlite_db disposed before the loop closes.
+    """
+    def run(scenario: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        async def with_engine():
+            engine = create_async_engine(sqlite_db)
+            try:
+                return await scenario(
+                    async_sessionmaker(engine, autoflush=False, expire_on_commit=False),
+                    *args,
+                    **kwargs,
+                )
+            finally:
+                await engine.dispose()
+        return asyncio.run(with_engine())
+    return run
+
+
+@pytest.fixture
+def make_outcome():
+    """
+    Build a stored OutcomeSchema without validation: by default message 1 of
+    user 3 in chat 2, 1.00 spent on 2025-09-01. The amount is made a Decimal.
+    """
+    def make(msg_id: int = 1, amount: Decimal | int | str = 1, **fields) -> OutcomeSchema:
+        values = {
+            "chat_id": 2, "user_id": 3, "description": "x",
+            "type": None, "category": None, "date": datetime(2025, 9, 1),
+        }
+        return OutcomeSchema.model_construct(
+            msg_id=msg_id, amount=Decimal(str(amount)), **(values | fields)
+        )
+    return make
+
+
+@pytest.fixture
+def make_dto():
+    """Build the OutcomeDto of a new expense: by default 1.00 spent on 2025-09-01."""
+    def make(amount: Decimal | int | str = 1, description: str = "x", **fields) -> OutcomeDto:
+        return OutcomeDto(
+            amount=amount, description=description, **({"date": datetime(2025, 9, 1)} | fields)
+        )
+    return make
+
+
+@pytest.fixture(autouse=True)
+def fresh_outcome_cache():
+    """Every test starts with an empty shared outcome cache, sized from its own environment."""
+    OutcomeCache.reset_instance()
+    yield
+    OutcomeCache.reset_instance()
+
+
+@pytest.fixture(autouse=True)
+def fresh_access_control():
+    """Every test reads the allowlist and the rate limits from its own environment."""
+    AccessControl.reset()
+    UserRateLimiter.reset_instance()
+    yield
+    AccessControl.reset()
+    UserRateLimiter.reset_instance()
+
+
+@pytest.fixture(autouse=True)
+def fresh_update_window():
+    """Every test starts with an empty window of received update IDs."""
+    RecentUpdates.reset_instance()
+    yield
+    RecentUpdates.reset_instance()
+
+
+@pytest.fixture(autouse=True)
+def fresh_category_index():
+    """Every test starts with an empty category index, configured from its own environment."""
+    CategoryIndex.reset_instance()
+    yield
+    CategoryIndex.reset_instance()
+
+
+@pytest.fixture(autouse=True)
+def fresh_budget_tracker():
+    """Every test starts without budgets in memory."""
+    BudgetTracker.reset_instance()
+    yield
+    BudgetTracker.reset_instance()
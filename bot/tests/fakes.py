@@ -0,0 +1,69 @@
+"""Offline stand-ins for the Telegram Bot API, shared by the tests."""
+
+from __future__ import annotations
+import asyncio
+import json
+import time
+from typing import Any, Optional
+from telegram.request import BaseRequest, RequestData
+
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "Expenses", "username": "expenses_test_bot"}
+
+
+class RecordingRequest(BaseRequest):
+    """
+    Answers Bot API calls locally and records them.
+
+    getMe returns BOT_USER, send*/edit* methods return a plausible Message,
+    everything else returns True.
+    """
+
+    def __init__(self):
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+        self.__next_message_id = 1000
+        self.__called = asyncio.Event()
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+
+    def methods(self) -> list[str]:
+        """Names of the called Bot API methods, in call order."""
+        return [method for method, _ in self.calls]
+
+    async def wait_for(self, method: str, timeout: float = 5) -> dict[str, Any]:
+        """Wait until `method` is called and return the parameters of its first call."""
+        async def called():
+            while method not in self.methods():
+                self.__called.clear()
+                await self.__called.wait()
+        await asyncio.wait_for(called(), timeout)
+        return next(params for name, params in self.calls if name == method)
+
+    def __result(self, method: str, params: dict[str, Any]) -> Any:
+        if method == "getMe":
+            return BOT_USER
+        if method.startswith(("send", "edit")):
+            self.__next_message_id += 1
+            return {
+                "message_id": params.get("message_id", self.__next_message_id),
+                "date": int(time.time()),
+                "chat": {"id": params.get("chat_id", 0), "type": "private"},
+                "text": params.get("text", ""),
+            }
+        return True
+
+    async def do_request(
+        self, url: str, method: str, request_data: Optional[RequestData] = None, *_, **__
+    ) -> tuple[int, bytes]:
+        api_method = url.rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data else {}
+        self.calls.append((api_method, params))
+        self.__called.set()
+        return 200, json.dumps({"ok": True, "result": self.__result(api_method, params)}).encode()
@@ -0,0 +1,125 @@
+"""
+Tests for the reloadable allowlist and the per-user token buckets of ensure_access_guard.
+"""
+
+import asyncio
+import os
+import signal
+from types import SimpleNamespace
+import pytest
+
+from expanses_tracker.application.utils.access_control import (
+    AccessControl,
+    UserRateLimiter,
+    parse_allowed_ids,
+)
+from expanses_tracker.application.utils.decorators import ensure_access_guard
+
+
+def test_parse_allowed_ids():
+    """Commas, whitespace and comments are accepted; invalid entries are skipped."""
+    assert parse_allowed_ids("1,2, 3\n# team\n4 5 # bob\nnope") == {1, 2, 3, 4, 5}
+    assert parse_allowed_ids("") == frozenset()
+
+
+def test_allowlist_reload_from_file(monkeypatch, tmp_path):
+    """The file wins over the variable and is re-read on reload()."""
+    allowlist = tmp_path / "allowed.txt"
+    allowlist.write_text("10\n")
+    monkeypatch.setenv("ALLOWED_CHAT_IDS", "20")
+    monkeypatch.setenv("ALLOWED_CHAT_IDS_FILE", str(allowlist))
+    assert AccessControl.is_allowed(10) and not AccessControl.is_allowed(20)
+
+    allowlist.write_text("10\n30\n")
+    assert not AccessControl.is_allowed(30)
+    assert AccessControl.reload()
+    assert AccessControl.is_allowed(30)
+
+    allowlist.unlink()
+    assert not AccessControl.reload()
+    assert AccessControl.is_allowed(30)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="no SIGHUP on this platform")
+def test_allowlist_reload_on_sighup(monkeypatch, tmp_path):
+    """SIGHUP applies a new allowlist without a restart."""
+    allowlist = tmp_path / "allowed.txt"
+    allowlist.write_text("10\n")
+    monkeypatch.setenv("ALLOWED_CHAT_IDS_FILE", str(allowlist))
+
+    async def scenario():
+        assert AccessControl.install_reload_signal()
+        try:
+            assert not AccessControl.is_allowed(40)
+            allowlist.write_text("40\n")
+            os.kill(os.getpid(), signal.SIGHUP)
+            for _ in range(100):
+                if AccessControl.is_allowed(40):
+                    break
+                await asyncio.sleep(0.01)
+            return AccessControl.is_allowed(40)
+        finally:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+
+    assert asyncio.run(scenario())
+
+
+def test_token_bucket_burst_and_rate():
+    """`burst` updates pass at once, then one every 1/rate seconds."""
+    limiter = UserRateLimiter(rate=2, burst=3)
+    assert [limiter.reserve(1, now=0.0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.reserve(1, now=0.0) == pytest.approx(0.5)
+    limiter.refund(1)
+    assert limiter.reserve(1, now=0.5) == 0
+    assert limiter.reserve(2, now=0.5) == 0  # other users have their own bucket
+
+
+def test_same_update_charged_once():
+    """An update reaching several guarded handlers takes a single token."""
+    limiter = UserRateLimiter(rate=1, burst=1)
+    assert limiter.reserve(1, update_id=7, now=0.0) == 0
+    assert limiter.reserve(1, update_id=7, now=0.0) == 0
+    assert limiter.reserve(1, update_id=8, now=0.0) > 0
+
+
+def test_defer_mode_waits_for_a_token():
+    """In defer mode the update is delayed instead of dropped, unless the wait is too long."""
+    limiter = UserRateLimiter(rate=50, burst=1, mode="defer", max_delay=0.1)
+
+    async def scenario():
+        return [await limiter.acquire(1, update_id) for update_id in range(3)]
+
+    assert asyncio.run(scenario()) == [True, True, True]
+    assert limiter.deferred == 2 and limiter.dropped == 0
+
+
+def test_rate_limit_off_by_default(monkeypatch):
+    """Dropped expenses would be lost: no limiter unless RATE_LIMIT_PER_SECOND is set."""
+    monkeypatch.delenv("RATE_LIMIT_PER_SECOND", raising=False)
+    assert UserRateLimiter.get_instance() is None
+    UserRateLimiter.reset_instance()
+    monkeypatch.setenv("RATE_LIMIT_PER_SECOND", "2")
+    limiter = UserRateLimiter.get_instance()
+    assert (limiter.rate, limiter.burst, limiter.mode) == (2, 10, "drop")
+
+
+def test_guard_drops_excess_updates(monkeypatch):
+    """Updates over the limit never reach the handler."""
+    monkeypatch.setenv("RATE_LIMIT_PER_SECOND", "0.001")
+    monkeypatch.setenv("RATE_LIMIT_BURST", "2")
+    handled = []
+
+    @ensure_access_guard
+    async def handler(update, _):
+        handled.append(update.update_id)
+
+    async def scenario():
+        for update_id in range(5):
+            update = SimpleNamespace(
+                update_id=update_id, effective_user=SimpleNamespace(id=1), effective_chat=None
+            )
+            await handler(update, None)
+
+    asyncio.run(scenario())
+    assert handled == [0, 1]
+    assert UserRateLimiter.get_instance().dropped == 3
@@ -0,0 +1,181 @@
+"""
+Tests for the asyncio persistence layer.
+
+Covers the DATABASE_URL to async driver mapping, a full
+create/update/soft delete/restore/delete cycle of AsyncOutcomeRepository,
+the bulk purge of expired rows against a temporary SQLite database and the
+aware datetimes bound as naive UTC.
+"""
+
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from expanses_tracker.application.models.outcome import OutcomeDto, OutcomeSchema
+from expanses_tracker.persistence.configurations.outcome_model import OutcomeModel
+from expanses_tracker.persistence.configurations.timestamps import UtcDateTime
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.outcome_statements import (
+    update_if_unchanged_statement,
+)
+
+
+@pytest.mark.parametrize(
+    "sync_url, expected",
+    [
+        ("sqlite:///expenses.db", "sqlite+aiosqlite:///expenses.db"),
+        ("postgresql://u:p@db:5432/expenses", "postgresql+asyncpg://u:p@db:5432/expenses"),
+        ("postgresql+psycopg2://u:p@db/expenses", "postgresql+asyncpg://u:p@db/expenses"),
+        (
+            "postgresql://u:p@db/expenses?sslmode=require",
+            "postgresql+asyncpg://u:p@db/expenses?ssl=require",
+        ),
+    ],
+)
+def test_async_connection_url(monkeypatch, sync_url, expected):
+    """Swaps the sync driver for the matching asyncio driver."""
+    monkeypatch.setenv("DATABASE_URL", sync_url)
+    url = AsyncDatabaseFactory.get_connection_url()
+    assert url.render_as_string(hide_password=False) == expected
+
+
+def test_async_connection_url_unknown_backend(monkeypatch):
+    """Rejects backends without a configured asyncio driver."""
+    monkeypatch.setenv("DATABASE_URL", "mssql://u:p@db/expenses")
+    with pytest.raises(ValueError, match="No asyncio driver"):
+        AsyncDatabaseFactory.get_connection_url()
+
+
+async def __outcome_lifecycle(session_maker: async_sessionmaker):
+    async with session_maker() as session:
+        created, _ = await AsyncOutcomeRepository.create_outcome(
+            session,
+            OutcomeDto(
+                amount=10.5, description="spesa", category="food", date=datetime(2025, 9, 9)
+            ),
+            message_id=1,
+            chat_id=2,
+            user_id=3,
+        )
+        assert created.amount == pytest.approx(10.5)
+
+        updated = await AsyncOutcomeRepository.update_outcome(
+            session,
+            OutcomeSchema.model_construct(
+                msg_id=1, chat_id=2, user_id=3, amount=12.0, description="spesa casa",
+                type="need", category="home", date=datetime(2025, 9, 10),
+            ),
+        )
+        assert updated is not None
+        assert updated.description == "spesa casa" and updated.category == "home"
+
+        # Other users cannot delete the outcome
+        assert not await AsyncOutcomeRepository.soft_delete(session, 1, 2, 4)
+        assert await AsyncOutcomeRepository.soft_delete(session, 1, 2, 3)
+        assert not await AsyncOutcomeRepository.soft_delete(session, 1, 2, 3)
+        assert await AsyncOutcomeRepository.get_outcome_by_id(session, 1, 2, 3) is None
+
+        assert await AsyncOutcomeRepository.restore(session, 2, 1, 3, undo_grace_seconds=10)
+        # Restored outcomes are not hard deleted
+        assert not await AsyncOutcomeRepository.delete_outcome(session, 1, 2, 3)
+
+        deleted = await AsyncOutcomeRepository.soft_delete(session, 1, 2, 3)
+        assert deleted is not None and deleted.deleted_at is not None
+        # Grace window already elapsed: the conditional UPDATE matches nothing
+        assert await AsyncOutcomeRepository.restore(session, 2, 1, 3, undo_grace_seconds=-1) is None
+        # Other users cannot restore or hard delete it either
+        assert await AsyncOutcomeRepository.restore(session, 2, 1, 4, undo_grace_seconds=10) is None
+        assert await AsyncOutcomeRepository.delete_outcome(session, 1, 2, 4) is None
+        purged = await AsyncOutcomeRepository.delete_outcome(session, 1, 2, 3)
+        assert purged is not None and purged.description == "spesa casa"
+        outcome = await AsyncOutcomeRepository.get_outcome_by_id(
+            session, 1, 2, 3, include_deleted=True
+        )
+        assert outcome is None
+
+
+def test_async_outcome_lifecycle(run_with_sessions):
+    """Creates, updates, soft deletes, restores and deletes an outcome."""
+    run_with_sessions(__outcome_lifecycle)
+
+
+async def __purge_expired(session_maker: async_sessionmaker):
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.create_outcomes(session, [
+            (OutcomeDto(amount=i, description="spesa", date=datetime(2025, 9, 9)), i, 2, 3)
+            for i in range(1, 8)
+        ])
+        for i in range(1, 7):
+            assert await AsyncOutcomeRepository.soft_delete(session, i, 2, 3)
+        # Only rows past the grace window are purged
+        purged = await AsyncOutcomeRepository.purge_expired(session, grace_seconds=60, batch_size=2)
+        assert purged == 0
+        # Five expired rows purged in batches of two, the live one is kept
+        await session.execute(
+            update(OutcomeModel)
+            .where(OutcomeModel.msg_id < 6)
+            .values(deleted_at=datetime.now(tz=timezone.utc) - timedelta(hours=1))
+        )
+        await session.commit()
+        purged = await AsyncOutcomeRepository.purge_expired(session, grace_seconds=60, batch_size=2)
+        assert purged == 5
+        remaining = await session.scalars(select(OutcomeModel.msg_id).order_by(OutcomeModel.msg_id))
+        assert remaining.all() == [6, 7]
+
+
+def test_purge_expired(run_with_sessions):
+    """Purges expired soft deleted rows in bounded batches and reports the count."""
+    run_with_sessions(__purge_expired)
+
+
+# Telegram's message dates are aware, in UTC; this one is the same instant in CEST
+AWARE = datetime(2025, 9, 9, 1, 30, tzinfo=timezone(timedelta(hours=2)))
+NAIVE_UTC = datetime(2025, 9, 8, 23, 30)
+
+
+def test_aware_datetimes_bind_as_naive_utc():
+    """asyncpg refuses aware values for a column without time zone: they reach it as naive UTC."""
+    process = UtcDateTime().bind_processor(asyncpg_dialect())
+    assert process(AWARE) == NAIVE_UTC and process(AWARE).tzinfo is None
+    assert process(NAIVE_UTC) == NAIVE_UTC
+    assert process(None) is None
+
+
+async def __aware_dates(session_maker: async_sessionmaker):
+    async with session_maker() as session:
+        created, _ = await AsyncOutcomeRepository.create_outcome(
+            session,
+            OutcomeDto(amount=1, description="spesa", date=AWARE),
+            message_id=1,
+            chat_id=2,
+            user_id=3,
+        )
+        # The compare-and-swap matches the stored date given the aware one
+        updated = (await session.scalars(update_if_unchanged_statement(
+            created.model_copy(update={"date": AWARE}),
+            created.model_copy(update={"date": AWARE + timedelta(days=1)}),
+        ))).first()
+        await session.commit()
+        deleted = await AsyncOutcomeRepository.soft_delete(session, 1, 2, 3)
+        restored = await AsyncOutcomeRepository.restore(session, 2, 1, 3, undo_grace_seconds=10)
+        row = await session.get(OutcomeModel, (1, 2, 3))
+        return created, updated, deleted, restored, row
+
+
+def test_aware_datetimes_are_stored_as_naive_utc(run_with_sessions):
+    """Aware dates are stored in UTC.
+
+    The timestamps written by the repository are naive UTC too.
+    """
+    before = datetime.now(timezone.utc).replace(tzinfo=None)
+    created, updated, deleted, restored, row = run_with_sessions(__aware_dates)
+    after = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert created.date == NAIVE_UTC
+    assert updated is not None and updated.date == NAIVE_UTC + timedelta(days=1)
+    assert deleted is not None and before <= deleted.deleted_at <= after
+    assert restored is not None
+    assert before <= row.created_at <= row.updated_at <= after
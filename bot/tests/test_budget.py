@@ -0,0 +1,208 @@
+"""
+Tests for the monthly budgets.
+
+Covers the parsing of the /budget arguments, the thresholds crossed by new and
+edited expenses, the running totals following the repositories' writes, their
+load from the budgets table and the rollup after a restart, and the migration.
+"""
+
+from __future__ import annotations
+from datetime import datetime
+from decimal import Decimal
+from functools import partial
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from benchmarks.seed import migrate
+from expanses_tracker.application.features.budget.budget_command_handler import (
+    BUDGET_USAGE,
+    BudgetRequest,
+    budget_alert_text,
+    format_budgets,
+    parse_budget_args,
+)
+from expanses_tracker.application.models.budget import BudgetSchema
+from expanses_tracker.application.models.outcome import OutcomeSchema
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.budget_repository import BudgetRepository
+from expanses_tracker.persistence.repositories.budget_tracker import BudgetAlert, BudgetTracker
+
+
+@pytest.mark.parametrize("args, expected", [
+    ([], BudgetRequest()),
+    (["Food", "250"], BudgetRequest("food", Decimal("250.00"))),
+    (["food", "99,5"], BudgetRequest("food", Decimal("99.50"))),
+    (["food", "off"], BudgetRequest("food")),
+    (["food", "0"], BudgetRequest("food")),
+])
+def test_parse_budget_args(args, expected):
+    """A category and a limit set a budget, `off` or 0 removes it, nothing lists them."""
+    assert parse_budget_args(args) == expected
+
+
+@pytest.mark.parametrize(
+    "args", [["food"], ["pizza", "10"], ["food", "-5"], ["food", "ten"], ["food", "1", "2"]]
+)
+def test_parse_budget_args_rejects_the_rest(args):
+    """Unknown categories, negative or non-numeric limits and extra arguments get the usage."""
+    with pytest.raises(ValueError, match="Usage"):
+        parse_budget_args(args)
+
+
+@pytest.fixture(name="food")
+def fixture_food(make_outcome):
+    """Stored food expenses of March 2025, or of another `month`."""
+    def make(msg_id: int, amount: str, month: int = 3, **fields) -> OutcomeSchema:
+        return make_outcome(
+            msg_id, amount, **({"category": "food", "date": datetime(2025, month, 1)} | fields)
+        )
+    return make
+
+
+def test_thresholds_alert_once(food):
+    """Each threshold is announced by the outcome crossing it, the highest if it crosses both."""
+    tracker = BudgetTracker()
+    tracker.set_budget(2, 3, "food", 10000, {"2025-03": 7000})
+    alerts = []
+    for msg_id, amount in enumerate(("5", "10", "10", "10", "1"), start=1):
+        outcome = food(msg_id, amount)
+        tracker.record(added=[outcome])
+        alerts.append(tracker.pop_alert(outcome))
+    assert alerts == [
+        None,
+        BudgetAlert("food", "2025-03", 80, 8500, 10000),
+        None,
+        BudgetAlert("food", "2025-03", 100, 10500, 10000),
+        None,
+    ]
+    # Popped once
+    assert tracker.pop_alert(food(2, "10")) is None
+    # Another month, from scratch: straight over the budget
+    tracker.record(added=[food(6, "120", month=4)])
+    april = food(6, "120", month=4)
+    assert tracker.pop_alert(april) == BudgetAlert("food", "2025-04", 100, 12000, 10000)
+
+
+def test_edits_are_measured_from_the_previous_total(food):
+    """An edit alerts only past a threshold; categories without a budget aren't tracked."""
+    tracker = BudgetTracker()
+    tracker.set_budget(2, 3, "food", 10000, {})
+    tracker.record(added=[food(1, "85")])
+    assert tracker.pop_alert(food(1, "85")).percent == 80
+    tracker.record(added=[food(1, "86")], removed=[food(1, "85")])
+    assert tracker.pop_alert(food(1, "86")) is None
+    tracker.record(added=[food(1, "86", category="home")], removed=[food(1, "86")])
+    assert tracker.get(2, 3, "food").months == {}
+    tracker.record(added=[food(1, "100")], removed=[food(1, "86", category="home")])
+    assert tracker.pop_alert(food(1, "100")).percent == 100
+    tracker.record(added=[food(7, "5", category=None)])
+    assert tracker.get(2, 3, "food").months == {"2025-03": 10000}
+
+
+def test_pending_alerts_are_bounded(monkeypatch, food):
+    """Alerts nobody pops are dropped oldest first."""
+    monkeypatch.setattr(BudgetTracker, "MAX_PENDING_ALERTS", 2)
+    tracker = BudgetTracker()
+    tracker.set_budget(2, 3, "food", 100, {})
+    outcomes = [food(1, "2"), food(2, "2", month=4), food(3, "2", month=5)]
+    tracker.record(added=outcomes)
+    assert [tracker.pop_alert(outcome) is not None for outcome in outcomes] == [False, True, True]
+
+
+def test_budget_messages():
+    """The alert texts, and the /budget listing with the month's totals."""
+    assert budget_alert_text(BudgetAlert("food", "2025-03", 80, 8500, 10000)) == (
+        "⚠️ 80% of the budget reached in 2025-03: food: 85.00 of 100.00 (85%)"
+    )
+    over = budget_alert_text(BudgetAlert("food", "2025-03", 100, 10050, 10000))
+    assert over.startswith("🚨 Over budget in 2025-03!")
+    BudgetTracker.get_instance().set_budget(2, 3, "food", 10000, {"2025-03": 2550})
+    budgets = [
+        BudgetSchema(chat_id=2, user_id=3, category="food", limit=100),
+        BudgetSchema(chat_id=2, user_id=3, category="home", limit=50),
+    ]
+    assert format_budgets(budgets, "2025-03") == (
+        "Budgets for 2025-03:\n- food: 25.50 of 100.00 (25%)\n- home: 0.00 of 50.00 (0%)"
+    )
+    assert format_budgets([], "2025-03") == "No budgets set.\n" + BUDGET_USAGE
+
+
+async def __budget_lifecycle(session_maker: async_sessionmaker, make_dto):
+    tracker = BudgetTracker.get_instance()
+
+    def spent():
+        tracked = BudgetTracker.get_instance().get(2, 3, "food")
+        return tracked.months.get("2025-03", 0) if tracked else None
+
+    groceries = partial(
+        make_dto, description="groceries", category="food", date=datetime(2025, 3, 1)
+    )
+
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.create_outcome(session, groceries(50), 1, 2, 3)
+        await AsyncOutcomeRepository.create_outcome(session, groceries(99), 2, 2, 9)
+    steps = {"before budget": spent()}
+    async with session_maker() as session:
+        await BudgetRepository.set_budget(session, 2, 3, "food", Decimal(100))
+    steps["budget set"] = spent()
+    async with session_maker() as session:
+        created, _ = await AsyncOutcomeRepository.create_outcome(session, groceries(35), 3, 2, 3)
+    steps["created"] = (spent(), tracker.pop_alert(created))
+    async with session_maker() as session:
+        updated = await AsyncOutcomeRepository.update_outcome(
+            session, created.model_copy(update={"amount": 60})
+        )
+    steps["updated"] = (spent(), tracker.pop_alert(updated))
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.soft_delete(session, 3, 2, 3)
+    steps["deleted"] = spent()
+    async with session_maker() as session:
+        restored = await AsyncOutcomeRepository.restore(session, 2, 3, 3, undo_grace_seconds=60)
+    steps["restored"] = (spent(), tracker.pop_alert(restored))
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.create_outcomes(session, [(groceries(5), 4, 2, 3)])
+    steps["batch"] = spent()
+
+    # A new process: budgets and totals come back from the tables
+    BudgetTracker.reset_instance()
+    async with session_maker() as session:
+        steps["loaded"] = await BudgetRepository.load_tracker(session)
+    steps["after load"] = spent()
+    async with session_maker() as session:
+        steps["budgets"] = await BudgetRepository.get_budgets(session, 2, 3)
+        steps["removed"] = (
+            await BudgetRepository.remove_budget(session, 2, 3, "food"),
+            await BudgetRepository.remove_budget(session, 2, 3, "food"),
+        )
+    steps["after remove"] = spent()
+    return steps
+
+
+def test_totals_follow_outcomes(run_with_sessions, make_dto):
+    """Creates, updates, soft deletes and restores move the budget total; a load rebuilds it."""
+    steps = run_with_sessions(__budget_lifecycle, make_dto)
+    assert steps["before budget"] is None
+    assert steps["budget set"] == 5000
+    assert steps["created"] == (8500, BudgetAlert("food", "2025-03", 80, 8500, 10000))
+    assert steps["updated"] == (11000, BudgetAlert("food", "2025-03", 100, 11000, 10000))
+    assert steps["deleted"] == 5000
+    assert steps["restored"] == (11000, BudgetAlert("food", "2025-03", 100, 11000, 10000))
+    assert steps["batch"] == 11500
+    assert steps["loaded"] == 1
+    assert steps["after load"] == 11500
+    assert steps["budgets"] == [BudgetSchema(chat_id=2, user_id=3, category="food", limit=100)]
+    assert steps["removed"] == (True, False)
+    assert steps["after remove"] is None
+
+
+def test_migration_creates_budgets(sqlite_db):
+    """The migration adds an empty budgets table."""
+    url = sqlite_db.replace("+aiosqlite", "")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE budgets"))
+    migrate(url, "c41d7e9a2b65", "d5a83f17c2e4")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM budgets")).scalar() == 0
+    engine.dispose()
@@ -0,0 +1,65 @@
+"""
+Tests for the compact callback_data codec.
+
+Covers round trips of every action, negative and large IDs, optional
+values, the 64 bytes limit, prefix peeking, legacy JSON payloads and
+malformed input.
+"""
+
+from __future__ import annotations
+import pytest
+
+from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
+from expanses_tracker.application.utils.callback_codec import (
+    decode_callback_data,
+    encode_callback_data,
+    peek_callback_action,
+)
+
+
+@pytest.mark.parametrize("action", list(ButtonActions))
+@pytest.mark.parametrize(
+    "message_id, chat_id, value",
+    [(1, 1, None), (123456, -1001234567890, None), (2**31 - 1, -(2**52), "food"), (0, 0, "a:b")],
+)
+def test_round_trip(action, message_id, chat_id, value):
+    """Decodes back exactly what was encoded."""
+    data = ButtonDataDto(action=action, message_id=message_id, chat_id=chat_id, value=value)
+    encoded = encode_callback_data(data)
+    assert decode_callback_data(encoded) == data
+    assert peek_callback_action(encoded) == action
+    assert len(encoded.encode()) <= 64
+
+
+def test_typical_payload_size():
+    """A delete button of a supergroup takes 19 bytes, its JSON took 64."""
+    data = ButtonDataDto(action=ButtonActions.DELETE, message_id=123456, chat_id=-1001234567890)
+    assert encode_callback_data(data) == "1d1e240.-e91e3b12d2"
+
+
+def test_too_long_value():
+    """Refuses payloads Telegram would reject."""
+    with pytest.raises(ValueError, match="64 bytes"):
+        encode_callback_data(
+            ButtonDataDto(action=ButtonActions.CATEGORY, message_id=1, chat_id=1, value="x" * 60)
+        )
+
+
+def test_legacy_json():
+    """Buttons sent before the compact codec keep working."""
+    legacy = '{"action":"restore","message_id":5,"chat_id":-100}'
+    assert peek_callback_action(legacy) == ButtonActions.RESTORE
+    assert decode_callback_data(legacy) == ButtonDataDto(
+        action=ButtonActions.RESTORE, message_id=5, chat_id=-100
+    )
+
+
+@pytest.mark.parametrize(
+    "data",
+    ["", "2d1.2", "1x1.2", "1d", "1d12", "1d1.", "1dg.2", "1d1.2.3",
+     '{"action":"nope"}', '{"action":"delete"}', "{"],
+)
+def test_malformed(data):
+    """Unknown versions, actions or truncated ids are rejected."""
+    with pytest.raises(ValueError):
+        decode_callback_data(data)
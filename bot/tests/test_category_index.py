@@ -0,0 +1,189 @@
+"""
+Tests for the category suggestions.
+
+Covers the per-user word counts and their bounds, the confidence needed to
+fill in a category or type, the index following the repositories' writes,
+its load from the expenses table, and the ranked edit buttons.
+"""
+
+from __future__ import annotations
+import asyncio
+from datetime import datetime
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from expanses_tracker.application.features.add_or_edit_expense.category_suggestions import (
+    fill_missing_tags,
+    ranked_choices,
+)
+from expanses_tracker.application.features.buttons.edit_button_handler import choices_keyboard
+from expanses_tracker.application.models.button_data_dto import ButtonActions
+from expanses_tracker.application.models.constants import CATEGORIES
+from expanses_tracker.application.models.outcome import OutcomeDto, OutcomeSchema
+from expanses_tracker.application.utils.callback_codec import decode_callback_data
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.category_index import (
+    CategoryIndex,
+    Suggestion,
+    description_words,
+)
+
+
+def test_description_words():
+    """Lowercased distinct words, without numbers or single letters."""
+    assert description_words("Pizza x2 PIZZA a caffè 3") == {"pizza", "caffè"}
+
+
+def test_suggest_ranks_the_user_history():
+    """The categories and types of the outcomes sharing words, most voted first."""
+    index = CategoryIndex()
+    for _ in range(3):
+        index.update(2, 3, "pizza margherita", "food", "want")
+    index.update(2, 3, "pizza party gift", "gifts", "want")
+    index.update(2, 3, "party", "gifts", "want")
+    index.update(2, 9, "pizza", "home", "need")
+    assert index.suggest(2, 3, "Pizza!") == Suggestion(["food", "gifts"], ["want"], "food", "want")
+    # Three votes each: too close to call
+    assert index.suggest(2, 3, "party pizza") == Suggestion(
+        ["food", "gifts"], ["want"], None, "want"
+    )
+    assert index.suggest(2, 3, "train") == Suggestion()
+    assert index.suggest(4, 3, "pizza") == Suggestion()
+
+
+def test_suggest_needs_support():
+    """A single past outcome is only a ranking, never filled in."""
+    index = CategoryIndex()
+    index.update(2, 3, "dentist", "health", None)
+    assert index.suggest(2, 3, "dentist") == Suggestion(["health"], [], None, None)
+    index.update(2, 3, "dentist", "health", None)
+    assert index.suggest(2, 3, "dentist").category == "health"
+
+
+def test_update_removes_and_bounds_words():
+    """Removed outcomes leave no empty entries; each user keeps the most recently seen words."""
+    index = CategoryIndex(max_words=2)
+    index.update(2, 3, "rent", "home", "need")
+    index.update(2, 3, "rent", "home", "need", -1)
+    index.update(2, 3, "untagged", None, None)
+    assert len(index) == 0
+    index.update(2, 3, "bus", "transportation", None)
+    index.update(2, 3, "train", "transportation", None)
+    index.update(2, 3, "bus", "transportation", None)
+    index.update(2, 3, "flight", "travel", None)
+    assert len(index) == 2
+    assert index.suggest(2, 3, "train").categories == []
+    assert index.suggest(2, 3, "bus flight").categories == ["transportation", "travel"]
+
+
+def test_index_disabled(monkeypatch):
+    """CATEGORY_INDEX_MAX_WORDS=0 turns the suggestions off."""
+    monkeypatch.setenv(CategoryIndex.ENV_MAX_WORDS, "0")
+    outcome = OutcomeDto(amount=1, description="pizza", date=datetime(2025, 3, 1))
+    assert CategoryIndex.get_instance() is None
+    CategoryIndex.apply(added=[OutcomeSchema.model_construct(
+        msg_id=1, chat_id=2, user_id=3, description="pizza", category="food", type=None,
+    )])
+    assert fill_missing_tags(outcome, 2, 3) == ()
+
+
+def test_fill_missing_tags(monkeypatch):
+    """Only the fields the message left out, above the threshold."""
+    monkeypatch.setenv(CategoryIndex.ENV_FILL_THRESHOLD, "0.75")
+    index = CategoryIndex.get_instance()
+    for category in ("food", "food", "food", "gifts"):
+        index.update(2, 3, "pizza", category, "want")
+    outcome = OutcomeDto(amount=1, description="pizza", type="need", date=datetime(2025, 3, 1))
+    assert fill_missing_tags(outcome, 2, 3) == ("category",)
+    assert (outcome.category, outcome.type) == ("food", "need")
+    index.update(2, 3, "pizza", "gifts", None)
+    outcome = OutcomeDto(amount=1, description="pizza", date=datetime(2025, 3, 1))
+    assert fill_missing_tags(outcome, 2, 3) == ("type",)
+
+
+def test_ranked_choices_keyboard():
+    """The suggested values lead the buttons, followed by the rest in their usual order."""
+    choices = ranked_choices(CATEGORIES, ["health", "unknown", "food"])
+    assert choices[:3] == ["health", "food", "gifts"]
+    assert sorted(choices) == sorted(CATEGORIES)
+    keyboard = choices_keyboard(ButtonActions.CATEGORY, -100, 5, choices)
+    assert [len(row) for row in keyboard.inline_keyboard] == [3, 3, 3, 3, 1]
+    first = decode_callback_data(keyboard.inline_keyboard[0][0].callback_data)
+    decoded = (first.action, first.chat_id, first.message_id, first.value)
+    assert decoded == (ButtonActions.CATEGORY, -100, 5, "health")
+
+
+async def __index_lifecycle(session_maker: async_sessionmaker):
+    index = CategoryIndex.get_instance()
+
+    def categories(description):
+        return index.suggest(2, 3, description).categories
+
+    async with session_maker() as session:
+        dentist = OutcomeDto(amount=1, description="dentist", category="health",
+                             date=datetime(2025, 3, 1))
+        await AsyncOutcomeRepository.create_outcome(session, dentist, 1, 2, 3)
+        pizza = OutcomeDto(amount=1, description="pizza", category="food",
+                           date=datetime(2025, 3, 2))
+        untagged = OutcomeDto(amount=1, description="untagged pizza", date=datetime(2025, 3, 3))
+        await AsyncOutcomeRepository.create_outcomes(session, [
+            (pizza, 2, 2, 3),
+            (untagged, 3, 2, 3),
+        ])
+    steps = {"created": (categories("dentist"), categories("pizza"), categories("untagged"))}
+    async with session_maker() as session:
+        dentist = await AsyncOutcomeRepository.get_outcome_by_id(session, 1, 2, 3)
+        await AsyncOutcomeRepository.update_outcome(
+            session, dentist.model_copy(update={"category": "family"})
+        )
+    steps["updated"] = categories("dentist")
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.soft_delete(session, 2, 2, 3)
+    steps["deleted"] = categories("pizza")
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.restore(session, 2, 2, 3, undo_grace_seconds=60)
+    steps["restored"] = categories("pizza")
+
+    # A new process: the index is loaded from the live tagged expenses
+    CategoryIndex.reset_instance()
+    index = CategoryIndex.get_instance()
+    async with session_maker() as session:
+        steps["loaded"] = await index.load(
+            AsyncOutcomeRepository.stream_tagged_rows(session, batch_size=1)
+        )
+    steps["after load"] = (categories("dentist"), categories("pizza"), index.loaded)
+    return steps
+
+
+def test_writes_during_load_are_counted_after_it(make_outcome):
+    """Outcomes applied while the index loads are counted once, on top of the loaded snapshot."""
+    index = CategoryIndex.get_instance()
+    dentist = make_outcome(2, description="dentist", category="health")
+    pizza = make_outcome(3, description="pizza", category="food")
+
+    async def snapshot():
+        yield 2, 3, "pizza", "food", None
+        # Committed meanwhile: the dentist outcome is recategorized and the second pizza deleted,
+        # both still in their old version further down the snapshot
+        recategorized = dentist.model_copy(update={"category": "family"})
+        CategoryIndex.apply(added=[recategorized], removed=[dentist])
+        CategoryIndex.apply(removed=[pizza])
+        yield 2, 3, "dentist", "health", None
+        yield 2, 3, "pizza", "food", None
+
+    assert asyncio.run(index.load(snapshot())) == 3
+    assert index.suggest(2, 3, "dentist") == Suggestion(["family"], [], None, None)
+    assert index.suggest(2, 3, "pizza") == Suggestion(["food"], [], None, None)
+    # Once loaded, outcomes are counted right away
+    CategoryIndex.apply(added=[pizza])
+    assert index.suggest(2, 3, "pizza").category == "food"
+
+
+def test_index_follows_outcomes(run_with_sessions):
+    """Creates, updates, soft deletes and restores move the counts; a load rebuilds them."""
+    steps = run_with_sessions(__index_lifecycle)
+    assert steps["created"] == (["health"], ["food"], [])
+    assert steps["updated"] == ["family"]
+    assert steps["deleted"] == []
+    assert steps["restored"] == ["food"]
+    assert steps["loaded"] == 2
+    assert steps["after load"] == (["family"], ["food"], True)
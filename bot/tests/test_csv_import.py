@@ -0,0 +1,133 @@
+"""
+Tests for the CSV import of historical expenses.
+
+Covers header and delimiter detection, row validation, lazy parsing and
+the chunked insert with synthetic negative message IDs against a temporary
+SQLite database.
+"""
+
+from __future__ import annotations
+from datetime import datetime
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from expanses_tracker.application.features.import_expenses.csv_import import (
+    ImportReport,
+    import_outcomes,
+    parse_csv_rows,
+)
+from expanses_tracker.application.models.outcome import OutcomeDto
+from expanses_tracker.persistence.configurations.outcome_model import OutcomeModel
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.outcome_cache import OutcomeCache
+
+TODAY = datetime(2025, 9, 9)
+
+
+def test_parse_rows_and_rejections():
+    """Validates rows like messages and reports why the others are rejected."""
+    lines = [
+        "Date;Amount;Description;Category;Type\n",
+        "21/05/2024;10.5;pizza;food;want\n",
+        "2024-06-01;100/2;shared  bill;;\n",
+        ";;;;\n",
+        "21/05;abc;pizza;;\n",
+        "31/02/2024;5;pizza;;\n",
+        "01/01/2024;5;  ;;\n",
+        "01/01/2024;5;pizza;snacks;\n",
+        "01/01/2024;5;pizza\n",
+    ]
+    rows = list(parse_csv_rows(lines, TODAY))
+    assert rows[0] == (2, OutcomeDto(
+        amount=10.5, description="pizza", category="food", type="want", date=datetime(2024, 5, 21)
+    ))
+    shared = OutcomeDto(amount=50, description="shared bill", date=datetime(2024, 6, 1))
+    assert rows[1] == (3, shared)
+    assert rows[2:6] == [
+        (5, "Ambiguous command. Invalid amount."),
+        (6, "Ambiguous command. Invalid date."),
+        (7, "missing description"),
+        (8, "unknown category 'snacks'"),
+    ]
+    # Missing trailing columns are empty
+    assert rows[6] == (9, OutcomeDto(amount=5, description="pizza", date=datetime(2024, 1, 1)))
+
+
+def test_parse_rows_requires_header():
+    """Rejects files without the required columns."""
+    with pytest.raises(ValueError, match="Missing CSV columns: date"):
+        list(parse_csv_rows(["amount,description\n", "10,pizza\n"], TODAY))
+
+
+def test_parse_rows_is_lazy():
+    """Reads one line at a time, never the whole file."""
+    read = []
+
+    def lines():
+        yield "amount,description,date\n"
+        for i in range(1000):
+            read.append(i)
+            yield f"{i + 1},pizza,1/1/2024\n"
+
+    rows = parse_csv_rows(lines(), TODAY)
+    next(rows)
+    assert len(read) == 1
+
+
+async def __import(session_maker: async_sessionmaker):
+    progress = []
+
+    async def on_progress(report: ImportReport):
+        progress.append(report.imported)
+
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.create_outcome(
+            session,
+            OutcomeDto(amount=1, description="real", date=TODAY),
+            message_id=42,
+            chat_id=2,
+            user_id=3,
+        )
+    items = [f"{i},item {i},1/1/2024\n" for i in range(1, 8)]
+    lines = ["amount,description,date\n"] + items + ["x,bad,1/1/2024\n"]
+    report = await import_outcomes(
+        parse_csv_rows(lines, TODAY), 2, 3, ImportReport(),
+        on_progress=on_progress, chunk_size=3, session_factory=session_maker,
+    )
+    assert (report.imported, report.rejected) == (7, 1)
+    assert report.rejected_samples == ["line 9: Ambiguous command. Invalid amount."]
+    # A second import continues below the first one
+    again = await import_outcomes(
+        parse_csv_rows(["amount,description,date\n", "9,more,2/1/2024\n"], TODAY),
+        2, 3, ImportReport(),
+        session_factory=session_maker,
+    )
+    assert again.imported == 1
+    async with session_maker() as session:
+        query = select(OutcomeModel.msg_id).order_by(OutcomeModel.msg_id.desc())
+        ids = (await session.scalars(query)).all()
+    assert ids == [42, -1, -2, -3, -4, -5, -6, -7, -8]
+    assert progress == [3, 6]
+    # Imported rows don't flush the recently written ones out of the cache
+    assert len(OutcomeCache.get_instance()) == 1
+
+
+def test_import_outcomes(run_with_sessions, monkeypatch):
+    """Inserts in chunks with negative msg_ids, reports progress and rejections."""
+    monkeypatch.setattr(
+        "expanses_tracker.application.features.import_expenses.csv_import"
+        ".IMPORT_PROGRESS_INTERVAL_SECONDS", 0
+    )
+    run_with_sessions(__import)
+
+
+def test_report_summary_caps_samples():
+    """Lists the first rejected rows and counts the rest."""
+    report = ImportReport(imported=3)
+    for line in range(2, 32):
+        report.reject(line, "bad")
+    summary = report.summary()
+    assert summary.startswith("Import done: 3 expenses imported, 30 rows rejected.")
+    assert "line 21: bad" in summary and "line 22: bad" not in summary
+    assert summary.endswith("... and 10 more")
@@ -0,0 +1,106 @@
+"""
+Tests for the streaming /export.
+
+Covers argument parsing, streaming rows out of a temporary SQLite database
+into CSV and JSON Lines, the round trip through the CSV import, and gzip
+of large exports.
+"""
+
+from __future__ import annotations
+import gzip
+import io
+import json
+from datetime import datetime
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from expanses_tracker.application.features.export_expenses.outcome_export import (
+    ExportRequest,
+    gzip_if_large,
+    new_spool,
+    parse_export_args,
+    write_export,
+)
+from expanses_tracker.application.features.import_expenses.csv_import import parse_csv_rows
+from expanses_tracker.application.models.outcome import OutcomeDto
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+
+TODAY = datetime(2025, 9, 9)
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        ([], ExportRequest()),
+        (["jsonl", "chat"], ExportRequest(format="jsonl", whole_chat=True)),
+        (["1/1/2024"], ExportRequest(start=datetime(2024, 1, 1))),
+        (
+            ["2024-01-01", "31/1"],
+            ExportRequest(start=datetime(2024, 1, 1), end=datetime(2025, 2, 1)),
+        ),
+    ],
+)
+def test_parse_export_args(args, expected):
+    """Reads format, scope and an inclusive date range."""
+    assert parse_export_args(args, TODAY) == expected
+
+
+@pytest.mark.parametrize("args", [["xml"], ["1/1/2024", "2/1/2024", "3/1/2024"], ["31/02/2024"]])
+def test_parse_export_args_invalid(args):
+    """Answers with the usage on unknown arguments."""
+    with pytest.raises(ValueError, match="Usage: /export"):
+        parse_export_args(args, TODAY)
+
+
+async def __export(session_maker: async_sessionmaker, fmt: str, **filters) -> bytes:
+    async with session_maker() as session:
+        pizza = OutcomeDto(
+            amount=10, description="pizza, margherita", category="food", date=datetime(2024, 1, 5)
+        )
+        await AsyncOutcomeRepository.create_outcomes(session, [
+            (pizza, 1, 2, 3),
+            (OutcomeDto(amount=20, description="train", date=datetime(2024, 2, 5)), 2, 2, 3),
+            (OutcomeDto(amount=30, description="gift", date=datetime(2024, 1, 6)), 3, 2, 4),
+            (OutcomeDto(amount=40, description="deleted", date=datetime(2024, 1, 7)), 4, 2, 3),
+            (OutcomeDto(amount=50, description="other chat", date=datetime(2024, 1, 7)), 5, 9, 3),
+        ])
+        await AsyncOutcomeRepository.soft_delete(session, 4, 2, 3)
+        out = io.BytesIO()
+        rows = AsyncOutcomeRepository.stream_outcome_rows(session, 2, batch_size=2, **filters)
+        await write_export(rows, fmt, out)
+        return out.getvalue()
+
+
+def test_export_csv_round_trips_through_import(run_with_sessions):
+    """Exports live rows of the user, oldest first, in a CSV /import accepts."""
+    data = run_with_sessions(__export, "csv", user_id=3)
+    lines = data.decode().splitlines(keepends=True)
+    assert lines[0] == "msg_id,chat_id,user_id,date,amount,description,category,type\r\n"
+    descriptions = [dto.description for _, dto in parse_csv_rows(lines, TODAY)]
+    assert descriptions == ["pizza, margherita", "train"]
+    assert lines[1].split(",")[4] == "10.00"
+
+
+def test_export_jsonl_filters(run_with_sessions):
+    """Exports every user of the chat within the date range as JSON Lines."""
+    data = run_with_sessions(
+        __export, "jsonl", start=datetime(2024, 1, 1), end=datetime(2024, 2, 1)
+    )
+    rows = [json.loads(line) for line in data.decode().splitlines()]
+    assert [(r["msg_id"], r["user_id"], r["date"]) for r in rows] == [
+        (1, 3, "2024-01-05T00:00:00"),
+        (3, 4, "2024-01-06T00:00:00"),
+    ]
+    assert rows[0]["category"] == "food" and rows[1]["category"] is None
+    assert [r["amount"] for r in rows] == [10.0, 30.0]
+
+
+def test_gzip_if_large():
+    """Compresses only exports above the threshold."""
+    small = new_spool()
+    small.write(b"a" * 10)
+    assert gzip_if_large(small, threshold=100) == (small, False)
+    large = new_spool()
+    large.write(b"a" * 1000)
+    compressed, gzipped = gzip_if_large(large, threshold=100)
+    assert gzipped and gzip.decompress(compressed.read()) == b"a" * 1000
@@ -0,0 +1,151 @@
+"""
+Tests for /list.
+
+Covers the parsing of the arguments, the keyset cursors carried by the page
+buttons, and the pages read by the repository forwards, backwards and with
+filters, through one range scan of the live expenses index.
+"""
+
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from expanses_tracker.application.features.list_expenses.list_command_handler import (
+    ListCursor,
+    ListRequest,
+    decode_list_cursor,
+    encode_list_cursor,
+    list_keyboard,
+    parse_list_args,
+)
+from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
+from expanses_tracker.application.models.outcome import OutcomeDto
+from expanses_tracker.application.utils.callback_codec import (
+    MAX_CALLBACK_DATA_BYTES,
+    decode_callback_data,
+    encode_callback_data,
+)
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        ([], ListRequest()),
+        (["Food"], ListRequest(category="food")),
+        (["want", "travel"], ListRequest(category="travel", type="want")),
+    ],
+)
+def test_parse_list_args(args, expected):
+    """A category and a type, in any order and case."""
+    assert parse_list_args(args) == expected
+
+
+@pytest.mark.parametrize("args", [["pizza"], ["food", "home"], ["need", "want"]])
+def test_parse_list_args_rejects_the_rest(args):
+    """Unknown words and a second category or type are usage errors."""
+    with pytest.raises(ValueError, match="Usage: /list"):
+        parse_list_args(args)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        ListCursor(datetime(2025, 9, 9, 12, 30, 15, 123456), 123456),
+        ListCursor(datetime(1999, 1, 1), -42, newer=True),
+    ],
+)
+def test_list_cursor_round_trip(cursor):
+    """Dates keep their microseconds, imported expenses their negative IDs."""
+    assert decode_list_cursor(encode_list_cursor(cursor)) == cursor
+
+
+def test_list_cursor_of_aware_date():
+    """Aware dates are compared as the naive UTC dates stored in the database."""
+    aware = ListCursor(datetime(2025, 9, 9, 14, tzinfo=timezone(timedelta(hours=2))), 1)
+    assert decode_list_cursor(encode_list_cursor(aware)) == ListCursor(datetime(2025, 9, 9, 12), 1)
+
+
+@pytest.mark.parametrize("value", ["", "x1.2", "n12", "nzz.1"])
+def test_decode_list_cursor_rejects_malformed(value):
+    """Anything but a direction, a hex date and a hex msg_id."""
+    with pytest.raises(ValueError):
+        decode_list_cursor(value)
+
+
+def test_list_button_fits_callback_data():
+    """The widest cursor of a supergroup button stays within Telegram's limit."""
+    cursor = ListCursor(datetime(9999, 12, 31, 23, 59, 59, 999999), -2**31, newer=True)
+    encoded = encode_callback_data(ButtonDataDto(
+        ButtonActions.LIST_PAGE, 2**31 - 1, -1009999999999, encode_list_cursor(cursor)
+    ))
+    assert len(encoded.encode()) <= MAX_CALLBACK_DATA_BYTES
+
+
+def test_list_keyboard(make_outcome):
+    """Previous carries the key of the first outcome, next the key of the last one."""
+    outcomes = [
+        make_outcome(9, chat_id=-100, date=datetime(2025, 3, 9)),
+        make_outcome(4, chat_id=-100, date=datetime(2025, 3, 4)),
+    ]
+    assert list_keyboard(5, -100, outcomes, has_newer=False, has_older=False) is None
+    (buttons,) = list_keyboard(5, -100, outcomes, has_newer=True, has_older=True).inline_keyboard
+    data = [decode_callback_data(b.callback_data) for b in buttons]
+    targets = [(d.action, d.message_id, d.chat_id) for d in data]
+    assert targets == [(ButtonActions.LIST_PAGE, 5, -100)] * 2
+    assert [decode_list_cursor(d.value) for d in data] == [
+        ListCursor(datetime(2025, 3, 9), 9, newer=True),
+        ListCursor(datetime(2025, 3, 4), 4),
+    ]
+
+
+async def __list_pages(session_maker: async_sessionmaker):
+    engine = session_maker.kw["bind"]
+    statements = []
+    event.listen(
+        engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2:4])
+    )
+
+    async def page(**kwargs):
+        async with session_maker() as session:
+            found = await AsyncOutcomeRepository.list_page(session, 2, 3, limit=3, **kwargs)
+        return [o.msg_id for o in found]
+
+    async with session_maker() as session:
+        # msg_id 4 and 5 share a date: msg_id breaks the tie
+        await AsyncOutcomeRepository.create_outcomes(session, [
+            (OutcomeDto(
+                amount=1, description=f"expense {i}", category="food" if i % 2 else "home",
+                date=datetime(2025, 3, min(i, 4)),
+            ), i, 2, 3)
+            for i in range(1, 8)
+        ] + [(OutcomeDto(amount=1, description="other user", date=datetime(2025, 3, 9)), 8, 2, 9)])
+        await AsyncOutcomeRepository.soft_delete(session, 6, 2, 3)
+    pages = {"first": await page()}
+    pages["second"] = await page(cursor=(datetime(2025, 3, 4), 4))
+    pages["last"] = await page(cursor=(datetime(2025, 3, 2), 2))
+    pages["back"] = await page(cursor=(datetime(2025, 3, 2), 2), newer=True)
+    pages["food"] = await page(category="food", cursor=(datetime(2025, 3, 4), 7))
+    pages["home need"] = await page(category="home", outcome_type="need")
+    async with engine.connect() as conn:
+        sql, params = statements[-5]
+        plan = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)).all()
+    return pages, [row[-1] for row in plan]
+
+
+def test_list_pages(run_with_sessions):
+    """Pages follow the (date, msg_id) keys of the live outcomes of the user, newest first."""
+    pages, plan = run_with_sessions(__list_pages)
+    assert pages["first"] == [7, 5, 4]
+    assert pages["second"] == [3, 2, 1]
+    assert pages["last"] == [1]
+    assert pages["back"] == [5, 4, 3]
+    assert pages["food"] == [5, 3, 1]
+    assert pages["home need"] == []
+    # The page after a cursor is a range of the index, not a scan of what comes before it
+    assert any(
+        "ix_expenses_live_chat_user_date" in line and "(date,msg_id)<" in line for line in plan
+    ), plan
+    assert not any("TEMP B-TREE" in line for line in plan), plan
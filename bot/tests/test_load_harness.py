@@ -0,0 +1,33 @@
+"""
+Smoke test of the offline load harness, so it keeps working as the handlers change.
+"""
+
+import asyncio
+
+from benchmarks.load_harness import LoadConfig, SyntheticWorkload, run_load
+
+
+def test_workload_history_is_consistent():
+    """Edits, deletions and button taps only target expenses the chat sent before."""
+    sent = set()
+    for kind, update in SyntheticWorkload(chats=3, users_per_chat=2, seed=1).generate(500):
+        if kind == "add":
+            sent.add((update["message"]["chat"]["id"], update["message"]["message_id"]))
+        elif kind == "edit":
+            edited = update["edited_message"]
+            assert (edited["chat"]["id"], edited["message_id"]) in sent
+        elif kind == "delete":
+            reply = update["message"]["reply_to_message"]
+            assert (reply["chat"]["id"], reply["message_id"]) in sent
+
+
+def test_run_load(monkeypatch, sqlite_db):
+    """Every update goes through its handler without errors and gets answered."""
+    monkeypatch.setenv("DATABASE_URL", sqlite_db.replace("+aiosqlite", ""))
+    workload = SyntheticWorkload(chats=5, users_per_chat=2)
+    report = asyncio.run(run_load(workload, LoadConfig(updates=200, concurrency=4)))
+    assert sum(row["count"] for row in report.by_kind.values()) == 200
+    assert report.handler_errors == {}
+    assert {"generic_message_handler", "delete_command_handler"} <= set(report.by_handler)
+    assert report.api_calls["sendMessage"] > 0
+    assert report.updates_per_second > 0
@@ -2,7 +2,8 @@
 Tests for message parsing utilities.
 
 Covers date extraction, type/category parsing, and end-to-end message
-argument parsing, including both happy paths and error conditions.
+argument parsing, including both happy paths and error conditions. The
+end-to-end cases run against both the fast path and the shlex tokenizer.
 """
 
 from __future__ import annotations
@@ -10,11 +11,15 @@ from datetime import datetime
 import pytest
 from expanses_tracker.application.utils.message_parser import (
     get_message_args,
+    parse_date_argument,
     __get_message_date__,
     __get_message_type__,
-    __get_message_category__
+    __get_message_category__,
+    __split_message__
 )
 
+PARSER_PATHS = pytest.mark.parametrize("fast_path", [True, False], ids=["fast", "shlex"])
+
 # ---------- get_message_date ----------
 
 def test_get_message_date_no_year():
@@ -54,6 +59,21 @@ def test_get_message_date_invalid_date_raises():
     assert parts == ["10", "spesa", "31/02"]
 
 
+@pytest.mark.parametrize(
+    "token, expected",
+    [
+        ("21/05", datetime(2025, 5, 21)),
+        ("21/05/2023", datetime(2023, 5, 21)),
+        ("2023-05-21", datetime(2023, 5, 21)),
+        ("31/02", None),
+        ("csv", None),
+    ],
+)
+def test_parse_date_argument(token, expected):
+    """Command arguments are dates in either format, anything else is None."""
+    assert parse_date_argument(token, datetime(2025, 9, 9)) == expected
+
+
 # ---------- get_message_domain / type / category ----------
 
 def test_get_message_type_pops_last_case_insensitive():
@@ -153,9 +173,10 @@ def test_get_message_domain_no_match():
         ),
     ],
 )
-def test_get_message_args_happy_paths(text, default_dt, expected):
+@PARSER_PATHS
+def test_get_message_args_happy_paths(text, default_dt, expected, fast_path):
     """End-to-end parsing of valid messages into structured fields."""
-    out = get_message_args(text, default_dt)
+    out = get_message_args(text, default_dt, fast_path=fast_path)
     assert out.amount == pytest.approx(expected["amount"])
     assert out.description == expected["description"]
     assert out.type == expected["type"]
@@ -175,27 +196,57 @@ def test_get_message_args_happy_paths(text, default_dt, expected):
         ("", r"Not enough parameters"),
     ],
 )
-def test_get_message_args_errors(text, err_re):
+@PARSER_PATHS
+def test_get_message_args_errors(text, err_re, fast_path):
     """Raises appropriate errors for malformed/invalid inputs."""
     with pytest.raises(ValueError, match=err_re):
-        get_message_args(text, datetime(2025, 9, 9))
+        get_message_args(text, datetime(2025, 9, 9), fast_path=fast_path)
 
-def test_type_after_category_is_not_parsed():
+@PARSER_PATHS
+def test_type_after_category_is_not_parsed(fast_path):
     """
         "type" must be the last token when both are present
         (expected input: "<...> <category> <type>").
     """
-    out = get_message_args("10 spesa need food", datetime(2025, 9, 9))
+    out = get_message_args("10 spesa need food", datetime(2025, 9, 9), fast_path=fast_path)
     # Category recognized (food), type left in description (limitation by design/order).
     assert out.category == "food"
     assert out.type is None
     assert out.description == "spesa need"
     assert out.amount == pytest.approx(10.0)
 
-def test_quotes():
+@PARSER_PATHS
+def test_quotes(fast_path):
     """Handles quoted descriptions with spaces correctly."""
-    out = get_message_args('10 l\'unica spesa del mese food need', datetime(2025, 9, 9))
+    out = get_message_args(
+        '10 l\'unica spesa del mese food need', datetime(2025, 9, 9), fast_path=fast_path
+    )
     assert out.description == "l'unica spesa del mese"
     assert out.category == "food"
     assert out.type == "need"
     assert out.amount == pytest.approx(10.0)
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "10 spesa",
+        "  10\tspesa\r\ncasa  ",
+        "10 that's ok",
+        "10 l'unica spesa",
+        "10 'spesa casa' food",
+        "10 rock'n'roll '",
+        "10 spesa' casa",
+        "10 caf\u00e9\u00a0bar",
+        "10 spesa\x0bcasa",
+        '10 "spesa casa" need',
+        "10 spesa\\ casa",
+    ],
+)
+def test_fast_path_tokens_match_shlex(text):
+    """Both tokenizers give the same tokens, or the same error."""
+    def split(fast_path):
+        try:
+            return __split_message__(text, fast_path=fast_path)
+        except ValueError as e:
+            return str(e)
+    assert split(True) == split(False)
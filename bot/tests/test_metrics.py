@@ -0,0 +1,174 @@
+"""
+Tests for the metrics registry, the instrumentation helpers and the metrics endpoint.
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+from telegram import Chat, Message, Update
+
+from expanses_tracker.api.update_processor import ChatOrderedUpdateProcessor
+
+from expanses_tracker.observability import MetricsRegistry, MetricsServer
+from expanses_tracker.observability.instrumentation import (
+    DB_ERRORS,
+    DB_LATENCY,
+    POOL_CHECKOUT_WAIT,
+    instrument_application,
+    instrument_pool,
+    instrument_repository,
+)
+from expanses_tracker.observability.metrics import REGISTRY
+
+
+def test_render_exposition_format():
+    """Counters, histograms and callback gauges render as Prometheus text."""
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls.", ["name"])
+    latency = registry.histogram("latency_seconds", "Latency.", ["name"], buckets=(0.1, 1.0))
+    registry.callback("depth", "Depth.", lambda: [(("a\"b",), 3)], ["queue"])
+    calls.inc("x")
+    calls.inc("x", amount=2)
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, "x")
+
+    assert registry.render().splitlines() == [
+        "# HELP calls_total Calls.",
+        "# TYPE calls_total counter",
+        'calls_total{name="x"} 3',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{name="x",le="0.1"} 1',
+        'latency_seconds_bucket{name="x",le="1"} 2',
+        'latency_seconds_bucket{name="x",le="+Inf"} 3',
+        'latency_seconds_sum{name="x"} 5.55',
+        'latency_seconds_count{name="x"} 3',
+        "# HELP depth Depth.",
+        "# TYPE depth gauge",
+        'depth{queue="a\\"b"} 3',
+    ]
+
+
+def test_wrong_label_count_is_rejected():
+    """A sample with the wrong number of label values can't be rendered."""
+    registry = MetricsRegistry()
+    registry.counter("calls_total", "Calls.", ["name"]).inc()
+    with pytest.raises(ValueError):
+        registry.render()
+
+
+@instrument_repository
+class _Repository:
+    @staticmethod
+    def read(value):
+        return value
+
+    @staticmethod
+    async def write(value):
+        if value is None:
+            raise ValueError("nothing to write")
+        return value
+
+    @staticmethod
+    async def stream(count):
+        for i in range(count):
+            yield i
+
+
+def test_instrument_repository():
+    """Sync, async and async generator methods are timed; failures are counted."""
+    async def scenario():
+        assert await _Repository.write(1) == 1
+        with pytest.raises(ValueError):
+            await _Repository.write(None)
+        return [i async for i in _Repository.stream(3)]
+
+    assert _Repository.read(5) == 5
+    assert asyncio.run(scenario()) == [0, 1, 2]
+    assert DB_LATENCY.count("_Repository", "read") == 1
+    assert DB_LATENCY.count("_Repository", "write") == 2
+    assert DB_LATENCY.count("_Repository", "stream") == 1
+    assert DB_ERRORS.value("_Repository", "write") == 1
+    assert _Repository.write.__name__ == "write"
+
+
+def test_instrument_pool(tmp_path):
+    """Checkouts are timed and the checked out connections reported."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    instrument_pool(engine.pool, "test")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert 'db_pool_checked_out_connections{pool="test"} 1' in REGISTRY.render()
+    assert POOL_CHECKOUT_WAIT.count("test") == 1
+    assert 'db_pool_checked_out_connections{pool="test"} 0' in REGISTRY.render()
+    engine.dispose()
+
+
+def test_instrument_update_queues():
+    """Queue metrics are totals across chats, plus the busiest chats if asked for."""
+    processor = ChatOrderedUpdateProcessor(1)
+    instrument_application(SimpleNamespace(job_queue=None, update_processor=processor), top_chats=1)
+
+    def update(update_id: int, chat_id: int) -> Update:
+        chat = Chat(id=chat_id, type=Chat.PRIVATE)
+        return Update(update_id, message=Message(update_id, datetime.now(), chat, text="x"))
+
+    async def scenario():
+        updates = [update(1, 10), update(2, 10), update(3, 20)]
+        tasks = [
+            asyncio.create_task(processor.process_update(u, asyncio.sleep(0.02))) for u in updates
+        ]
+        await asyncio.sleep(0.01)
+        rendered = REGISTRY.render()
+        await asyncio.gather(*tasks)
+        return rendered
+
+    try:
+        during = asyncio.run(scenario()).splitlines()
+        assert "bot_update_queue_depth 3" in during
+        assert 'bot_chat_update_queue_depth{chat_id="10"} 2' in during
+        assert not any(line.startswith('bot_chat_update_queue_depth{chat_id="20"}')
+                       for line in during)
+        after = REGISTRY.render().splitlines()
+        assert "bot_update_queue_depth 0" in after and "bot_updates_processed_total 3" in after
+        assert not any(line.startswith("bot_chat_update_queue_depth{") for line in after)
+    finally:
+        for name in ("bot_update_queue_depth", "bot_updates_processed_total",
+                     "bot_update_wait_seconds_total", "bot_update_wait_seconds_max",
+                     "bot_chat_update_queue_depth"):
+            REGISTRY.unregister(name)
+
+
+def test_metrics_server():
+    """Serves the registry on /metrics and 404 elsewhere."""
+    registry = MetricsRegistry()
+    registry.counter("served_total", "Served.").inc()
+
+    async def scenario():
+        server = MetricsServer(port=0, registry=registry)
+        await server.start()
+        try:
+            async with httpx.AsyncClient() as client:
+                metrics = await client.get(f"http://127.0.0.1:{server.bound_port}/metrics")
+                missing = await client.get(f"http://127.0.0.1:{server.bound_port}/")
+        finally:
+            await server.stop()
+        return metrics, missing
+
+    metrics, missing = asyncio.run(scenario())
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "served_total 1" in metrics.text
+    assert missing.status_code == 404
+
+
+def test_metrics_server_from_env(monkeypatch):
+    """Disabled unless METRICS_PORT is set."""
+    monkeypatch.delenv("METRICS_PORT", raising=False)
+    assert MetricsServer.from_env() is None
+    monkeypatch.setenv("METRICS_PORT", "9100")
+    server = MetricsServer.from_env()
+    assert (server.host, server.port) == ("127.0.0.1", 9100)
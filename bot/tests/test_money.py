@@ -0,0 +1,96 @@
+"""
+Tests for the integer cents storage of amounts.
+
+Covers the conversions between amounts and cents, the exact arithmetic of
+the parser, and the migration of a float schema to integer cents.
+"""
+
+from __future__ import annotations
+from datetime import datetime
+from decimal import Decimal
+import sqlite3
+import pytest
+from sqlalchemy import create_engine, inspect
+
+from benchmarks.seed import migrate
+from expanses_tracker.application.models.money import from_cents, to_amount, to_cents
+from expanses_tracker.application.utils.message_parser import get_message_args
+
+FLOAT_SCHEMA = """
+CREATE TABLE expenses (
+    msg_id INTEGER NOT NULL, chat_id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+    amount FLOAT NOT NULL, description VARCHAR(255) NOT NULL, type VARCHAR(50), category VARCHAR(50),
+    date DATETIME NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, deleted_at DATETIME,
+    PRIMARY KEY (msg_id, chat_id, user_id)
+);
+CREATE INDEX ix_expenses_chat_user_date ON expenses (chat_id, user_id, date);
+CREATE INDEX ix_expenses_live_chat_user_date ON expenses (chat_id, user_id, date, msg_id) WHERE deleted_at IS NULL;
+CREATE INDEX ix_expenses_deleted_at ON expenses (deleted_at) WHERE deleted_at IS NOT NULL;
+CREATE TABLE monthly_totals (
+    chat_id INTEGER NOT NULL, user_id INTEGER NOT NULL, year_month VARCHAR(7) NOT NULL,
+    category VARCHAR(50) NOT NULL, type VARCHAR(50) NOT NULL, total FLOAT NOT NULL, count INTEGER NOT NULL,
+    PRIMARY KEY (chat_id, user_id, year_month, category, type)
+);
+"""
+
+
+@pytest.mark.parametrize(
+    "value, cents",
+    [
+        (10, 1000),
+        (0.29, 29),
+        (0.1 + 0.2, 30),
+        ("2.675", 268),
+        (Decimal("-1.005"), -101),
+    ],
+)
+def test_to_cents(value, cents):
+    """Rounds to the nearest cent, half away from zero, without float artifacts."""
+    assert to_cents(value) == cents
+    assert from_cents(cents) == to_amount(value)
+
+
+@pytest.mark.parametrize("value", ["abc", float("nan"), float("inf")])
+def test_to_amount_rejects_non_numbers(value):
+    """Only finite numbers are amounts."""
+    with pytest.raises(ValueError, match="Invalid amount"):
+        to_amount(value)
+
+
+def test_parsed_amounts_are_exact():
+    """Expressions are computed in decimal and rounded to cents once."""
+    assert get_message_args("10/3 pizza", datetime(2025, 9, 9)).amount == Decimal("3.33")
+    assert get_message_args("2.675 pizza", datetime(2025, 9, 9)).amount == Decimal("2.68")
+
+
+def test_migration_converts_float_amounts(tmp_path):
+    """Existing amounts become cents in batches.
+
+    The rollup is recomputed and the indexes survive.
+    """
+    db_path = tmp_path / "float.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(FLOAT_SCHEMA)
+        conn.executemany(
+            "INSERT INTO expenses VALUES (?, 1, 2, ?, 'x', NULL, NULL, "
+            "'2025-09-01 00:00:00.000000', '2025-09-01', '2025-09-01', NULL)",
+            [(msg_id, (0.1, 0.29, 3.33, 10.5)[msg_id % 4]) for msg_id in range(25_000)],
+        )
+    conn.close()
+
+    migrate(f"sqlite:///{db_path}", "24769468bb83", "3b8e5d1f0c7a")
+
+    with sqlite3.connect(db_path) as conn:
+        amounts = conn.execute(
+            "SELECT SUM(amount_cents), MIN(amount_cents), MAX(amount_cents) FROM expenses"
+        ).fetchone()
+        assert amounts == (8_887_500, 10, 1050)
+        rollup = conn.execute("SELECT total_cents, count FROM monthly_totals").fetchall()
+        assert rollup == [(8_887_500, 25_000)]
+    conn.close()
+    engine = create_engine(f"sqlite:///{db_path}")
+    inspector = inspect(engine)
+    assert "amount" not in {column["name"] for column in inspector.get_columns("expenses")}
+    assert {index["name"] for index in inspector.get_indexes("expenses")} == {
+        "ix_expenses_chat_user_date", "ix_expenses_live_chat_user_date", "ix_expenses_deleted_at"}
+    engine.dispose()
@@ -0,0 +1,114 @@
+"""
+Tests for the monthly_totals rollup and the /report command.
+
+Covers the incremental maintenance of the rollup on create, bulk create,
+update, soft delete and restore, the full rebuild and verification, and
+the parsing and formatting of /report.
+"""
+
+from __future__ import annotations
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from expanses_tracker.application.features.report.report_command_handler import (
+    format_report,
+    parse_report_month,
+)
+from expanses_tracker.application.models.monthly_total import MonthlyTotalSchema
+from expanses_tracker.application.models.outcome import OutcomeDto, OutcomeSchema
+from expanses_tracker.persistence.configurations.monthly_total_model import MonthlyTotalModel
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.monthly_totals_repository import (
+    MonthlyTotalsRepository,
+)
+
+
+async def __maintain_rollup(session_maker: async_sessionmaker):
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.create_outcome(
+            session,
+            OutcomeDto(amount=10, description="pane", category="food", date=datetime(2025, 9, 1)),
+            message_id=1,
+            chat_id=2,
+            user_id=3,
+        )
+        await AsyncOutcomeRepository.create_outcomes(session, [
+            (OutcomeDto(amount=5, description="latte", category="food", date=datetime(2025, 9, 2)),
+             2, 2, 3),
+            (OutcomeDto(amount=7, description="bus", date=datetime(2025, 9, 3)), 3, 2, 3),
+            (OutcomeDto(amount=100, description="affitto", date=datetime(2025, 10, 1)), 4, 2, 3),
+        ])
+        totals = await MonthlyTotalsRepository.get_month_totals(session, 2, 3, "2025-09")
+        assert [(t.category, t.total, t.count) for t in totals] == [("food", 15, 2), ("", 7, 1)]
+
+        # Moving an outcome to another month and category moves its total too
+        await AsyncOutcomeRepository.update_outcome(session, OutcomeSchema.model_construct(
+            msg_id=2, chat_id=2, user_id=3, amount=6, description="latte", type=None,
+            category="drinks", date=datetime(2025, 10, 2),
+        ))
+        totals = await MonthlyTotalsRepository.get_month_totals(session, 2, 3, "2025-10")
+        assert [(t.category, t.total, t.count) for t in totals] == [("", 100, 1), ("drinks", 6, 1)]
+
+        await AsyncOutcomeRepository.soft_delete(session, 1, 2, 3)
+        totals = await MonthlyTotalsRepository.get_month_totals(session, 2, 3, "2025-09")
+        assert [(t.category, t.total, t.count) for t in totals] == [("", 7, 1)]
+        await AsyncOutcomeRepository.restore(session, 2, 1, 3, undo_grace_seconds=10)
+        totals = await MonthlyTotalsRepository.get_month_totals(session, 2, 3, "2025-09")
+        assert [(t.category, t.total, t.count) for t in totals] == [("food", 10, 1), ("", 7, 1)]
+
+
+def test_rollup_is_maintained_incrementally(sqlite_db, run_with_sessions):
+    """Keeps the rollup consistent with every write and matches a full recount."""
+    run_with_sessions(__maintain_rollup)
+    engine = create_engine(sqlite_db.replace("+aiosqlite", ""))
+    with Session(engine) as session:
+        assert MonthlyTotalsRepository.verify(session) == []
+        # Drift is detected, and repaired by the rebuild
+        session.execute(
+            update(MonthlyTotalModel).values(total_cents=MonthlyTotalModel.total_cents + 1)
+        )
+        session.commit()
+        assert len(MonthlyTotalsRepository.verify(session)) == 4
+        assert MonthlyTotalsRepository.rebuild(session) == 4
+        assert MonthlyTotalsRepository.verify(session) == []
+    engine.dispose()
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        ([], "2025-09"),
+        (["2024-03"], "2024-03"),
+        (["3/2024"], "2024-03"),
+        (["12"], "2025-12"),
+        (["1"], "2025-01"),
+    ],
+)
+def test_parse_report_month(args, expected):
+    """Defaults to the current month and accepts YYYY-MM, MM/YYYY and MM."""
+    assert parse_report_month(args, datetime(2025, 9, 15)) == expected
+
+
+@pytest.mark.parametrize("args", [["13"], ["2025-00"], ["sept"], ["2025/09"]])
+def test_parse_report_month_invalid(args):
+    """Rejects unknown formats and out of range months."""
+    with pytest.raises(ValueError):
+        parse_report_month(args, datetime(2025, 9, 15))
+
+
+def test_format_report():
+    """Totals the month and groups it by category and type."""
+    rows = [
+        MonthlyTotalSchema(chat_id=2, user_id=3, year_month="2025-09", category="food", type="need",
+                           total=15, count=2),
+        MonthlyTotalSchema(chat_id=2, user_id=3, year_month="2025-09", category="", type="need",
+                           total=7, count=1),
+    ]
+    report = format_report("2025-09", rows)
+    assert report.splitlines()[:2] == ["Report for 2025-09", "Total: 22.00 (3 expenses)"]
+    assert "- food: 15.00 (2)" in report and "- Not specified: 7.00 (1)" in report
+    assert "- need: 22.00 (3)" in report
+    assert format_report("2025-09", []) == "No expenses recorded in 2025-09."
@@ -0,0 +1,108 @@
+"""
+Tests for the in-process outcome cache.
+
+Covers LRU eviction, expiry, hit/miss counters, and how the async
+repository fills, uses and invalidates the cache, including the fallback
+when the cached row is stale.
+"""
+
+from __future__ import annotations
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from expanses_tracker.application.models.outcome import OutcomeDto
+from expanses_tracker.persistence.configurations.outcome_model import OutcomeModel
+from expanses_tracker.persistence.repositories import outcome_cache
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.monthly_totals_repository import (
+    MonthlyTotalsRepository,
+)
+from expanses_tracker.persistence.repositories.outcome_cache import OutcomeCache
+
+
+def test_lru_eviction_and_counters(make_outcome):
+    """Evicts the least recently used entry and counts hits and misses."""
+    cache = OutcomeCache(max_size=2)
+    cache.put(make_outcome(1))
+    cache.put(make_outcome(2))
+    assert cache.get(1, 2, 3) is not None  # 1 becomes the most recently used
+    cache.put(make_outcome(3))
+    assert cache.get(2, 2, 3) is None
+    assert cache.get(1, 2, 3) is not None and cache.get(3, 2, 3) is not None
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 3, "misses": 1, "hit_ratio": 0.75}
+
+
+def test_ttl_and_deleted_outcomes(monkeypatch, make_outcome):
+    """Ignores expired entries and never caches soft deleted outcomes."""
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(outcome_cache.time, "monotonic", lambda: clock.now)
+    cache = OutcomeCache(max_size=10, ttl=5)
+    cache.put(make_outcome(1))
+    clock.now += 6
+    assert cache.get(1, 2, 3) is None and len(cache) == 0
+    cache.put(make_outcome(1))
+    cache.put(make_outcome(1, deleted_at=datetime(2025, 9, 2)))
+    assert len(cache) == 0
+
+
+def test_size_from_environment(monkeypatch, make_outcome):
+    """OUTCOME_CACHE_SIZE=0 disables the shared cache."""
+    monkeypatch.setenv("OUTCOME_CACHE_SIZE", "0")
+    cache = OutcomeCache.get_instance()
+    cache.put(make_outcome(1))
+    assert len(cache) == 0
+
+
+async def __repository_uses_cache(session_maker: async_sessionmaker, make_outcome):
+    cache = OutcomeCache.get_instance()
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.create_outcome(
+            session,
+            OutcomeDto(amount=10, description="pane", category="food", date=datetime(2025, 9, 1)),
+            message_id=1,
+            chat_id=2,
+            user_id=3,
+        )
+        await AsyncOutcomeRepository.create_outcomes(session, [
+            (OutcomeDto(amount=5, description="latte", date=datetime(2025, 9, 2)), 2, 2, 3),
+        ])
+        assert len(cache) == 2
+        cached = await AsyncOutcomeRepository.get_outcome_by_id(session, 1, 2, 3)
+        assert cached.description == "pane"
+        assert cache.hits == 1
+
+        # Cached update: one conditional UPDATE, the cache holds the new row
+        updated = await AsyncOutcomeRepository.update_outcome(
+            session, make_outcome(1, amount=12, description="pane", category="food")
+        )
+        assert updated.amount == 12.0 and cache.get(1, 2, 3).amount == 12.0
+
+        # Stale cache: the row changed behind the cache, the update falls back to SELECT + UPDATE
+        await session.execute(
+            update(OutcomeModel).where(OutcomeModel.msg_id == 2).values(amount_cents=5000)
+        )
+        await session.commit()
+        updated = await AsyncOutcomeRepository.update_outcome(
+            session, make_outcome(2, amount=6, description="latte")
+        )
+        assert updated.amount == 6.0
+
+        assert await AsyncOutcomeRepository.soft_delete(session, 1, 2, 3)
+        assert cache.get(1, 2, 3) is None
+        assert await AsyncOutcomeRepository.get_outcome_by_id(session, 1, 2, 3) is None
+        assert await AsyncOutcomeRepository.restore(session, 2, 1, 3, undo_grace_seconds=10)
+        assert cache.get(1, 2, 3) is not None
+
+
+def test_repository_fills_and_invalidates_cache(sqlite_db, run_with_sessions, make_outcome):
+    """Serves lookups and updates from the cache while keeping the rollup exact."""
+    run_with_sessions(__repository_uses_cache, make_outcome)
+    engine = create_engine(sqlite_db.replace("+aiosqlite", ""))
+    with Session(engine) as session:
+        # The out of band 50.00 change was never in the rollup: only that drift shows
+        mismatches = MonthlyTotalsRepository.verify(session)
+    engine.dispose()
+    assert len(mismatches) == 1 and "expected total_cents=600 " in mismatches[0]
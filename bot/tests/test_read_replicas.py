@@ -0,0 +1,143 @@
+"""
+Tests for the read replicas.
+
+Covers the DATABASE_READ_URL parsing, the routing of read sessions between
+two SQLite files standing for the primary and a replica, the read-your-writes
+window, the round-robin choice and the replicas skipped while unreachable.
+"""
+
+from __future__ import annotations
+import asyncio
+import shutil
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from expanses_tracker.application.models.outcome import OutcomeDto
+from expanses_tracker.persistence.database_context import read_replicas
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.database_context.read_replicas import ReadReplicas
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+
+
+def test_read_urls(monkeypatch):
+    """Comma-separated replicas, each with the asyncio driver of its backend."""
+    monkeypatch.delenv(ReadReplicas.ENV_READ_URL, raising=False)
+    assert AsyncDatabaseFactory.get_read_urls() == []
+    monkeypatch.setenv(
+        ReadReplicas.ENV_READ_URL, "sqlite:///replica.db, postgresql://u:p@replica2/expenses,"
+    )
+    urls = AsyncDatabaseFactory.get_read_urls()
+    assert [url.render_as_string(hide_password=False) for url in urls] == [
+        "sqlite+aiosqlite:///replica.db",
+        "postgresql+asyncpg://u:p@replica2/expenses",
+    ]
+
+
+class FakeClock:
+    """Stand-in for time.monotonic, moved forward by hand."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_read_your_writes_window(monkeypatch):
+    """A user who wrote reads from the primary until the window elapses; other users don't."""
+    clock = FakeClock()
+    monkeypatch.setattr(read_replicas.time, "monotonic", clock)
+    replicas = ReadReplicas([create_async_engine("sqlite+aiosqlite://")], read_your_writes=5)
+    replicas.wrote(2, 3)
+    clock.now += 4
+    replicas.wrote(2, 4)
+    assert [replicas.recently_wrote(2, user_id) for user_id in (3, 4, 9)] == [True, True, False]
+    clock.now += 2
+    assert (replicas.recently_wrote(2, 3), replicas.recently_wrote(2, 4)) == (False, True)
+    # 0 disables the window
+    replicas.read_your_writes = 0
+    replicas.wrote(2, 9)
+    assert not replicas.recently_wrote(2, 9)
+
+
+async def __health(good_url: str, bad_url: str):
+    good, bad = create_async_engine(good_url), create_async_engine(bad_url)
+    replicas = ReadReplicas([good, bad], retry_after=30)
+    try:
+        steps = {"round robin": [replicas.choose() is good for _ in range(3)]}
+        with pytest.raises(Exception):
+            async with bad.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        # Let aiosqlite's worker thread of the failed connection stop before the loop closes
+        await asyncio.sleep(0.1)
+        steps["bad down"] = [replicas.choose() is good for _ in range(3)]
+        replicas.mark_down(0)
+        steps["all down"] = replicas.choose()
+        return steps
+    finally:
+        await replicas.dispose()
+
+
+def test_unreachable_replica_is_skipped(sqlite_db, tmp_path):
+    """Replicas take turns, skipping unreachable ones; with none left, reads go to the primary."""
+    missing = f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    steps = asyncio.run(__health(sqlite_db, missing))
+    assert steps["round robin"] == [True, False, True]
+    assert steps["bad down"] == [True, True, True]
+    assert steps["all down"] is None
+
+
+WINDOW_SECONDS = 0.5
+
+async def __routing():
+    def expense(description: str) -> OutcomeDto:
+        return OutcomeDto(amount=1, description=description, date=datetime(2025, 3, 1))
+
+    async def listed(chat_id: int, user_id: int) -> list[str]:
+        async with AsyncDatabaseFactory.get_read_session(chat_id, user_id) as session:
+            outcomes = await AsyncOutcomeRepository.list_page(session, chat_id, user_id)
+        return [o.description for o in outcomes]
+
+    try:
+        async with AsyncDatabaseFactory.get_session() as session:
+            await AsyncOutcomeRepository.create_outcome(session, expense("on the primary"), 1, 2, 3)
+        steps = {"writer": await listed(2, 3), "other user": await listed(2, 9)}
+        await asyncio.sleep(WINDOW_SECONDS)
+        steps["window elapsed"] = await listed(2, 3)
+        # A read session that writes goes to the primary, and then reads from it
+        async with AsyncDatabaseFactory.get_read_session(2, 9) as session:
+            await AsyncOutcomeRepository.create_outcome(
+                session, expense("written by a reader"), 2, 2, 9
+            )
+            outcomes = await AsyncOutcomeRepository.list_page(session, 2, 9)
+        steps["read after write"] = [o.description for o in outcomes]
+        return steps
+    finally:
+        await AsyncDatabaseFactory.dispose()
+
+
+def test_read_sessions_use_the_replica(sqlite_db, tmp_path, monkeypatch):
+    """Reads of users who didn't just write come from the replica; writes reach the primary."""
+    primary = sqlite_db.replace("sqlite+aiosqlite", "sqlite")
+    replica_path = tmp_path / "replica.db"
+    shutil.copy(primary.removeprefix("sqlite:///"), replica_path)
+    replica = create_engine(f"sqlite:///{replica_path}")
+    with replica.begin() as conn:
+        # Replicated from the primary in a previous life
+        conn.execute(text(
+            "INSERT INTO expenses (msg_id, chat_id, user_id, amount_cents, description, date, "
+            "created_at, updated_at) "
+            "VALUES (7, 2, 9, 100, 'on the replica', '2025-03-01', '2025-03-01', '2025-03-01')"
+        ))
+    monkeypatch.setenv("DATABASE_URL", primary)
+    monkeypatch.setenv(ReadReplicas.ENV_READ_URL, f"sqlite:///{replica_path}")
+    monkeypatch.setenv(ReadReplicas.ENV_READ_YOUR_WRITES_SECONDS, str(WINDOW_SECONDS))
+    steps = asyncio.run(__routing())
+    assert steps["writer"] == ["on the primary"]
+    assert steps["other user"] == ["on the replica"]
+    assert steps["window elapsed"] == []
+    assert steps["read after write"] == ["written by a reader"]
+    with replica.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM expenses")).scalar() == 1
+    replica.dispose()
@@ -0,0 +1,207 @@
+"""
+Tests for /search.
+
+Covers the parsing of the arguments, the SQLite full-text index kept in
+sync by the repositories through create, update, soft delete and restore,
+ranking, paging and filters, the rebuild and the migration, and the
+PostgreSQL query.
+"""
+
+from __future__ import annotations
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from benchmarks.seed import migrate
+from expanses_tracker.application.features.search.search_command_handler import (
+    SearchRequest,
+    parse_search_args,
+    search_keyboard,
+)
+from expanses_tracker.application.models.button_data_dto import ButtonActions, ButtonDataDto
+from expanses_tracker.application.utils.callback_codec import decode_callback_data
+from expanses_tracker.persistence.configurations.search_index import owner_token
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.search_repository import (
+    SearchRepository,
+    search_statement,
+    search_terms,
+)
+
+TODAY = datetime(2025, 9, 9)
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        (["dentist"], SearchRequest(["dentist"])),
+        (["Dentist,", "visit!"], SearchRequest(["dentist", "visit"])),
+        (["dentist", "1/1/2025"], SearchRequest(["dentist"], start=datetime(2025, 1, 1))),
+        (
+            ["dentist", "2025-01-01", "31/1"],
+            SearchRequest(["dentist"], start=datetime(2025, 1, 1), end=datetime(2025, 2, 1)),
+        ),
+    ],
+)
+def test_parse_search_args(args, expected):
+    """Trailing dates are the range, the rest are the terms."""
+    assert parse_search_args(args, TODAY) == expected
+
+
+@pytest.mark.parametrize("args", [[], ["1/1/2025"], ['"*"', "-"]])
+def test_parse_search_args_needs_terms(args):
+    """Nothing to search for is a usage error."""
+    with pytest.raises(ValueError, match="Usage: /search"):
+        parse_search_args(args, TODAY)
+
+
+def test_search_terms_drop_operators():
+    """FTS5 and tsquery syntax can't get through."""
+    assert search_terms('den* OR "x" & !y (z)') == ["den", "or", "x", "y", "z"]
+
+
+def test_search_keyboard():
+    """Previous only after the first page, next only if there are more results."""
+    assert search_keyboard(5, -100, 0, has_more=False) is None
+    (buttons,) = search_keyboard(5, -100, 1, has_more=True).inline_keyboard
+    assert [decode_callback_data(b.callback_data) for b in buttons] == [
+        ButtonDataDto(ButtonActions.SEARCH_PAGE, 5, -100, "0"),
+        ButtonDataDto(ButtonActions.SEARCH_PAGE, 5, -100, "2"),
+    ]
+
+
+async def __search_lifecycle(session_maker: async_sessionmaker, make_dto, make_outcome):
+    async def search(*terms, user_id=3, **kwargs):
+        async with session_maker() as session:
+            found = await SearchRepository.search(session, 2, user_id, list(terms), **kwargs)
+        return [o.msg_id for o in found]
+
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.create_outcome(
+            session, make_dto(10, "dentist appointment", date=datetime(2025, 3, 1)), 1, 2, 3
+        )
+        await AsyncOutcomeRepository.create_outcomes(session, [
+            (make_dto(10, "dentist dentist cleaning", date=datetime(2025, 3, 2)), 2, 2, 3),
+            (make_dto(10, "pizza", date=datetime(2025, 3, 3)), 3, 2, 3),
+            (make_dto(10, "dentist", date=datetime(2025, 3, 4)), 4, 2, 9),
+        ])
+    steps = {"created": await search("dent")}
+    steps["two terms"] = await search("dentist", "clean")
+    steps["date range"] = await search("dentist", start=datetime(2025, 3, 2))
+    steps["paged"] = (await search("dentist", limit=1), await search("dentist", limit=1, offset=1))
+
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.update_outcome(
+            session,
+            make_outcome(3, amount=10, description="dentist parking", date=datetime(2025, 3, 3)),
+        )
+        await AsyncOutcomeRepository.soft_delete(session, 1, 2, 3)
+    steps["updated and deleted"] = (await search("dentist"), await search("pizza"))
+
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.restore(session, 2, 1, 3, undo_grace_seconds=60)
+    steps["restored"] = await search("appointment")
+    return steps
+
+
+def test_search_index_follows_outcomes(run_with_sessions, make_dto, make_outcome):
+    """Only live outcomes of the user match, the best ones first."""
+    steps = run_with_sessions(__search_lifecycle, make_dto, make_outcome)
+    # "dentist" twice ranks first; user 9's expense never shows up
+    assert steps["created"] == [2, 1]
+    assert steps["two terms"] == [2]
+    assert steps["date range"] == [2]
+    assert steps["paged"] == ([2], [1])
+    assert steps["updated and deleted"] == ([2, 3], [])
+    assert steps["restored"] == [1]
+
+
+async def __renumbered_rowids(session_maker: async_sessionmaker, make_dto, make_outcome):
+    async def search(term):
+        async with session_maker() as session:
+            return [o.msg_id for o in await SearchRepository.search(session, 2, 3, [term])]
+
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.create_outcomes(session, [
+            (make_dto(10, "dentist"), 1, 2, 3),
+            (make_dto(10, "pizza"), 2, 2, 3),
+        ])
+        # What a VACUUM or a migration copying the table may do: same rows, other rowids
+        await session.execute(text("CREATE TEMP TABLE expenses_copy AS SELECT * FROM expenses"))
+        await session.execute(text("DELETE FROM expenses"))
+        await session.execute(text(
+            "INSERT INTO expenses SELECT * FROM expenses_copy ORDER BY msg_id DESC"
+        ))
+        await session.commit()
+    steps = {"renumbered": await search("dentist")}
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.update_outcome(
+            session, make_outcome(2, amount=10, description="pizza dentist")
+        )
+        await AsyncOutcomeRepository.soft_delete(session, 1, 2, 3)
+    steps["updated and deleted"] = (await search("dentist"), await search("pizza"))
+    return steps
+
+
+def test_search_index_survives_renumbered_rowids(run_with_sessions, make_dto, make_outcome):
+    """The index follows the key of the expenses, not their rowids."""
+    steps = run_with_sessions(__renumbered_rowids, make_dto, make_outcome)
+    assert steps["renumbered"] == [1]
+    assert steps["updated and deleted"] == ([2], [2])
+
+
+def test_rebuild_search_index(sqlite_db):
+    """The index can be recomputed from the live outcomes."""
+    engine = create_engine(sqlite_db.replace("+aiosqlite", ""))
+    with Session(engine) as session:
+        session.execute(text(
+            "INSERT INTO expenses (msg_id, chat_id, user_id, amount_cents, description, date, "
+            "created_at, updated_at, deleted_at) "
+            "VALUES (1, 2, 3, 100, 'dentist', '2025-03-01', '2025-03-01', '2025-03-01', NULL), "
+            "(2, 2, 3, 100, 'dentist gone', '2025-03-01', '2025-03-01', '2025-03-01', '2025-03-02')"
+        ))
+        session.commit()
+        assert SearchRepository.rebuild(session) == 1
+        indexed = session.execute(text(
+            "SELECT msg_id, chat_id, user_id, description, owner FROM expenses_fts"
+        )).all()
+        assert indexed == [(1, 2, 3, "dentist", "c2u3")]
+    engine.dispose()
+
+
+def test_migration_backfills_search_index(sqlite_db):
+    """The migration creates the FTS5 table with the live descriptions."""
+    url = sqlite_db.replace("+aiosqlite", "")
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE expenses_fts"))
+        conn.execute(text(
+            "INSERT INTO expenses (msg_id, chat_id, user_id, amount_cents, description, date, "
+            "created_at, updated_at) "
+            "VALUES (1, -1002, 3, 100, 'Dentist visit', '2025-03-01', '2025-03-01', '2025-03-01')"
+        ))
+    migrate(url, "3b8e5d1f0c7a", "c41d7e9a2b65")
+    with engine.connect() as conn:
+        # Same owner token as the searches of the repository
+        query = f'owner : "{owner_token(-1002, 3)}" AND dent*'
+        matched = conn.execute(
+            text("SELECT msg_id, chat_id, user_id FROM expenses_fts WHERE expenses_fts MATCH :q"),
+            {"q": query},
+        ).all()
+        assert matched == [(1, -1002, 3)]
+    engine.dispose()
+
+
+def test_postgresql_search_uses_the_indexed_expression():
+    """The query repeats the expression of the GIN index, with prefix terms."""
+    sql = str(search_statement("postgresql", ["dent", "visit"], 2, 3).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+    indexed_match = (
+        "to_tsvector('simple', expenses.description) @@ to_tsquery('simple', 'dent:* & visit:*')"
+    )
+    assert indexed_match in sql
+    assert "ORDER BY ts_rank(" in sql
@@ -0,0 +1,121 @@
+"""
+Tests for the fast startup.
+
+Covers the Alembic revision check skipping create_all, the lazy handler
+callbacks, the background jobs set up once the bot runs and the parsing of
+`python -X importtime`.
+"""
+
+from __future__ import annotations
+import asyncio
+import importlib
+import sys
+from types import SimpleNamespace
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from telegram.ext import ApplicationBuilder
+
+from benchmarks.seed import ALEMBIC_INI
+from expanses_tracker.api.startup_profile import StartupProfile, parse_import_times
+from expanses_tracker.application import application_registration, lazy_callback
+from expanses_tracker.persistence import persistence_registration, persistence_shutdown
+from expanses_tracker.persistence.database_context.database import (
+    MIGRATIONS_PATH,
+    DatabaseFactory,
+    migration_heads,
+)
+
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch):
+    """Point DATABASE_URL at an empty SQLite file, with fresh engines before and after."""
+    url = f"sqlite:///{tmp_path / 'startup.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    DatabaseFactory.dispose()
+    yield url
+    DatabaseFactory.dispose()
+    asyncio.run(persistence_shutdown())
+
+
+def test_migration_heads_match_alembic():
+    """The heads read from the scripts are the ones Alembic computes."""
+    assert migration_heads() == frozenset(ScriptDirectory(str(MIGRATIONS_PATH)).get_heads())
+
+
+@pytest.mark.usefixtures("database_url")
+def test_create_all_skipped_at_head(monkeypatch):
+    """Tables are created for an unversioned database, not once it's at the latest revision."""
+    persistence_registration(check_revision=True)
+    assert not DatabaseFactory.schema_is_current()
+
+    command.stamp(Config(str(ALEMBIC_INI)), "head")
+    assert DatabaseFactory.schema_is_current()
+
+    def __fail():
+        raise AssertionError("create_all must be skipped")
+    monkeypatch.setattr(DatabaseFactory, "create_tables", __fail)
+    persistence_registration(check_revision=True)
+    with pytest.raises(AssertionError):
+        persistence_registration()
+
+
+def test_lazy_callback_imports_on_first_call(tmp_path, monkeypatch):
+    """The module is imported when the first update comes in, once."""
+    (tmp_path / "lazy_feature.py").write_text(
+        "import itertools\n"
+        "CALLS = itertools.count()\n"
+        "async def handler(update, context):\n"
+        "    return next(CALLS)\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_feature", raising=False)
+
+    callback = lazy_callback("lazy_feature", "handler")
+    assert callback.__name__ == "handler"
+    assert "lazy_feature" not in sys.modules
+    assert asyncio.run(callback(None, None)) == 0
+    assert asyncio.run(callback(None, None)) == 1
+
+
+def test_lazy_registration_defers_the_job_modules(monkeypatch):
+    """Nothing is imported while registering.
+
+    The first job run imports the sweeper and the index and schedules them.
+    """
+    imported = []
+    import_module = importlib.import_module
+    monkeypatch.setattr(
+        importlib, "import_module", lambda name: imported.append(name) or import_module(name)
+    )
+    app = application_registration(ApplicationBuilder().token("123456:TEST").build(), lazy=True)
+    assert imported == []
+    (setup,) = app.job_queue.jobs()
+    assert setup.name == "setup_jobs"
+    asyncio.run(setup.callback(SimpleNamespace(application=app)))
+    modules = [name.rsplit(".", 1)[-1] for name in imported]
+    assert modules == ["purge_sweeper", "category_suggestions"]
+    assert {job.name for job in app.job_queue.jobs()} >= {"purge_expired", "load_category_index"}
+
+
+def test_startup_profile_report():
+    """Phases and `-X importtime` lines end up in the report."""
+    imports = parse_import_times(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   sqlalchemy.util\n"
+        "import time:       300 |        420 | sqlalchemy\n"
+        "import time:        50 |        470 | expanses_tracker\n"
+        "unrelated line\n"
+    )
+    assert [(t.module, t.depth, t.package) for t in imports] == [
+        ("sqlalchemy.util", 1, "sqlalchemy"),
+        ("sqlalchemy", 0, "sqlalchemy"),
+        ("expanses_tracker", 0, "expanses_tracker"),
+    ]
+    profile = StartupProfile()
+    with profile.phase("database"):
+        pass
+    report = profile.render(imports)
+    assert "database" in report and "Imports: 3 modules, 0.5 ms" in report
+    assert "  sqlalchemy" in report.split("Import time by package (self):")[1].splitlines()[1]
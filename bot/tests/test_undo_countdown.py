@@ -0,0 +1,105 @@
+"""
+Tests for the shared undo countdown ticker.
+
+Covers the adaptive countdown granularity, batching of many notices into
+one repeating job, cancellation on restore and hard deletion at expiry.
+"""
+
+from __future__ import annotations
+import asyncio
+from types import SimpleNamespace
+import pytest
+
+from expanses_tracker.application.features.delete_expense import undo_countdown
+from expanses_tracker.application.features.delete_expense.undo_countdown import UndoCountdownTicker
+
+
+class FakeJob:
+    """Minimal stand-in for telegram.ext.Job."""
+    def __init__(self, callback):
+        self.callback = callback
+        self.removed = False
+
+    def schedule_removal(self):
+        """Mark the job as removed."""
+        self.removed = True
+
+
+class FakeJobQueue:
+    """Records the repeating jobs instead of scheduling them."""
+    def __init__(self):
+        self.jobs: list[FakeJob] = []
+
+    def run_repeating(self, callback, **_):
+        """Record a job for `callback`, never run on its own."""
+        job = FakeJob(callback)
+        self.jobs.append(job)
+        return job
+
+
+class FakeBot:
+    """Records edit_message_text calls."""
+    def __init__(self):
+        self.edits: list[tuple[int, int, str]] = []
+
+    async def edit_message_text(self, text, chat_id, message_id, **_):
+        """Record the new text of a message."""
+        self.edits.append((chat_id, message_id, text))
+
+
+@pytest.mark.parametrize(
+    "remaining, shown",
+    [(60, 60), (59.5, 60), (55.2, 60), (54.9, 55), (6, 10), (5.5, 10), (5, 5), (4.2, 5), (0.3, 1)],
+)
+def test_displayed_seconds(remaining, shown):
+    """Counts down in coarse steps, then every second near the deadline."""
+    assert UndoCountdownTicker.displayed_seconds(remaining) == shown
+
+
+def test_ticker_batches_notices(monkeypatch):
+    """Drives every notice from one job, edits sparsely and hard deletes on expiry."""
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(undo_countdown.time, "monotonic", lambda: clock.now)
+    deleted = []
+
+    async def fake_delete(_, message_id, chat_id, user_id):
+        deleted.append((message_id, chat_id, user_id))
+        return True
+
+    monkeypatch.setattr(undo_countdown.AsyncOutcomeRepository, "delete_outcome", fake_delete)
+    monkeypatch.setattr(undo_countdown.AsyncDatabaseFactory, "get_session", _NullSession)
+
+    context = SimpleNamespace(job_queue=FakeJobQueue(), bot=FakeBot())
+    for notice_id in range(100, 150):
+        notice = SimpleNamespace(chat_id=-1, message_id=notice_id)
+        UndoCountdownTicker.register(
+            context, notice, message_id=notice_id - 99, user_id=7, grace_seconds=10
+        )
+    assert len(context.job_queue.jobs) == 1
+    assert UndoCountdownTicker.pending_count() == 50
+    assert UndoCountdownTicker.cancel(-1, 149)
+
+    job = context.job_queue.jobs[0]
+
+    async def run_ticks():
+        for _ in range(10):
+            clock.now += 1
+            await job.callback(context)
+
+    asyncio.run(run_ticks())
+
+    # 49 notices: 10 -> 5, 4, 3, 2, 1 edits, then "Deleted."
+    countdown_edits = [e for e in context.bot.edits if e[2] != "Deleted."]
+    assert len(countdown_edits) == 49 * 5
+    assert sum(1 for e in context.bot.edits if e[2] == "Deleted.") == 49
+    assert sorted(deleted) == [(i, -1, 7) for i in range(1, 50)]
+    assert UndoCountdownTicker.pending_count() == 0
+    assert job.removed
+
+
+class _NullSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        return False
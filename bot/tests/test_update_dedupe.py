@@ -0,0 +1,172 @@
+"""
+Tests for redelivered updates.
+
+Covers the window of received update IDs, the group -1 handler dropping
+the copies, the conflict-free inserts of outcomes already stored, one by one
+and in batches, and the notice not sent again for them.
+"""
+
+from __future__ import annotations
+import asyncio
+from datetime import datetime
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from telegram import Bot, Update
+from telegram.ext import ApplicationBuilder, ApplicationHandlerStop
+
+from expanses_tracker.application import application_registration
+from expanses_tracker.application.features.add_or_edit_expense.add_expense.add_handler import (
+    add_handler,
+)
+from expanses_tracker.application.models.outcome import OutcomeDto
+from expanses_tracker.application.utils.update_dedupe import RecentUpdates, drop_redelivered_updates
+from expanses_tracker.persistence.configurations.monthly_total_model import MonthlyTotalModel
+from expanses_tracker.persistence.configurations.outcome_model import OutcomeModel
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.budget_tracker import BudgetTracker
+from tests.fakes import RecordingRequest
+
+
+def test_window_forgets_oldest():
+    """Only the last `size` IDs are remembered."""
+    window = RecentUpdates(size=2)
+    assert window.check_and_add(1) and window.check_and_add(2)
+    assert not window.check_and_add(1)
+    assert window.check_and_add(3)
+    assert len(window) == 2
+    # 1 fell out of the window
+    assert window.check_and_add(1)
+    assert window.duplicates == 1
+
+
+def test_window_disabled(monkeypatch):
+    """UPDATE_DEDUPE_WINDOW=0 turns the window off."""
+    monkeypatch.setenv("UPDATE_DEDUPE_WINDOW", "0")
+    assert RecentUpdates.get_instance() is None
+
+
+async def __process(*update_ids):
+    handled = []
+    for update_id in update_ids:
+        try:
+            await drop_redelivered_updates(Update(update_id), None)
+        except ApplicationHandlerStop:
+            continue
+        handled.append(update_id)
+    return handled
+
+
+def test_redelivered_update_dropped():
+    """The copy of an update stops in group -1, before every other handler."""
+    assert asyncio.run(__process(1, 2, 1)) == [1, 2]
+    assert RecentUpdates.get_instance().duplicates == 1
+
+    app = application_registration(ApplicationBuilder().token("123456:TEST").build())
+    assert [handler.callback for handler in app.handlers[-1]] == [drop_redelivered_updates]
+    assert min(app.handlers) == -1
+
+
+async def __create_twice(session_maker: async_sessionmaker):
+    async with session_maker() as session:
+        first = await AsyncOutcomeRepository.create_outcome(
+            session, OutcomeDto(amount=10, description="pizza", date=datetime(2025, 9, 9)), 1, 2, 3
+        )
+    async with session_maker() as session:
+        again = await AsyncOutcomeRepository.create_outcome(
+            session, OutcomeDto(amount=99, description="changed", date=datetime(2025, 9, 9)),
+            1, 2, 3,
+        )
+    async with session_maker() as session:
+        totals = (await session.scalars(select(MonthlyTotalModel))).all()
+    return first, again, [(t.total, t.count) for t in totals]
+
+
+def test_create_outcome_is_idempotent(run_with_sessions):
+    """Creating an outcome twice returns the stored one, not created, and counts it once."""
+    first, again, totals = run_with_sessions(__create_twice)
+    assert first[1] and not again[1]
+    assert again[0] == first[0]
+    assert again[0].description == "pizza"
+    assert totals == [(10, 1)]
+
+
+async def __create_after_purge(session_maker: async_sessionmaker, monkeypatch):
+    get_by_id = AsyncOutcomeRepository.get_outcome_by_id
+
+    async def purged_first(session, *args, **kwargs):
+        # The stored outcome is hard deleted between the conflict and the SELECT
+        await session.execute(delete(OutcomeModel))
+        return await get_by_id(session, *args, **kwargs)
+
+    async with session_maker() as session:
+        await AsyncOutcomeRepository.create_outcome(
+            session, OutcomeDto(amount=10, description="pizza", date=datetime(2025, 9, 9)), 1, 2, 3
+        )
+    monkeypatch.setattr(AsyncOutcomeRepository, "get_outcome_by_id", purged_first)
+    async with session_maker() as session:
+        return await AsyncOutcomeRepository.create_outcome(
+            session, OutcomeDto(amount=10, description="pizza", date=datetime(2025, 9, 9)), 1, 2, 3
+        )
+
+
+def test_create_outcome_deleted_meanwhile(run_with_sessions, monkeypatch):
+    """An outcome gone before it could be read back is reported as not created, without a schema."""
+    assert run_with_sessions(__create_after_purge, monkeypatch) == (None, False)
+
+
+async def __create_batch_twice(session_maker: async_sessionmaker):
+    def batch(description: str, *msg_ids: int):
+        day = datetime(2025, 9, 9)
+        return [
+            (OutcomeDto(amount=msg_id, description=description, date=day), msg_id, 2, 3)
+            for msg_id in msg_ids
+        ]
+
+    async with session_maker() as session:
+        first = await AsyncOutcomeRepository.create_outcomes(session, batch("first", 1, 2))
+    async with session_maker() as session:
+        # 2 is redelivered, 3 is new and sent twice in the same batch
+        again = await AsyncOutcomeRepository.create_outcomes(session, batch("again", 2, 3, 3))
+    async with session_maker() as session:
+        totals = (await session.scalars(select(MonthlyTotalModel))).all()
+    return first, again, [(t.total, t.count) for t in totals]
+
+
+def test_create_outcomes_skips_stored_ones(run_with_sessions):
+    """A batch still inserts the new outcomes and returns the stored ones as not created."""
+    first, again, totals = run_with_sessions(__create_batch_twice)
+    assert [(o.msg_id, created) for o, created in first] == [(1, True), (2, True)]
+    assert [(o.msg_id, o.description, created) for o, created in again] == [
+        (2, "first", False), (3, "again", True), (3, "again", False),
+    ]
+    assert totals == [(6, 3)]
+
+
+async def __add_twice(message: dict) -> RecordingRequest:
+    request = RecordingRequest()
+    bot = Bot("123456:TEST", request=request)
+    async with bot:
+        for _ in range(2):
+            # A restart in between: the window of update IDs starts empty
+            RecentUpdates.reset_instance()
+            update = Update.de_json({"update_id": 1, "message": message}, bot)
+            await add_handler(update.message, update.message.message_id, update)
+    await AsyncDatabaseFactory.dispose()
+    return request
+
+
+def test_redelivered_expense_is_not_announced_twice(sqlite_db, monkeypatch):
+    """An expense's notice and budget alert are sent once, even if its message comes back."""
+    monkeypatch.setenv("DATABASE_URL", sqlite_db.replace("+aiosqlite", ""))
+    BudgetTracker.get_instance().set_budget(555001, 555001, "food", 1000, {})
+    request = asyncio.run(__add_twice({
+        "message_id": 42,
+        "from": {"id": 555001, "is_bot": False, "first_name": "Ada"},
+        "chat": {"id": 555001, "first_name": "Ada", "type": "private"},
+        "date": 1757400000,
+        "text": "12 pizza food need",
+    }))
+    replies = [params["text"] for method, params in request.calls if method == "sendMessage"]
+    assert len(replies) == 2
+    assert replies[0].startswith("Expense saved") and replies[1].startswith("🚨 Over budget")
@@ -0,0 +1,117 @@
+"""
+Tests for the chat ordered update processor.
+
+Covers strict ordering within a chat, parallelism across chats, the running
+limit and the queue metrics.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from telegram import Chat, Message, Update
+
+from expanses_tracker.api.update_processor import ChatOrderedUpdateProcessor
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    """Build a text message update in the given chat."""
+    chat = Chat(id=chat_id, type=Chat.PRIVATE)
+    return Update(update_id, message=Message(update_id, datetime.now(), chat, text="x"))
+
+
+async def run_updates(
+    processor: ChatOrderedUpdateProcessor, updates: list[tuple[Update, float]], log: list
+):
+    """Feed updates like Application does (one task each, in arrival order) and wait for them."""
+    running = {"now": 0, "max": 0}
+
+    async def handle(update: Update, delay: float):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        log.append(("start", update.update_id))
+        await asyncio.sleep(delay)
+        log.append(("end", update.update_id))
+        running["now"] -= 1
+
+    await asyncio.gather(*(
+        asyncio.create_task(processor.process_update(update, handle(update, delay)))
+        for update, delay in updates
+    ))
+    return running["max"]
+
+
+def test_same_chat_in_order():
+    """A slow update of a chat delays the next ones of that chat, which never overlap."""
+    processor = ChatOrderedUpdateProcessor(8)
+    log = []
+    updates = [(make_update(1, 10), 0.05), (make_update(2, 10), 0.0), (make_update(3, 10), 0.01)]
+    max_running = asyncio.run(run_updates(processor, updates, log))
+    assert log == [("start", 1), ("end", 1), ("start", 2), ("end", 2), ("start", 3), ("end", 3)]
+    assert max_running == 1
+
+
+def test_chats_run_in_parallel_up_to_limit():
+    """Different chats overlap, but no more than max_running at once."""
+    processor = ChatOrderedUpdateProcessor(2)
+    log = []
+    updates = [(make_update(i, chat_id=i), 0.05) for i in range(1, 5)]
+    start = time.monotonic()
+    max_running = asyncio.run(run_updates(processor, updates, log))
+    elapsed = time.monotonic() - start
+    assert max_running == 2
+    assert elapsed < 0.19  # 2 rounds of 0.05s, sequential would take 0.2s
+
+
+def test_busy_chat_does_not_block_others():
+    """Updates waiting for their chat don't take a slot from other chats."""
+    processor = ChatOrderedUpdateProcessor(2)
+    log = []
+    updates = [(make_update(i, 10), 0.03) for i in range(1, 5)] + [(make_update(5, 20), 0.0)]
+    asyncio.run(run_updates(processor, updates, log))
+    assert log.index(("end", 5)) < log.index(("end", 1))
+
+
+def test_queue_metrics():
+    """Pending depth drops back to zero and waits are recorded per chat."""
+    processor = ChatOrderedUpdateProcessor(4)
+    log = []
+    updates = [(make_update(1, 10), 0.02), (make_update(2, 10), 0.0), (make_update(3, 20), 0.0)]
+    asyncio.run(run_updates(processor, updates, log))
+    stats = processor.stats()
+    assert stats[10].processed == 2 and stats[20].processed == 1
+    assert processor.queue_depth == 0
+    assert stats[10].max_wait >= 0.015  # update 2 waited for update 1
+    assert stats[20].max_wait < 0.015
+    assert processor.totals.processed == 3 and processor.totals.max_wait >= 0.015
+
+
+def test_idle_chat_metrics_age_out():
+    """Chats idle for idle_ttl are dropped from the per-chat metrics, the totals keep them."""
+    processor = ChatOrderedUpdateProcessor(4, idle_ttl=0)
+    log = []
+    asyncio.run(run_updates(processor, [(make_update(1, 10), 0.0), (make_update(2, 20), 0.0)], log))
+    asyncio.run(run_updates(processor, [(make_update(3, 30), 0.0)], log))
+    assert list(processor.stats()) == [30]
+    assert processor.totals.processed == 3 and processor.queue_depth == 0
+
+
+def test_cancelled_waiter_keeps_order():
+    """Cancelling a waiting update doesn't let the next one overtake the running one."""
+    async def scenario():
+        processor = ChatOrderedUpdateProcessor(4)
+        log = []
+
+        async def handle(update_id: int, delay: float):
+            log.append(("start", update_id))
+            await asyncio.sleep(delay)
+            log.append(("end", update_id))
+
+        first = asyncio.create_task(processor.process_update(make_update(1, 10), handle(1, 0.03)))
+        second = asyncio.create_task(processor.process_update(make_update(2, 10), handle(2, 0)))
+        third = asyncio.create_task(processor.process_update(make_update(3, 10), handle(3, 0)))
+        await asyncio.sleep(0.01)
+        second.cancel()
+        await asyncio.gather(first, third, return_exceptions=True)
+        return log
+
+    assert asyncio.run(scenario()) == [("start", 1), ("end", 1), ("start", 3), ("end", 3)]
@@ -0,0 +1,124 @@
+"""
+Tests for the webhook serving mode.
+
+Covers the BOT_MODE/WEBHOOK_* settings, and runs the real webhook server
+offline: a recorded update is posted to it and the bot's reply is captured
+by a local fake of the Bot API.
+"""
+
+from __future__ import annotations
+import asyncio
+import socket
+from pathlib import Path
+import httpx
+import pytest
+from telegram.ext import ApplicationBuilder
+
+from expanses_tracker.api.main import ALLOWED_UPDATES, WebhookSettings, build_application
+from expanses_tracker.observability.instrumentation import HANDLER_LATENCY, TELEGRAM_LATENCY
+from expanses_tracker.persistence.database_context.database import AsyncDatabaseFactory
+from tests.fakes import RecordingRequest
+
+UPDATES = Path(__file__).parent / "updates"
+
+
+def test_polling_is_the_default(monkeypatch):
+    """Without BOT_MODE the bot keeps polling."""
+    monkeypatch.delenv("BOT_MODE", raising=False)
+    assert WebhookSettings.from_env() is None
+
+
+def test_webhook_settings_from_env(monkeypatch):
+    """Reads every WEBHOOK_* variable."""
+    monkeypatch.setenv("BOT_MODE", "webhook")
+    monkeypatch.setenv("WEBHOOK_URL", "https://bot.example.com/")
+    monkeypatch.setenv("WEBHOOK_PATH", "/tg-hook")
+    monkeypatch.setenv("WEBHOOK_PORT", "9000")
+    monkeypatch.setenv("WEBHOOK_SECRET_TOKEN", "s3cret-token")
+    monkeypatch.setenv("WEBHOOK_MAX_CONNECTIONS", "100")
+    kwargs = WebhookSettings.from_env().webhook_kwargs()
+    assert kwargs == {
+        "listen": "0.0.0.0",
+        "port": 9000,
+        "url_path": "tg-hook",
+        "webhook_url": "https://bot.example.com/tg-hook",
+        "secret_token": "s3cret-token",
+        "max_connections": 100,
+        "allowed_updates": ALLOWED_UPDATES,
+    }
+
+
+@pytest.mark.parametrize(
+    "env, error",
+    [
+        ({"BOT_MODE": "carrier-pigeon"}, "Unknown BOT_MODE"),
+        ({"BOT_MODE": "webhook"}, "WEBHOOK_URL"),
+        ({"BOT_MODE": "webhook", "WEBHOOK_URL": "https://x", "WEBHOOK_SECRET_TOKEN": "not secret!"},
+         "WEBHOOK_SECRET_TOKEN"),
+    ],
+)
+def test_webhook_settings_errors(monkeypatch, env, error):
+    """Refuses incomplete or invalid configurations."""
+    monkeypatch.delenv("WEBHOOK_URL", raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    with pytest.raises(ValueError, match=error):
+        WebhookSettings.from_env()
+
+
+def __free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def __serve_recorded_update() -> tuple[RecordingRequest, list[int]]:
+    request = RecordingRequest()
+    app = build_application(
+        "123456:TEST", ApplicationBuilder().get_updates_request(request), request
+    )
+    settings = WebhookSettings(
+        url="https://bot.example.com", listen="127.0.0.1", port=__free_port(), path="hook",
+        secret_token="s3cret",
+    )
+    statuses = []
+    async with app:
+        await app.updater.start_webhook(**settings.webhook_kwargs())
+        await app.start()
+        try:
+            async with httpx.AsyncClient() as client:
+                for secret in ("wrong", "s3cret"):
+                    response = await client.post(
+                        f"http://127.0.0.1:{settings.port}/hook",
+                        content=(UPDATES / "start_command.json").read_bytes(),
+                        headers={
+                            "Content-Type": "application/json",
+                            "X-Telegram-Bot-Api-Secret-Token": secret,
+                        },
+                    )
+                    statuses.append(response.status_code)
+            await request.wait_for("sendMessage")
+        finally:
+            await app.updater.stop()
+            await app.stop()
+    await AsyncDatabaseFactory.dispose()
+    return request, statuses
+
+
+def test_webhook_processes_recorded_update(monkeypatch, sqlite_db):
+    """Registers the webhook, rejects a wrong secret and answers /start posted to the endpoint."""
+    # The purge sweeper starts with the application
+    monkeypatch.setenv("DATABASE_URL", sqlite_db.replace("+aiosqlite", ""))
+    request, statuses = asyncio.run(__serve_recorded_update())
+    assert statuses == [403, 200]
+    set_webhook = dict(request.calls)["setWebhook"]
+    assert set_webhook["url"] == "https://bot.example.com/hook"
+    assert set_webhook["secret_token"] == "s3cret"
+    assert set_webhook["allowed_updates"] == ALLOWED_UPDATES
+    reply = dict(request.calls)["sendMessage"]
+    assert reply["chat_id"] == 555001
+    assert reply["text"].startswith("Hi! I'm your Expense Tracker Bot.")
+    assert request.methods().count("sendMessage") == 1
+    # Handler and Bot API calls are instrumented
+    assert HANDLER_LATENCY.count("__cmd_start__") >= 1
+    assert TELEGRAM_LATENCY.count("sendMessage") >= 1
@@ -0,0 +1,62 @@
+"""
+Tests for the write-behind outcome insert queue.
+
+Covers batching by size and by interval, per-caller results and a
+redelivered row in a batch not failing the others.
+"""
+
+from __future__ import annotations
+import asyncio
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from expanses_tracker.persistence.repositories.async_repository import AsyncOutcomeRepository
+from expanses_tracker.persistence.repositories.write_behind import OutcomeWriteBehindQueue
+
+
+async def __run_batches(session_maker: async_sessionmaker, make_dto, monkeypatch):
+    batch_sizes = []
+    create_outcomes = AsyncOutcomeRepository.create_outcomes
+
+    async def spy(session, outcomes):
+        # Counted once written: a failed batch would be retried one by one
+        results = await create_outcomes(session, outcomes)
+        batch_sizes.append(len(results))
+        return results
+
+    monkeypatch.setattr(AsyncOutcomeRepository, "create_outcomes", spy)
+    queue = OutcomeWriteBehindQueue(max_batch=3, flush_interval=0.01, session_factory=session_maker)
+    results = await asyncio.gather(
+        *(queue.submit(make_dto(i, f"expense {i}"), i, 10, 20) for i in range(1, 6))
+    )
+    assert [(r.msg_id, created) for r, created in results] == [(i, True) for i in range(1, 6)]
+    assert [r.description for r, _ in results] == [f"expense {i}" for i in range(1, 6)]
+    # One full batch by size, the remainder by interval
+    assert batch_sizes == [3, 2]
+
+    # A redelivered message gets the stored outcome in the same batch as the others
+    (duplicate, created_duplicate), (fresh, created_fresh) = await asyncio.gather(
+        queue.submit(make_dto(9, "expense 9"), 1, 10, 20),
+        queue.submit(make_dto(6, "expense 6"), 6, 10, 20),
+    )
+    assert (duplicate.msg_id, duplicate.description, created_duplicate) == (1, "expense 1", False)
+    assert (fresh.msg_id, created_fresh) == (6, True)
+    assert batch_sizes == [3, 2, 2]
+
+    # Pending inserts are written on close
+    pending = asyncio.ensure_future(queue.submit(make_dto(7, "expense 7"), 7, 10, 20))
+    await asyncio.sleep(0)
+    assert queue.pending == 1
+    await queue.close()
+    assert (await pending)[0].msg_id == 7
+
+
+def test_write_behind_batches(run_with_sessions, make_dto, monkeypatch):
+    """Flushes by size and interval and resolves every caller with its own row."""
+    run_with_sessions(__run_batches, make_dto, monkeypatch)
+
+
+def test_write_behind_rejects_empty_batches():
+    """Requires at least one row per batch."""
+    with pytest.raises(ValueError):
+        OutcomeWriteBehindQueue(max_batch=0)